@@ -0,0 +1,204 @@
+"""
+Load benchmark for the API.
+
+Drives the ASGI app in-process with a fixed number of concurrent clients per endpoint and reports
+p50/p95/p99 latency and throughput. Results are written as JSON and can be compared to a baseline:
+
+    POSTGRES_DB=pythonfloripa_bench python -m benchmarks.load --seed --output results.json
+    POSTGRES_DB=pythonfloripa_bench python -m benchmarks.load --baseline benchmarks/baseline.json
+
+The exit status is 1 when an endpoint regressed by more than `--tolerance` against the baseline.
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from dataclasses import asdict, dataclass
+from http import HTTPStatus
+from typing import Callable, Optional
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from benchmarks.seed import add_volume_arguments, seed, volumes_from_arguments
+from src.app import create_app
+from src.ext.database.db import build_engine
+from src.resources.events.model import Event
+from src.resources.speakers.model import Speaker
+from src.resources.talks.model import Talk
+from src.resources.users.model import User
+from src.settings import get_settings
+
+SAMPLE_IDS = 1000
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    path: Callable[[dict[str, list[str]]], str]
+
+
+SCENARIOS = [
+    Scenario('list_events', lambda ids: f'/events?page={random.randint(1, 50)}&per_page=20'),
+    Scenario('get_event', lambda ids: f'/events/{random.choice(ids["events"])}'),
+    Scenario('batch_events', lambda ids: '/events?ids=' + ','.join(random.sample(ids['events'], 20))),
+    Scenario('list_talks', lambda ids: f'/talks?page={random.randint(1, 50)}&per_page=20'),
+    Scenario('get_talk', lambda ids: f'/talks/{random.choice(ids["talks"])}'),
+    Scenario('list_speakers', lambda ids: f'/speakers?page={random.randint(1, 50)}&per_page=20'),
+    Scenario('get_speaker', lambda ids: f'/speakers/{random.choice(ids["speakers"])}'),
+    Scenario('list_users', lambda ids: f'/users?page={random.randint(1, 50)}&per_page=20'),
+    Scenario('get_user', lambda ids: f'/users/{random.choice(ids["users"])}'),
+]
+
+
+@dataclass
+class Result:
+    requests: int
+    errors: int
+    throughput: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+
+async def _sample_ids(engine: AsyncEngine) -> dict[str, list[str]]:
+    ids = {}
+    async with engine.connect() as conn:
+        for name, model in (('events', Event), ('talks', Talk), ('speakers', Speaker), ('users', User)):
+            result = await conn.execute(select(model.id).order_by(model.id).limit(SAMPLE_IDS))
+            ids[name] = list(result.scalars())
+    return ids
+
+
+async def run_scenario(
+    client: AsyncClient, scenario: Scenario, ids: dict[str, list[str]], concurrency: int, duration: float
+) -> Result:
+    latencies: list[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            path = scenario.path(ids)
+            start = time.perf_counter()
+            response = await client.get(path)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= HTTPStatus.BAD_REQUEST:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    percentiles = statistics.quantiles(latencies, n=100, method='inclusive') if len(latencies) > 1 else latencies * 99
+    return Result(
+        requests=len(latencies),
+        errors=errors,
+        throughput=round(len(latencies) / elapsed, 2),
+        p50_ms=round(percentiles[49] * 1000, 2),
+        p95_ms=round(percentiles[94] * 1000, 2),
+        p99_ms=round(percentiles[98] * 1000, 2),
+    )
+
+
+def compare(results: dict[str, dict], baseline: dict[str, dict], tolerance: float) -> list[str]:
+    """Endpoints whose p95 latency or throughput got worse than the baseline by more than `tolerance`."""
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        if result['p95_ms'] > reference['p95_ms'] * (1 + tolerance):
+            regressions.append(f'{name}: p95 {reference["p95_ms"]} ms -> {result["p95_ms"]} ms')
+        if result['throughput'] < reference['throughput'] * (1 - tolerance):
+            regressions.append(f'{name}: throughput {reference["throughput"]} -> {result["throughput"]} req/s')
+    return regressions
+
+
+def _print_table(results: dict[str, dict], baseline: Optional[dict[str, dict]]) -> None:
+    print(f'{"endpoint":<16}{"req/s":>10}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}{"errors":>8}{"p95 vs base":>14}')
+    for name, result in results.items():
+        change = ''
+        if baseline and name in baseline and baseline[name]['p95_ms']:
+            change = f'{(result["p95_ms"] / baseline[name]["p95_ms"] - 1) * 100:+.1f}%'
+        print(
+            f'{name:<16}{result["throughput"]:>10}{result["p50_ms"]:>10}{result["p95_ms"]:>10}'
+            f'{result["p99_ms"]:>10}{result["errors"]:>8}{change:>14}'
+        )
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seed', action='store_true', help='recreate and seed the database first')
+    add_volume_arguments(parser)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds per endpoint')
+    parser.add_argument('--warmup', type=float, default=2.0, help='seconds per endpoint, not measured')
+    parser.add_argument('--only', nargs='*', help='endpoints to run, all by default')
+    parser.add_argument('--output', default='benchmarks/results.json')
+    parser.add_argument('--baseline', help='results file to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='allowed regression, 0.1 means 10%%')
+    args = parser.parse_args()
+
+    settings = get_settings()
+    if args.seed:
+        # Seeded before startup, warm-up would otherwise prepare statements on tables about to be dropped.
+        engine = build_engine(settings)
+        await seed(engine, volumes_from_arguments(args))
+        await engine.dispose()
+
+    # Access logs for every request would measure the log handler, not the API.
+    app = create_app(settings.model_copy(update={'LOG_LEVEL': 'WARNING'}))
+    scenarios = [scenario for scenario in SCENARIOS if not args.only or scenario.name in args.only]
+    results = {}
+
+    async with app.router.lifespan_context(app):
+        engine = app.state.engine
+        while not app.state.ready:
+            await asyncio.sleep(0.1)
+
+        random.seed(0)
+        ids = await _sample_ids(engine)
+
+        async with AsyncClient(transport=ASGITransport(app=app), base_url='http://benchmark') as client:
+            for scenario in scenarios:
+                if args.warmup:
+                    await run_scenario(client, scenario, ids, args.concurrency, args.warmup)
+                results[scenario.name] = asdict(
+                    await run_scenario(client, scenario, ids, args.concurrency, args.duration)
+                )
+
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(
+            {
+                'python': platform.python_version(),
+                'concurrency': args.concurrency,
+                'duration': args.duration,
+                'endpoints': results,
+            },
+            file,
+            indent=2,
+        )
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as file:
+            baseline = json.load(file)['endpoints']
+
+    _print_table(results, baseline)
+
+    regressions = compare(results, baseline, args.tolerance) if baseline else []
+    for regression in regressions:
+        print(f'REGRESSION {regression}')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(asyncio.run(main()))
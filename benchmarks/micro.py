@@ -0,0 +1,191 @@
+"""
+Micro-benchmarks for the serialization and validation hot paths.
+
+Each case runs on in-memory objects, no database needed, and reports operations per second and the
+peak memory allocated by a single operation. Use it to judge changes to `src/resources/*/schema.py`:
+
+    python -m benchmarks.micro --output benchmarks/results-micro.json
+    python -m benchmarks.micro --baseline benchmarks/results-micro.json
+
+The exit status is 1 when a case got slower than the baseline by more than `--tolerance`.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from src.resources.events.model import Event
+from src.resources.events.schema import EventDB, EventsPaginatedResponse, EventSummary
+from src.resources.talks.model import Talk
+from src.resources.users.model import User, UserProfile
+from src.resources.users.schema import UserCreate, UserPublic, UsersPaginatedResponse
+from src.utils import generate_ulid
+
+NOW = datetime(2025, 6, 1, 19, 0, tzinfo=timezone.utc)
+TALKS_PER_EVENT = 200
+PAGE_SIZE = 100
+
+
+@dataclass
+class Result:
+    ops_per_sec: float
+    mean_us: float
+    peak_kib_per_op: float
+
+
+def _event(edition: int, talks: int = 0) -> Event:
+    event = Event(
+        id=generate_ulid(),
+        edition=edition,
+        title=f'Python Floripa #{edition}',
+        description='Encontro da comunidade Python Floripa. ' * 5,
+        start_date=NOW,
+        end_date=NOW + timedelta(hours=3),
+        location='Florianópolis, SC',
+        image_url=f'https://example.com/events/{edition}.jpg',
+        is_active=True,
+        is_published=True,
+        talk_count=talks,
+        created_at=NOW,
+        updated_at=NOW,
+    )
+    event.talks = [
+        Talk(
+            id=generate_ulid(),
+            title=f'Talk {number}',
+            description='Description of the talk. ' * 5,
+            speaker_id=generate_ulid(),
+            start_time=NOW,
+            end_time=NOW + timedelta(minutes=30),
+            event_id=event.id,
+            created_at=NOW,
+            updated_at=NOW,
+        )
+        for number in range(talks)
+    ]
+    return event
+
+
+def _user(number: int) -> User:
+    user = User(
+        id=generate_ulid(),
+        username=f'user{number}',
+        email=f'user{number}@example.com',
+        hashed_password='x' * 60,
+        is_active=True,
+        is_superuser=False,
+        created_at=NOW,
+        updated_at=NOW,
+    )
+    user.profile = UserProfile(full_name=f'User {number}', github_url=f'https://github.com/user{number}')
+    return user
+
+
+def _cases() -> dict[str, Callable[[], object]]:
+    event_with_talks = _event(1, talks=TALKS_PER_EVENT)
+    users = [_user(number) for number in range(PAGE_SIZE)]
+    user_data = {
+        'username': 'bento',
+        'email': 'bento@example.com',
+        'password': 'an!RW9j7654321',
+        'profile': {'full_name': 'Bento', 'github_url': 'https://github.com/bento', 'phone_number': '+5548999999999'},
+    }
+    events_page = EventsPaginatedResponse(
+        total=1000,
+        page=1,
+        per_page=PAGE_SIZE,
+        total_pages=10,
+        items=[EventSummary.model_validate(_event(edition), from_attributes=True) for edition in range(PAGE_SIZE)],
+    )
+
+    def users_page():
+        # Mirrors UserRepository.list_users.
+        items = [UserPublic.model_validate(user) for user in users]
+        return UsersPaginatedResponse(total=1000, page=1, per_page=PAGE_SIZE, total_pages=10, items=items)
+
+    return {
+        f'event_db_validate_{TALKS_PER_EVENT}_talks': lambda: EventDB.model_validate(event_with_talks),
+        f'users_paginated_response_{PAGE_SIZE}': users_page,
+        'user_create_validate': lambda: UserCreate.model_validate(user_data),
+        f'events_page_{PAGE_SIZE}_model_dump_json': events_page.model_dump_json,
+        # The path FastAPI takes for a response_model: jsonable data first, then JSONResponse.render.
+        f'events_page_{PAGE_SIZE}_json_response': lambda: JSONResponse(jsonable_encoder(events_page)).body,
+    }
+
+
+def measure(operation: Callable[[], object], min_time: float) -> Result:
+    operation()
+
+    # Grow the batch until it runs long enough for the clock to be precise.
+    iterations = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            operation()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        iterations *= 2
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    operation()
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+
+    return Result(
+        ops_per_sec=round(iterations / elapsed, 1),
+        mean_us=round(elapsed / iterations * 1_000_000, 2),
+        peak_kib_per_op=round(peak / 1024, 1),
+    )
+
+
+def compare(results: dict[str, dict], baseline: dict[str, dict], tolerance: float) -> list[str]:
+    """Cases whose throughput dropped below the baseline by more than `tolerance`."""
+    return [
+        f'{name}: {baseline[name]["ops_per_sec"]} -> {result["ops_per_sec"]} ops/s'
+        for name, result in results.items()
+        if name in baseline and result['ops_per_sec'] < baseline[name]['ops_per_sec'] * (1 - tolerance)
+    ]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--only', nargs='*', help='cases to run, all by default')
+    parser.add_argument('--min-time', type=float, default=1.0, help='seconds each case runs for')
+    parser.add_argument('--output', default='benchmarks/results-micro.json')
+    parser.add_argument('--baseline', help='results file to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='allowed slowdown, 0.1 means 10%%')
+    args = parser.parse_args()
+
+    results = {}
+    print(f'{"case":<40}{"ops/s":>12}{"mean us":>12}{"peak KiB/op":>14}')
+    for name, operation in _cases().items():
+        if args.only and name not in args.only:
+            continue
+        result = results[name] = asdict(measure(operation, args.min_time))
+        print(f'{name:<40}{result["ops_per_sec"]:>12}{result["mean_us"]:>12}{result["peak_kib_per_op"]:>14}')
+
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump({'python': platform.python_version(), 'cases': results}, file, indent=2)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as file:
+            regressions = compare(results, json.load(file)['cases'], args.tolerance)
+    for regression in regressions:
+        print(f'REGRESSION {regression}')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
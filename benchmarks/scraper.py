@@ -0,0 +1,119 @@
+"""
+Benchmark for `parse_events` in scrapper.py on synthetic Tech Floripa timelines.
+
+Generates `#event-timeline` pages with the requested numbers of `div.event-item` nodes and measures
+parse time and peak memory for every installed BeautifulSoup backend, with the rich progress bars on and off:
+
+    python -m benchmarks.scraper --items 10000 100000
+"""
+
+import argparse
+import importlib.util
+import io
+import json
+import random
+import time
+import tracemalloc
+
+from rich.console import Console
+
+import scrapper
+
+ITEMS_PER_SECTION = 50
+PARSERS = ('html.parser', 'lxml', 'html5lib')
+TAGS = ('Python', 'Django', 'FastAPI', 'Dados', 'IA', 'Comunidade', 'Carreira')
+
+ITEM = """
+      <div class="event-item">
+        <p class="event-time"><strong>{hour:02d}:00</strong> <span class="event-type">{kind}</span>
+          <span class="event-price">{price}</span></p>
+        <h4 class="event-title">Evento {number}</h4>
+        <p class="event-location">Florianópolis, SC - Sala {room}</p>
+        <p class="event-description">{description}</p>
+        <div class="event-tags">{tags}</div>
+      </div>"""
+
+
+def synthetic_timeline(items: int) -> str:
+    """An HTML page shaped like tech.floripa.br with `items` events spread over date sections."""
+    random.seed(items)
+    sections = []
+    for start in range(0, items, ITEMS_PER_SECTION):
+        rendered = ''.join(
+            ITEM.format(
+                hour=random.randint(8, 21),
+                kind=random.choice(('Presencial', 'Online', 'Híbrido')),
+                price=random.choice(('Gratuito', 'R$ 20,00', 'R$ 50,00')),
+                number=number,
+                room=random.randint(1, 20),
+                description='Uma descrição do evento com alguns detalhes. ' * random.randint(1, 4),
+                tags=''.join(f'<span class="tag-badge">{tag}</span>' for tag in random.sample(TAGS, 3)),
+            )
+            for number in range(start, min(start + ITEMS_PER_SECTION, items))
+        )
+        sections.append(
+            f'<div class="event-date-section"><h3 class="event-date">Dia {start // ITEMS_PER_SECTION + 1}</h3>'
+            f'{rendered}</div>'
+        )
+
+    navigation = ''.join(f'<li><a href="/pagina/{number}">Página {number}</a></li>' for number in range(200))
+    return (
+        '<!DOCTYPE html><html><head><title>Tech Floripa</title></head><body>'
+        f'<nav><ul>{navigation}</ul></nav><main><div id="event-timeline">{"".join(sections)}</div></main>'
+        '<footer>Tech Floripa</footer></body></html>'
+    )
+
+
+def measure(html: str, parser: str, progress: bool) -> dict:
+    # Progress bars are rendered as on a terminal, into memory so the output stays readable.
+    scrapper.console = Console(file=io.StringIO(), force_terminal=True, width=120)
+
+    start = time.perf_counter()
+    events = scrapper.parse_events(html, parser, progress=progress)
+    elapsed = time.perf_counter() - start
+
+    # tracemalloc slows parsing down, so memory is measured on a separate run.
+    tracemalloc.start()
+    scrapper.parse_events(html, parser, progress=progress)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        'events': len(events),
+        'seconds': round(elapsed, 3),
+        'items_per_sec': round(len(events) / elapsed, 1),
+        'peak_mib': round(peak / 1024 / 1024, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--parsers', nargs='+', default=PARSERS, choices=PARSERS)
+    parser.add_argument('--output', default='benchmarks/results-scraper.json')
+    args = parser.parse_args()
+
+    installed = [name for name in args.parsers if name == 'html.parser' or importlib.util.find_spec(name)]
+    skipped = sorted(set(args.parsers) - set(installed))
+    if skipped:
+        print(f'Skipping parsers that are not installed: {", ".join(skipped)}')
+
+    results = []
+    print(f'{"items":>8} {"parser":<12}{"progress":<10}{"seconds":>10}{"items/s":>12}{"peak MiB":>10}')
+    for items in args.items:
+        html = synthetic_timeline(items)
+        for backend in installed:
+            for progress in (True, False):
+                result = {'items': items, 'parser': backend, 'progress': progress, **measure(html, backend, progress)}
+                results.append(result)
+                print(
+                    f'{items:>8} {backend:<12}{"on" if progress else "off":<10}{result["seconds"]:>10}'
+                    f'{result["items_per_sec"]:>12}{result["peak_mib"]:>10}'
+                )
+
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(results, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
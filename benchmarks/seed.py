@@ -0,0 +1,171 @@
+"""
+Seed the database configured by the POSTGRES_* settings with realistic volumes for the benchmarks.
+
+The tables are dropped and recreated, point POSTGRES_DB at a throwaway database:
+
+    POSTGRES_DB=pythonfloripa_bench python -m benchmarks.seed --events 1000 --talks 50000
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.ext.database.db import build_engine
+from src.resources import Base
+from src.resources.events.model import Event
+from src.resources.speakers.model import Speaker
+from src.resources.talks.model import Talk
+from src.resources.users.model import User, UserProfile
+from src.resources.users.repository import password_context
+from src.settings import get_settings
+from src.utils import generate_ulid
+
+CHUNK_SIZE = 5000
+FIRST_EVENT = datetime(2015, 1, 1, 19, 0, tzinfo=timezone.utc)
+
+
+@dataclass(frozen=True)
+class Volumes:
+    events: int = 1000
+    talks: int = 50000
+    speakers: int = 20000
+    users: int = 100000
+
+
+async def _insert(engine: AsyncEngine, model: type, rows: list[dict]) -> None:
+    async with engine.begin() as conn:
+        for start in range(0, len(rows), CHUNK_SIZE):
+            await conn.execute(insert(model), rows[start : start + CHUNK_SIZE])
+
+
+def _events(count: int) -> list[dict]:
+    rows = []
+    for edition in range(1, count + 1):
+        start_date = FIRST_EVENT + timedelta(weeks=edition)
+        rows.append({
+            'id': generate_ulid(),
+            'edition': edition,
+            'title': f'Python Floripa #{edition}',
+            'description': f'Encontro número {edition} da comunidade Python Floripa. ' * 5,
+            'start_date': start_date,
+            'end_date': start_date + timedelta(hours=3),
+            'location': 'Florianópolis, SC',
+            'image_url': f'https://example.com/events/{edition}.jpg',
+            'is_active': True,
+            'is_published': True,
+        })
+    return rows
+
+
+def _speakers(count: int) -> list[dict]:
+    return [
+        {
+            'id': generate_ulid(),
+            'name': f'Speaker {number}',
+            'email': f'speaker{number}@example.com',
+            'linkedin_url': f'https://linkedin.com/in/speaker{number}',
+            'github_url': f'https://github.com/speaker{number}',
+            'twitter_url': f'https://twitter.com/speaker{number}',
+            'website_url': f'https://speaker{number}.example.com',
+            'bio': f'Bio of speaker {number}. ' * 10,
+            'image_url': f'https://example.com/speakers/{number}.jpg',
+        }
+        for number in range(count)
+    ]
+
+
+def _talks(count: int, events: list[dict], speakers: list[dict]) -> list[dict]:
+    rows = []
+    for number in range(count):
+        event = events[number % len(events)]
+        start_time = event['start_date'] + timedelta(minutes=30 * (number // len(events) % 6))
+        rows.append({
+            'id': generate_ulid(),
+            'title': f'Talk {number}',
+            'description': f'Description of talk {number}. ' * 5,
+            'start_time': start_time,
+            'end_time': start_time + timedelta(minutes=30),
+            'event_id': event['id'],
+            'speaker_id': random.choice(speakers)['id'],
+        })
+    return rows
+
+
+def _users(count: int) -> tuple[list[dict], list[dict]]:
+    # Hashing is deliberately slow, every seeded user shares the same password.
+    hashed_password = password_context().hash('benchmark123')
+    users, profiles = [], []
+    for number in range(count):
+        user_id = generate_ulid()
+        users.append({
+            'id': user_id,
+            'username': f'user{number}',
+            'email': f'user{number}@example.com',
+            'hashed_password': hashed_password,
+            'is_active': True,
+            'is_superuser': False,
+        })
+        profiles.append({
+            'id': generate_ulid(),
+            'user_id': user_id,
+            'full_name': f'User {number}',
+            'github_url': f'https://github.com/user{number}',
+            'bio': f'Bio of user {number}.',
+        })
+    return users, profiles
+
+
+async def seed(engine: AsyncEngine, volumes: Volumes) -> None:
+    """Recreate every table and fill it with `volumes` rows."""
+    random.seed(0)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    events = _events(volumes.events)
+    speakers = _speakers(volumes.speakers)
+    users, profiles = _users(volumes.users)
+
+    await _insert(engine, Event, events)
+    await _insert(engine, Speaker, speakers)
+    await _insert(engine, Talk, _talks(volumes.talks, events, speakers))
+    await _insert(engine, User, users)
+    await _insert(engine, UserProfile, profiles)
+
+    async with engine.begin() as conn:
+        await conn.exec_driver_sql('ANALYZE')
+
+
+def add_volume_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = Volumes()
+    parser.add_argument('--events', type=int, default=defaults.events)
+    parser.add_argument('--talks', type=int, default=defaults.talks)
+    parser.add_argument('--speakers', type=int, default=defaults.speakers)
+    parser.add_argument('--users', type=int, default=defaults.users)
+
+
+def volumes_from_arguments(args: argparse.Namespace) -> Volumes:
+    return Volumes(events=args.events, talks=args.talks, speakers=args.speakers, users=args.users)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_volume_arguments(parser)
+    volumes = volumes_from_arguments(parser.parse_args())
+
+    engine = build_engine(get_settings())
+    start = time.perf_counter()
+    await seed(engine, volumes)
+    await engine.dispose()
+    print(f'Seeded {volumes} in {time.perf_counter() - start:.1f}s')
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,90 @@
+"""
+Startup-time budget for the API.
+
+Imports the app in fresh interpreters under `python -X importtime`, which is what a worker does on boot,
+and reports the median import time along with the packages that account for most of it:
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --budget-ms 800
+
+The exit status is 1 when the median import time is over `--budget-ms`.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from collections import Counter
+
+TARGET = 'src.app'
+
+
+def import_times(module: str) -> list[tuple[str, int, int]]:
+    """(module, self µs, cumulative µs) for every module imported by `import <module>` in a new interpreter."""
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix('import time:').split('|')
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def by_package(rows: list[tuple[str, int, int]]) -> Counter:
+    """Self time summed per top-level package, so `sqlalchemy.orm.*` counts towards `sqlalchemy`."""
+    packages = Counter()
+    for name, self_us, _ in rows:
+        packages[name.split('.')[0]] += self_us
+    return packages
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--module', default=TARGET)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15, help='packages to list')
+    parser.add_argument('--budget-ms', type=float, help='fail when the median import time is over it')
+    parser.add_argument('--output', default='benchmarks/results-startup.json')
+    args = parser.parse_args()
+
+    runs = [import_times(args.module) for _ in range(args.runs)]
+    totals = [next(cumulative for name, _, cumulative in rows if name == args.module) for rows in runs]
+    median_ms = statistics.median(totals) / 1000
+
+    # Package shares come from the median run, the first ones pay for cold disk caches.
+    median_run = runs[totals.index(sorted(totals)[len(totals) // 2])]
+    packages = by_package(median_run)
+
+    print(f'import {args.module}: median {median_ms:.1f} ms over {args.runs} runs ({len(median_run)} modules)')
+    print(f'{"package":<30}{"self ms":>10}{"share":>8}')
+    for package, self_us in packages.most_common(args.top):
+        print(f'{package:<30}{self_us / 1000:>10.1f}{self_us / sum(packages.values()):>8.0%}')
+
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(
+            {
+                'module': args.module,
+                'median_ms': round(median_ms, 1),
+                'runs_ms': [round(total / 1000, 1) for total in totals],
+                'modules': len(median_run),
+                'packages_ms': {package: round(self_us / 1000, 1) for package, self_us in packages.most_common()},
+            },
+            file,
+            indent=2,
+        )
+
+    if args.budget_ms is not None and median_ms > args.budget_ms:
+        print(f'OVER BUDGET {median_ms:.1f} ms > {args.budget_ms} ms')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
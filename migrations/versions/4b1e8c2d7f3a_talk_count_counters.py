@@ -0,0 +1,77 @@
+"""talk-count-counters
+
+Revision ID: 4b1e8c2d7f3a
+Revises: 931d6e42a48b
+Create Date: 2025-06-02 19:12:44.318205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b1e8c2d7f3a'
+down_revision: Union[str, None] = '931d6e42a48b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('events', sa.Column('talk_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('speakers', sa.Column('talk_count', sa.Integer(), server_default='0', nullable=False))
+
+    op.execute("""
+    CREATE OR REPLACE FUNCTION talks_maintain_talk_count() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' OR (TG_OP = 'UPDATE' AND NEW.event_id IS DISTINCT FROM OLD.event_id) THEN
+            UPDATE events SET talk_count = talk_count + 1 WHERE id = NEW.event_id;
+        END IF;
+        IF TG_OP = 'DELETE' OR (TG_OP = 'UPDATE' AND NEW.event_id IS DISTINCT FROM OLD.event_id) THEN
+            UPDATE events SET talk_count = talk_count - 1 WHERE id = OLD.event_id;
+        END IF;
+        IF TG_OP = 'INSERT' OR (TG_OP = 'UPDATE' AND NEW.speaker_id IS DISTINCT FROM OLD.speaker_id) THEN
+            UPDATE speakers SET talk_count = talk_count + 1 WHERE id = NEW.speaker_id;
+        END IF;
+        IF TG_OP = 'DELETE' OR (TG_OP = 'UPDATE' AND NEW.speaker_id IS DISTINCT FROM OLD.speaker_id) THEN
+            UPDATE speakers SET talk_count = talk_count - 1 WHERE id = OLD.speaker_id;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+    CREATE TRIGGER talks_talk_count_insert_delete
+    AFTER INSERT OR DELETE ON talks
+    FOR EACH ROW EXECUTE FUNCTION talks_maintain_talk_count()
+    """)
+    op.execute("""
+    CREATE TRIGGER talks_talk_count_update
+    AFTER UPDATE OF event_id, speaker_id ON talks
+    FOR EACH ROW
+    WHEN (OLD.event_id IS DISTINCT FROM NEW.event_id OR OLD.speaker_id IS DISTINCT FROM NEW.speaker_id)
+    EXECUTE FUNCTION talks_maintain_talk_count()
+    """)
+
+    # Backfill the counters for rows that existed before the triggers.
+    op.execute("""
+    UPDATE events SET talk_count = counts.total
+    FROM (SELECT event_id, count(*) AS total FROM talks GROUP BY event_id) AS counts
+    WHERE events.id = counts.event_id
+    """)
+    op.execute("""
+    UPDATE speakers SET talk_count = counts.total
+    FROM (SELECT speaker_id, count(*) AS total FROM talks GROUP BY speaker_id) AS counts
+    WHERE speakers.id = counts.speaker_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DROP TRIGGER IF EXISTS talks_talk_count_update ON talks')
+    op.execute('DROP TRIGGER IF EXISTS talks_talk_count_insert_delete ON talks')
+    op.execute('DROP FUNCTION IF EXISTS talks_maintain_talk_count()')
+    op.drop_column('speakers', 'talk_count')
+    op.drop_column('events', 'talk_count')
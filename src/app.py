@@ -1,19 +1,165 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+from pathlib import Path
+from typing import Optional
+
 from fastapi import FastAPI
 
+from src.ext.admission.middleware import AdmissionControlMiddleware, Limit
+from src.ext.cache.backends import FileBackend, MemoryBackend
+from src.ext.cache.response_cache import ResponseCacheMiddleware, response_cache
+from src.ext.compression.middleware import CompressionMiddleware
+from src.ext.database.db import build_engine, build_session_maker
+from src.ext.database.replicas import Replica, Replicas
+from src.ext.database.warmup import warm_up_until_ready
+from src.ext.deadline.middleware import DeadlineMiddleware
+from src.ext.debug.loop_monitor import LoopMonitor
+from src.ext.debug.memory import MemoryProfilingMiddleware
+from src.ext.debug.router import router as debug_router
+from src.ext.health.probe import ReadinessProbe, migration_heads
+from src.ext.health.router import router as health_router
+from src.ext.idempotency.middleware import IdempotencyMiddleware
+from src.ext.idempotency.store import IdempotencyKeys
+from src.ext.log.middleware import AccessLogMiddleware
+from src.ext.log.setup import configure_logging
+from src.ext.metrics.metrics import mark_process_dead
+from src.ext.metrics.middleware import MetricsMiddleware
+from src.ext.metrics.router import router as metrics_router
+from src.ext.metrics.server_timing import ServerTimingMiddleware
+from src.ext.singleflight.middleware import SingleFlightMiddleware
 from src.resources.events.router import router as events_router
 from src.resources.speakers.router import router as speakers_router
 from src.resources.talks.router import router as talks_router
 from src.resources.users.router import router as users_router
+from src.settings import Settings, get_settings
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Own the process-wide resources: logging, the event loop monitor and the database engine.
+
+    Connection warm-up and the readiness probe run in the background so startup doesn't block on the
+    database, `/health/ready` reports 503 until warm-up is done and the probe found the database migrated.
+    """
+    settings: Settings = app.state.settings
+    log_listener = configure_logging(settings.LOG_LEVEL, settings.LOG_JSON, settings.LOG_SAMPLE_RATES)
+    loop_monitor = LoopMonitor(
+        interval=settings.LOOP_LAG_INTERVAL_MS / 1000,
+        blocking_threshold=settings.BLOCKING_THRESHOLD_MS / 1000 if settings.DEBUG else None,
+    )
+    loop_monitor.start()
+
+    engine = build_engine(settings)
+    app.state.engine = engine
+    app.state.session_maker = build_session_maker(engine)
+    replica_engines = [build_engine(settings, url) for url in settings.REPLICA_DATABASE_URLS]
+    app.state.replicas = Replicas(
+        [Replica(replica_engine, build_session_maker(replica_engine)) for replica_engine in replica_engines],
+        max_lag=settings.REPLICA_MAX_LAG_MS / 1000,
+        interval=settings.REPLICA_LAG_INTERVAL_MS / 1000,
+        read_your_writes=settings.REPLICA_READ_YOUR_WRITES_MS / 1000,
+    )
+    app.state.replicas.start()
+    app.state.ready = False
+    warm_up = asyncio.create_task(
+        warm_up_until_ready(app.state, engine, min(settings.DB_WARMUP_CONNECTIONS, settings.pool_limits()[0]))
+    )
+    app.state.readiness_probe = ReadinessProbe(
+        engine,
+        interval=settings.READINESS_INTERVAL_MS / 1000,
+        timeout=settings.READINESS_TIMEOUT_MS / 1000,
+        expected_heads=migration_heads(),
+    )
+    app.state.readiness_probe.start()
+    app.state.idempotency_keys = IdempotencyKeys(
+        engine,
+        ttl=settings.IDEMPOTENCY_KEY_TTL,
+        lock_timeout=settings.IDEMPOTENCY_LOCK_TIMEOUT,
+        cleanup_interval=settings.IDEMPOTENCY_CLEANUP_INTERVAL,
+    )
+    app.state.idempotency_keys.start()
+
+    yield
+
+    app.state.ready = False
+    warm_up.cancel()
+    with suppress(asyncio.CancelledError):
+        await warm_up
+    await app.state.readiness_probe.stop()
+    await app.state.idempotency_keys.stop()
+    await app.state.replicas.stop()
+    await engine.dispose()
+    await loop_monitor.stop()
+    mark_process_dead()
+    log_listener.stop()
+
+
+def create_app(settings: Optional[Settings] = None) -> FastAPI:
+    settings = settings or get_settings()
+
+    app = FastAPI(lifespan=lifespan)
+    app.state.settings = settings
+    app.add_middleware(MemoryProfilingMiddleware, enabled=settings.MEMORY_PROFILING)
+    # Inside admission control, the time spent queueing for admission has its own limit.
+    app.add_middleware(
+        DeadlineMiddleware,
+        default_timeout=settings.REQUEST_TIMEOUT_MS / 1000 if settings.REQUEST_TIMEOUT_MS >= 0 else None,
+        exempt=('/health', '/metrics', '/_debug'),
+    )
+    # Outside the deadline, so a timed out request releases its key; inside admission control, so a shed
+    # request never claims one, which would add database round trips to a pool already too busy.
+    app.add_middleware(IdempotencyMiddleware)
+    if settings.ADMISSION_CONTROL:
+        # Inside single-flight, so only the leader of coalesced requests takes an admission slot.
+        app.add_middleware(
+            AdmissionControlMiddleware,
+            limits={
+                name: Limit(concurrency=concurrency, queue=settings.ADMISSION_QUEUE.get(name, 0))
+                for name, concurrency in settings.ADMISSION_CONCURRENCY.items()
+            },
+            queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT_MS / 1000,
+            max_pool_wait=(
+                settings.ADMISSION_MAX_POOL_WAIT_MS / 1000 if settings.ADMISSION_MAX_POOL_WAIT_MS >= 0 else None
+            ),
+            exempt=('/health', '/metrics', '/_debug'),
+        )
+    app.add_middleware(SingleFlightMiddleware)
+    if settings.RESPONSE_CACHE:
+        if not settings.RESPONSE_CACHE_DIR and (settings.WORKERS or 1) > 1:
+            # A write would only invalidate the cache of the worker that served it.
+            raise RuntimeError('RESPONSE_CACHE_DIR must be set to share the response cache between workers')
+        response_cache.backend = (
+            FileBackend(Path(settings.RESPONSE_CACHE_DIR))
+            if settings.RESPONSE_CACHE_DIR
+            else MemoryBackend(settings.RESPONSE_CACHE_MAX_ENTRIES)
+        )
+        # Outside single-flight, so hits never wait on it while concurrent misses are still coalesced.
+        app.add_middleware(ResponseCacheMiddleware, cache=response_cache)
+    # Outside single-flight, so coalesced followers share the cached compressed body.
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        thread_minimum_size=settings.COMPRESSION_THREAD_MIN_SIZE,
+        cache_bytes=settings.COMPRESSION_CACHE_BYTES,
+    )
+    app.add_middleware(ServerTimingMiddleware, enabled=settings.SERVER_TIMING, token=settings.SERVER_TIMING_TOKEN)
+    app.add_middleware(MetricsMiddleware)
+    app.add_middleware(AccessLogMiddleware)
 
-app = FastAPI()
+    @app.get('/')
+    async def root():
+        return {'message': 'Hello World'}
 
+    app.include_router(users_router)
+    app.include_router(events_router)
+    app.include_router(talks_router)
+    app.include_router(speakers_router)
+    app.include_router(health_router)
+    app.include_router(metrics_router)
+    app.include_router(debug_router)
 
-@app.get('/')
-async def root():
-    return {'message': 'Hello World'}
+    return app
 
 
-app.include_router(users_router)
-app.include_router(events_router)
-app.include_router(talks_router)
-app.include_router(speakers_router)
+app = create_app()
@@ -0,0 +1,132 @@
+import asyncio
+import math
+from dataclasses import dataclass
+from http import HTTPStatus
+from typing import Optional
+
+from starlette.responses import JSONResponse
+from starlette.routing import Match
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.ext.metrics.metrics import ADMISSION_IN_FLIGHT, ADMISSION_QUEUE_WAIT, ADMISSION_REJECTED, RECENT_POOL_WAIT
+
+READ_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS'})
+
+
+def admission_class(name: str):
+    """
+    Put an endpoint in its own admission class instead of `read` or `write`.
+    Used for endpoints much more expensive than their peers, such as the ones hashing passwords.
+    """
+
+    def decorator(endpoint):
+        endpoint.__admission_class__ = name
+        return endpoint
+
+    return decorator
+
+
+@dataclass
+class Limit:
+    concurrency: int
+    queue: int
+
+
+class _Gate:
+    """Up to `concurrency` requests run at once, up to `queue` more wait their turn in arrival order."""
+
+    def __init__(self, limit: Limit):
+        self.limit = limit
+        self.semaphore = asyncio.Semaphore(limit.concurrency)
+        self.waiting = 0
+
+    def queue_full(self) -> bool:
+        return self.semaphore.locked() and self.waiting >= self.limit.queue
+
+    async def acquire(self, timeout: float) -> None:
+        self.waiting += 1
+        try:
+            async with asyncio.timeout(timeout):
+                await self.semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+    def release(self) -> None:
+        self.semaphore.release()
+
+
+class AdmissionControlMiddleware:
+    """
+    ASGI middleware that caps the concurrent requests of each admission class and sheds the excess.
+
+    Requests are in the `read` or `write` class by method, unless their endpoint is marked with
+    `admission_class`. A request over its class limit waits in a queue for at most `queue_timeout`
+    seconds; it is rejected with 503 and `Retry-After` right away when the queue is full, when that
+    deadline passes, or while requests wait longer than `max_pool_wait` seconds for a database connection.
+    Failing fast keeps the latency of admitted requests bounded instead of queueing everyone on the pool.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limits: dict[str, Limit],
+        queue_timeout: float,
+        max_pool_wait: Optional[float] = None,
+        exempt: tuple[str, ...] = (),
+    ):
+        self.app = app
+        self.gates = {name: _Gate(limit) for name, limit in limits.items()}
+        self.queue_timeout = queue_timeout
+        self.max_pool_wait = max_pool_wait
+        self.exempt = exempt
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http' or scope['path'].startswith(self.exempt):
+            await self.app(scope, receive, send)
+            return
+
+        name = self._admission_class(scope)
+        gate = self.gates.get(name)
+        if gate is None:
+            await self.app(scope, receive, send)
+            return
+
+        if self.max_pool_wait is not None and RECENT_POOL_WAIT.value() > self.max_pool_wait:
+            await self._reject(name, 'pool_wait', scope, receive, send)
+            return
+        if gate.queue_full():
+            await self._reject(name, 'queue_full', scope, receive, send)
+            return
+
+        with ADMISSION_QUEUE_WAIT.labels(name).time():
+            try:
+                await gate.acquire(self.queue_timeout)
+            except TimeoutError:
+                await self._reject(name, 'queue_timeout', scope, receive, send)
+                return
+
+        ADMISSION_IN_FLIGHT.labels(name).inc()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            ADMISSION_IN_FLIGHT.labels(name).dec()
+            gate.release()
+
+    def _admission_class(self, scope: Scope) -> str:
+        for route in scope['app'].router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                name = getattr(getattr(route, 'endpoint', None), '__admission_class__', None)
+                if name is not None:
+                    return name
+                break
+        return 'read' if scope['method'] in READ_METHODS else 'write'
+
+    async def _reject(self, name: str, reason: str, scope: Scope, receive: Receive, send: Send) -> None:
+        ADMISSION_REJECTED.labels(name, reason).inc()
+        response = JSONResponse(
+            {'detail': 'Server is overloaded, retry later'},
+            status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+            headers={'Retry-After': str(max(1, math.ceil(self.queue_timeout)))},
+        )
+        await response(scope, receive, send)
@@ -0,0 +1,112 @@
+import hashlib
+import os
+import struct
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+# Files of the filesystem backend start with their expiry time, zero for entries that don't expire.
+EXPIRY = struct.Struct('<d')
+# The filesystem backend removes expired files every this many writes.
+PRUNE_EVERY = 1000
+
+
+class CacheBackend(ABC):
+    """Byte store with per-entry expiry behind the response cache."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]: ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        """Store `value` for `ttl` seconds, or until evicted when `ttl` is None."""
+
+    @abstractmethod
+    async def clear(self) -> None: ...
+
+
+class MemoryBackend(CacheBackend):
+    """
+    LRU of at most `max_entries` entries in the worker's memory.
+    Each worker has its own, so an invalidation only reaches the worker that served the write;
+    the other workers serve their copy until it expires.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires and expires < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        self._entries[key] = (time.monotonic() + ttl if ttl is not None else 0.0, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+
+
+class FileBackend(CacheBackend):
+    """
+    One file per entry in `directory`, shared by every worker on the host.
+    Point it to a directory in /dev/shm to keep the entries in shared memory. Files are small and
+    usually in the page cache, so they are read and written inline; writes go through a temporary file
+    and a rename, so readers never see half of an entry.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._writes = 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / hashlib.sha256(key.encode()).hexdigest()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        try:
+            data = self._path(key).read_bytes()
+        except FileNotFoundError:
+            return None
+        (expires,) = EXPIRY.unpack_from(data)
+        if expires and expires < time.time():
+            return None
+        return data[EXPIRY.size :]
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        path = self._path(key)
+        temporary = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+        temporary.write_bytes(EXPIRY.pack(time.time() + ttl if ttl is not None else 0.0) + value)
+        temporary.replace(path)
+
+        self._writes += 1
+        if self._writes % PRUNE_EVERY == 0:
+            self.prune()
+
+    def prune(self) -> None:
+        """Remove the expired entries."""
+        now = time.time()
+        for path in self.directory.iterdir():
+            try:
+                with path.open('rb') as file:
+                    (expires,) = EXPIRY.unpack(file.read(EXPIRY.size))
+                if expires and expires < now:
+                    path.unlink()
+            except (FileNotFoundError, struct.error):
+                continue
+
+    async def clear(self) -> None:
+        for path in self.directory.iterdir():
+            path.unlink(missing_ok=True)
@@ -0,0 +1,218 @@
+import functools
+import hashlib
+import json
+import time
+import uuid
+from dataclasses import dataclass
+from http import HTTPStatus
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import HTTPConnection
+from starlette.routing import BaseRoute, Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.ext.cache.backends import CacheBackend, MemoryBackend
+from src.ext.database.db import primary_reads, wrote_recently
+from src.ext.metrics.metrics import RESPONSE_CACHE
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    ttl: float
+    tags: tuple[str, ...]
+
+
+def cache_response(ttl: float, tags: tuple[str, ...]):
+    """
+    Cache the responses of a public GET endpoint for `ttl` seconds.
+    Writes through a repository marked with `invalidates_cache` for one of the `tags` drop them.
+    """
+
+    def decorator(endpoint):
+        endpoint.__cache_policy__ = CachePolicy(ttl, tags)
+        return endpoint
+
+    return decorator
+
+
+def _cache_control(header: Optional[str]) -> set[str]:
+    return {directive.strip().lower() for directive in (header or '').split(',') if directive.strip()}
+
+
+def _vary(headers: Headers) -> list[str]:
+    return sorted({name.strip().lower() for name in headers.get('vary', '').split(',') if name.strip()})
+
+
+class ResponseCache:
+    """
+    Stores responses in a `CacheBackend`, keyed by URL, the request headers they vary on and their tags.
+
+    Every tag has a version, part of the key of the responses cached under it. Invalidating a tag
+    replaces its version, so all those responses stop matching at once and age out of the backend.
+    """
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+
+    async def versions(self, tags: tuple[str, ...]) -> list[str]:
+        """
+        Current versions of `tags`.
+        Read before the endpoint runs, so a response built from data a concurrent write changed is stored
+        under the versions that write replaced, where nothing will look it up.
+        """
+        return [(await self.backend.get(f'tag:{tag}') or b'').decode() for tag in tags]
+
+    async def invalidate(self, *tags: str) -> None:
+        for tag in tags:
+            await self.backend.set(f'tag:{tag}', uuid.uuid4().hex.encode())
+
+    @staticmethod
+    def _url(scope: Scope) -> str:
+        return f'{scope["path"]}?{scope["query_string"].decode("latin-1")}'
+
+    def _key(self, scope: Scope, versions: list[str], vary: list[str]) -> str:
+        headers = Headers(scope=scope)
+        parts = [self._url(scope), *(f'{name}={headers.get(name, "")}' for name in vary), *versions]
+        return 'response:' + hashlib.sha256('\n'.join(parts).encode()).hexdigest()
+
+    async def get(self, scope: Scope, versions: list[str]) -> Optional[tuple[dict, bytes]]:
+        # The request headers responses to this URL vary on are known once one of them was stored.
+        vary = await self.backend.get(f'vary:{self._url(scope)}')
+        stored = await self.backend.get(self._key(scope, versions, json.loads(vary) if vary else []))
+        if stored is None:
+            return None
+        meta, _, body = stored.partition(b'\n')
+        return json.loads(meta), body
+
+    async def set(self, scope: Scope, versions: list[str], ttl: float, start: Message, body: bytes) -> None:
+        vary = _vary(Headers(raw=start['headers']))
+        await self.backend.set(f'vary:{self._url(scope)}', json.dumps(vary).encode(), ttl)
+        meta = {
+            'status': start['status'],
+            'headers': [[name.decode('latin-1'), value.decode('latin-1')] for name, value in start['headers']],
+            'stored_at': time.time(),
+        }
+        await self.backend.set(self._key(scope, versions, vary), json.dumps(meta).encode() + b'\n' + body, ttl)
+
+    async def clear(self) -> None:
+        await self.backend.clear()
+
+
+# Process-wide, so repositories can invalidate it; create_app picks the backend.
+response_cache = ResponseCache(MemoryBackend())
+
+
+def invalidates_cache(*tags: str):
+    """Class decorator for repositories: their create, update and delete methods invalidate `tags` when they return."""
+
+    def decorator(cls):
+        for name in ('create', 'update', 'delete'):
+            method = getattr(cls, name, None)
+            if method is not None:
+                setattr(cls, name, _invalidating(method, tags))
+        return cls
+
+    return decorator
+
+
+def _invalidating(method, tags):
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        result = await method(*args, **kwargs)
+        await response_cache.invalidate(*tags)
+        return result
+
+    return wrapper
+
+
+class ResponseCacheMiddleware:
+    """
+    ASGI middleware that serves GET requests to endpoints marked with `cache_response` from `cache`.
+
+    Requests sending `Cache-Control: no-cache` skip the lookup and `no-store` skips the cache altogether, as
+    do clients that just wrote, whose reads go to the primary. Misses read from the primary, so a replica
+    that is behind never gets its copy cached under the versions a write just set.
+    Only 200 responses are stored, unless the endpoint marked them `no-store` or `private` or varies on `*`.
+    Cacheable responses are sent with `Cache-Control: public, max-age=<ttl>`, hits also with `Age`.
+    """
+
+    def __init__(self, app: ASGIApp, cache: ResponseCache):
+        self.app = app
+        self.cache = cache
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http' or scope['method'] != 'GET':
+            await self.app(scope, receive, send)
+            return
+
+        route, policy = self._policy(scope)
+        if policy is None:
+            await self.app(scope, receive, send)
+            return
+
+        request_directives = _cache_control(Headers(scope=scope).get('cache-control'))
+        if 'no-store' in request_directives or wrote_recently(HTTPConnection(scope).cookies):
+            RESPONSE_CACHE.labels(route.path, 'bypass').inc()
+            await self.app(scope, receive, send)
+            return
+
+        versions = await self.cache.versions(policy.tags)
+        if 'no-cache' not in request_directives and 'max-age=0' not in request_directives:
+            cached = await self.cache.get(scope, versions)
+            if cached is not None:
+                RESPONSE_CACHE.labels(route.path, 'hit').inc()
+                # Hits skip the router, which stores the matched route for the outer middleware.
+                scope['route'] = route
+                await self._send_cached(cached, send)
+                return
+
+        RESPONSE_CACHE.labels(route.path, 'miss').inc()
+        start: Optional[Message] = None
+        body = []
+
+        async def caching_send(message: Message) -> None:
+            nonlocal start
+            if message['type'] == 'http.response.start':
+                start = message
+                if start['status'] == HTTPStatus.OK:
+                    headers = MutableHeaders(scope=start)
+                    headers.setdefault('cache-control', f'public, max-age={int(policy.ttl)}')
+            elif message['type'] == 'http.response.body' and start is not None:
+                body.append(message.get('body', b''))
+                if not message.get('more_body', False):
+                    await self._store(scope, versions, policy.ttl, start, b''.join(body))
+            await send(message)
+
+        token = primary_reads.set(True)
+        try:
+            await self.app(scope, receive, caching_send)
+        finally:
+            primary_reads.reset(token)
+
+    def _policy(self, scope: Scope) -> tuple[Optional[BaseRoute], Optional[CachePolicy]]:
+        for route in scope['app'].router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route, getattr(getattr(route, 'endpoint', None), '__cache_policy__', None)
+        return None, None
+
+    async def _store(self, scope: Scope, versions: list[str], ttl: float, start: Message, body: bytes) -> None:
+        headers = Headers(raw=start['headers'])
+        if (
+            start['status'] != HTTPStatus.OK
+            or '*' in _vary(headers)
+            or _cache_control(headers.get('cache-control')) & {'no-store', 'private'}
+        ):
+            return
+        await self.cache.set(scope, versions, ttl, start, body)
+
+    @staticmethod
+    async def _send_cached(cached: tuple[dict, bytes], send: Send) -> None:
+        meta, body = cached
+        headers = MutableHeaders(
+            raw=[(name.encode('latin-1'), value.encode('latin-1')) for name, value in meta['headers']]
+        )
+        headers['age'] = str(int(time.time() - meta['stored_at']))
+        await send({'type': 'http.response.start', 'status': meta['status'], 'headers': headers.raw})
+        await send({'type': 'http.response.body', 'body': body})
@@ -0,0 +1,179 @@
+import asyncio
+import gzip
+import hashlib
+import importlib.util
+from collections import OrderedDict
+from http import HTTPStatus
+from typing import Callable, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.ext.metrics.metrics import HTTP_COMPRESSION
+
+
+def _brotli(body: bytes) -> bytes:
+    import brotli  # noqa: PLC0415
+
+    return brotli.compress(body, quality=5)
+
+
+def _gzip(body: bytes) -> bytes:
+    # A fixed mtime keeps the output, and so the cached variants, the same for the same body.
+    return gzip.compress(body, compresslevel=6, mtime=0)
+
+
+# In order of preference, brotli only when it is installed.
+COMPRESSORS: dict[str, Callable[[bytes], bytes]] = {
+    **({'br': _brotli} if importlib.util.find_spec('brotli') else {}),
+    'gzip': _gzip,
+}
+COMPRESSIBLE_TYPES = ('application/json', 'text/', 'application/javascript', 'image/svg+xml')
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """The supported encoding the client prefers, per its `Accept-Encoding` q-values, ours breaking ties."""
+    weights = {}
+    for item in accept_encoding.split(','):
+        name, _, parameters = item.strip().partition(';')
+        weight = 1.0
+        if parameters.strip().startswith('q='):
+            try:
+                weight = float(parameters.strip()[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name.strip().lower()] = weight
+
+    candidates = [
+        (weights.get(encoding, weights.get('*', 0.0)), -preference, encoding)
+        for preference, encoding in enumerate(COMPRESSORS)
+    ]
+    weight, _, encoding = max(candidates)
+    return encoding if weight > 0 else None
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # Weak comparison, as If-None-Match requires.
+    tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+    return '*' in tags or etag.removeprefix('W/') in tags
+
+
+class _VariantCache:
+    """LRU of compressed bodies bounded by their total size."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._items: OrderedDict[tuple, bytes] = OrderedDict()
+
+    def get(self, key: tuple) -> Optional[bytes]:
+        value = self._items.get(key)
+        if value is not None:
+            self._items.move_to_end(key)
+        return value
+
+    def put(self, key: tuple, value: bytes) -> None:
+        if len(value) > self.max_bytes:
+            return
+        if key in self._items:
+            self.size -= len(self._items.pop(key))
+        self._items[key] = value
+        self.size += len(value)
+        while self.size > self.max_bytes:
+            _, evicted = self._items.popitem(last=False)
+            self.size -= len(evicted)
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware that compresses responses of at least `minimum_size` bytes with brotli or gzip.
+
+    Successful GET responses get a weak ETag, a hash of the body unless the endpoint set one, and
+    `If-None-Match` requests for an unchanged body are answered with 304. Compressed bodies are cached
+    by ETag, so a response that doesn't change is compressed once rather than on every request.
+    Bodies of `thread_minimum_size` bytes or more are compressed in a worker thread to keep the event
+    loop free. Streaming responses are passed through untouched.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int, thread_minimum_size: int, cache_bytes: int):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.thread_minimum_size = thread_minimum_size
+        self.cache = _VariantCache(cache_bytes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        start: Optional[Message] = None
+        streaming = False
+
+        async def buffered_send(message: Message) -> None:
+            nonlocal start, streaming
+            if message['type'] == 'http.response.start':
+                start = message
+            elif message['type'] == 'http.response.body' and not streaming:
+                if message.get('more_body', False):
+                    streaming = True
+                    await send(start)
+                    await send(message)
+                else:
+                    await self._respond(scope, request_headers, start, message['body'], send)
+            else:
+                await send(message)
+
+        await self.app(scope, receive, buffered_send)
+
+    async def _respond(self, scope: Scope, request_headers: Headers, start: Message, body: bytes, send: Send):
+        headers = MutableHeaders(raw=list(start['headers']))
+        status = start['status']
+        compressible = 'content-encoding' not in headers and headers.get('content-type', '').startswith(
+            COMPRESSIBLE_TYPES
+        )
+        if compressible:
+            headers.add_vary_header('Accept-Encoding')
+
+        etag = None
+        if scope['method'] == 'GET' and status == HTTPStatus.OK:
+            etag = headers.get('etag') or f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+            headers['etag'] = etag
+            if _etag_matches(request_headers.get('if-none-match', ''), etag):
+                await self._not_modified(start, headers, send)
+                return
+
+        encoding = negotiate(request_headers.get('accept-encoding', '')) if compressible else None
+        if encoding is not None and len(body) >= self.minimum_size:
+            key = (scope['path'], scope['query_string'], etag) if etag else None
+            body = await self._compress(body, encoding, key)
+            headers['content-encoding'] = encoding
+            headers['content-length'] = str(len(body))
+
+        await send({**start, 'headers': headers.raw})
+        await send({'type': 'http.response.body', 'body': body})
+
+    async def _compress(self, body: bytes, encoding: str, key: Optional[tuple]) -> bytes:
+        if key is not None:
+            cached = self.cache.get((*key, encoding))
+            if cached is not None:
+                HTTP_COMPRESSION.labels(encoding, 'cached').inc()
+                return cached
+
+        compress = COMPRESSORS[encoding]
+        if len(body) >= self.thread_minimum_size:
+            compressed = await asyncio.to_thread(compress, body)
+        else:
+            compressed = compress(body)
+        HTTP_COMPRESSION.labels(encoding, 'compressed').inc()
+
+        if key is not None:
+            self.cache.put((*key, encoding), compressed)
+        return compressed
+
+    @staticmethod
+    async def _not_modified(start: Message, headers: MutableHeaders, send: Send) -> None:
+        for name in ('content-length', 'content-type', 'content-encoding'):
+            del headers[name]
+        await send({**start, 'status': HTTPStatus.NOT_MODIFIED, 'headers': headers.raw})
+        await send({'type': 'http.response.body', 'body': b''})
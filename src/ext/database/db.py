@@ -1,26 +1,121 @@
-from typing import AsyncGenerator
+import time
+from contextvars import ContextVar
+from typing import Annotated, AsyncGenerator, Mapping, Optional
 
+from fastapi import Depends, Request, Response
+from sqlalchemy import AsyncAdaptedQueuePool
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
 
-from src.settings import get_settings
+from src.ext.database.loader import EntityLoader
+from src.ext.database.query_log import log_queries
+from src.ext.database.slow_query import log_slow_queries
+from src.ext.database.statement_timeout import DeadlineSession
+from src.ext.metrics.metrics import DB_READ_ROUTING, InstrumentedAsyncQueuePool, instrument_engine
+from src.ext.metrics.server_timing import time_queries
+from src.settings import Settings
+
+READ_PRIMARY_COOKIE = 'read_primary_until'
+READ_METHODS = frozenset({'GET', 'HEAD'})
+
+# Set for reads whose response is about to be cached, which must not be a replica's possibly stale copy.
+primary_reads: ContextVar[bool] = ContextVar('primary_reads', default=False)
+
+
+def build_engine(settings: Settings, url: Optional[str] = None) -> AsyncEngine:
+    """
+    Create an engine with its metrics, Server-Timing hooks and query logs attached.
+    The primary database by default, or the replica at `url`.
+    """
+    pool_size, max_overflow = settings.pool_limits()
+    engine = create_async_engine(
+        url or settings.database_url(),
+        echo=settings.SQL_ECHO,
+        future=True,
+        # Pool waits feed admission control, which protects the primary; a busy replica must not shed writes.
+        poolclass=InstrumentedAsyncQueuePool if url is None else AsyncAdaptedQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+    )
+    if url is None:
+        # The pool gauges describe the primary pool.
+        instrument_engine(engine)
+    time_queries(engine)
+    if settings.LOG_QUERIES:
+        log_queries(engine)
+    if settings.SLOW_QUERY_THRESHOLD_MS >= 0:
+        log_slow_queries(engine, settings.SLOW_QUERY_THRESHOLD_MS, explain=settings.SLOW_QUERY_EXPLAIN)
+    return engine
+
+
+def build_session_maker(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(
+        engine,
+        class_=AsyncSession,
+        sync_session_class=DeadlineSession,
+        expire_on_commit=False,
+    )
+
+
+def wrote_recently(cookies: Mapping[str, str]) -> bool:
+    """Whether the client wrote within the read-your-writes window, per its `read_primary_until` cookie."""
+    try:
+        return float(cookies.get(READ_PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
 
-settings = get_settings()
-engine = create_async_engine(
-    settings.database_url(),
-    echo=True,
-    future=True,
-)
-async_session_maker = async_sessionmaker(
-    engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-)
 
+def _session_maker(request: Request, response: Response) -> async_sessionmaker[AsyncSession]:
+    state = request.app.state
+    if not state.replicas.replicas:
+        return state.session_maker
 
-async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
-    async with async_session_maker() as session:
+    if request.method not in READ_METHODS:
+        # Sends the client's next reads to the primary, which has this write, until replicas caught up.
+        window = state.replicas.read_your_writes
+        response.set_cookie(
+            READ_PRIMARY_COOKIE, str(int(time.time() + window)), max_age=int(window), httponly=True, samesite='lax'
+        )
+        return state.session_maker
+
+    if wrote_recently(request.cookies):
+        DB_READ_ROUTING.labels('primary_read_your_writes').inc()
+        return state.session_maker
+
+    if primary_reads.get():
+        DB_READ_ROUTING.labels('primary_cache_fill').inc()
+        return state.session_maker
+
+    replica = state.replicas.pick()
+    if replica is None:
+        DB_READ_ROUTING.labels('primary_replicas_behind').inc()
+        return state.session_maker
+
+    DB_READ_ROUTING.labels('replica').inc()
+    return replica.session_maker
+
+
+async def get_async_session(request: Request, response: Response) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency that provides a session from the engines the app lifespan created.
+
+    GET requests read from a replica that keeps up with the primary, other requests use the primary.
+    After a write, the client's reads go to the primary for a few seconds so it reads its own writes,
+    and so do reads filling the response cache.
+    """
+    async with _session_maker(request, response)() as session:
         yield session
+
+
+async def get_entity_loader(
+    session: Annotated[AsyncSession, Depends(get_async_session)],
+) -> EntityLoader:
+    """
+    Dependency that provides the request-scoped EntityLoader.
+    FastAPI caches it per request, so every repository in the request shares the same batches.
+    """
+    return EntityLoader(session)
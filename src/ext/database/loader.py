@@ -0,0 +1,92 @@
+import asyncio
+from typing import Any, Hashable, Optional, Sequence
+
+from sqlalchemy import String, any_, bindparam, inspect, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class EntityLoader:
+    """
+    Request-scoped batching loader for entities looked up by primary key.
+
+    Every `load` issued for the same model within one event loop tick is coalesced into a single
+    `id = ANY(:ids)` query, and results (including misses) are memoized for the rest of the request.
+    The loader shares the request session, so queries are serialized to keep it single-use at a time.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self._results: dict[tuple[type, Hashable], asyncio.Future] = {}
+        self._pending: dict[type, list[Hashable]] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._lock = asyncio.Lock()
+
+    async def load(self, model: type, key: Hashable) -> Optional[Any]:
+        """Return the instance of `model` with primary key `key`, or None if it does not exist."""
+        future = self._results.get((model, key))
+
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._results[model, key] = future
+
+            pending = self._pending.setdefault(model, [])
+            if not pending:
+                loop.call_soon(self._dispatch, model)
+            pending.append(key)
+
+        # Shielded so a cancelled caller doesn't cancel the shared result.
+        return await asyncio.shield(future)
+
+    async def load_many(self, model: type, keys: Sequence[Hashable]) -> list[Optional[Any]]:
+        """Return the instances for `keys` in the same order, with None for missing keys."""
+        return list(await asyncio.gather(*(self.load(model, key) for key in keys)))
+
+    def prime(self, instance: Any) -> None:
+        """Memoize an instance that was loaded or created elsewhere in the request."""
+        model = type(instance)
+        (key,) = inspect(instance).identity
+        future = self._results.get((model, key))
+
+        if future is None or future.done():
+            future = asyncio.get_running_loop().create_future()
+            self._results[model, key] = future
+        future.set_result(instance)
+
+    def clear(self, model: type, key: Hashable) -> None:
+        """Forget a memoized result, e.g. after the entity was deleted."""
+        future = self._results.get((model, key))
+
+        if future is not None and future.done():
+            del self._results[model, key]
+
+    def _dispatch(self, model: type) -> None:
+        keys = self._pending.pop(model, [])
+        task = asyncio.ensure_future(self._fetch(model, keys))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _fetch(self, model: type, keys: list[Hashable]) -> None:
+        futures = [self._results[model, key] for key in keys]
+
+        try:
+            (primary_key,) = inspect(model).primary_key
+            query = select(model).where(primary_key == any_(bindparam('ids', keys, type_=ARRAY(String))))
+
+            async with self._lock:
+                result = await self.session.execute(query)
+                found = {inspect(instance).identity[0]: instance for instance in result.scalars()}
+        except BaseException as exc:
+            for key, future in zip(keys, futures):
+                # Failed lookups are not memoized, a later load retries them.
+                self._results.pop((model, key), None)
+                if not future.done():
+                    future.set_exception(exc)
+            if not isinstance(exc, Exception):
+                raise
+            return
+
+        for key, future in zip(keys, futures):
+            if not future.done():
+                future.set_result(found.get(key))
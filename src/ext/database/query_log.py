@@ -0,0 +1,48 @@
+import logging
+import time
+from typing import Callable
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.ext.metrics.metrics import current_repository_method
+
+logger = logging.getLogger('src.sql')
+
+
+def log_queries(engine: AsyncEngine) -> Callable[[], None]:
+    """
+    Log every statement executed on `engine` with its duration and the repository method that issued it;
+    returns a function detaching the log. Parameters are never logged. The `src.sql` logger is a good
+    candidate for LOG_SAMPLE_RATES.
+    """
+
+    def before_cursor_execute(conn, **kw):
+        conn.info.setdefault('query_log_start', []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, statement, **kw):
+        duration = time.perf_counter() - conn.info['query_log_start'].pop()
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                statement,
+                extra={
+                    'duration_ms': round(duration * 1000, 2),
+                    'repository_method': current_repository_method.get(),
+                },
+            )
+
+    def handle_error(context):
+        # A failed statement never reaches after_cursor_execute, its start would stay on the pooled connection.
+        if context.connection is not None and context.connection.info.get('query_log_start'):
+            context.connection.info['query_log_start'].pop()
+
+    event.listen(engine.sync_engine, 'before_cursor_execute', before_cursor_execute, named=True)
+    event.listen(engine.sync_engine, 'after_cursor_execute', after_cursor_execute, named=True)
+    event.listen(engine.sync_engine, 'handle_error', handle_error)
+
+    def detach() -> None:
+        event.remove(engine.sync_engine, 'before_cursor_execute', before_cursor_execute)
+        event.remove(engine.sync_engine, 'after_cursor_execute', after_cursor_execute)
+        event.remove(engine.sync_engine, 'handle_error', handle_error)
+
+    return detach
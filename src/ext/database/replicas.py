@@ -0,0 +1,89 @@
+import asyncio
+import itertools
+import logging
+import time
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from src.ext.metrics.metrics import DB_REPLICA_LAG
+
+logger = logging.getLogger('src.replicas')
+
+# Zero on a primary; on a replica, how far the last replayed transaction is behind, or zero when it
+# has replayed everything it received.
+LAG_QUERY = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+class Replica:
+    def __init__(self, engine: AsyncEngine, session_maker: async_sessionmaker[AsyncSession]):
+        self.engine = engine
+        self.session_maker = session_maker
+        self.name = f'{engine.url.host}:{engine.url.port or 5432}/{engine.url.database}'
+        # Unknown until measured, so a replica gets no traffic before its first lag check.
+        self.lag: Optional[float] = None
+
+
+class Replicas:
+    """
+    Read replicas that GET requests are served from, as long as they keep up with the primary.
+
+    A background task measures the replication lag of every replica each `interval` seconds. Reads go
+    round-robin to the replicas whose lag is at most `max_lag` seconds; when none is, or the lag can't be
+    measured, `pick` returns None and reads fall back to the primary. Clients read from the primary for
+    `read_your_writes` seconds after they write.
+    """
+
+    def __init__(
+        self, replicas: list[Replica], max_lag: float, interval: float, read_your_writes: float, timeout: float = 2.0
+    ):
+        self.replicas = replicas
+        self.max_lag = max_lag
+        self.read_your_writes = read_your_writes
+        self.interval = interval
+        self.timeout = timeout
+        self._turn = itertools.count()
+        self._task: Optional[asyncio.Task] = None
+
+    def pick(self) -> Optional[Replica]:
+        healthy = [replica for replica in self.replicas if replica.lag is not None and replica.lag <= self.max_lag]
+        if not healthy:
+            return None
+        return healthy[next(self._turn) % len(healthy)]
+
+    async def measure(self, replica: Replica) -> None:
+        try:
+            async with asyncio.timeout(self.timeout):
+                async with replica.engine.connect() as conn:
+                    replica.lag = float(await conn.scalar(LAG_QUERY))
+        except Exception:
+            logger.warning('Could not measure the lag of replica %s', replica.name, exc_info=True)
+            replica.lag = None
+            return
+        DB_REPLICA_LAG.labels(replica.name).set(replica.lag)
+
+    async def _run(self) -> None:
+        while True:
+            started = time.monotonic()
+            await asyncio.gather(*(self.measure(replica) for replica in self.replicas))
+            await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def start(self) -> None:
+        if self.replicas:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.gather(*(replica.engine.dispose() for replica in self.replicas))
@@ -0,0 +1,111 @@
+import asyncio
+import logging
+import time
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.ext.metrics.metrics import current_repository_method, current_route
+
+logger = logging.getLogger('src.slow_query')
+
+# Side connections are only opened for a handful of plans at a time, so a burst of slow queries
+# cannot exhaust the pool it is trying to diagnose.
+MAX_PENDING_EXPLAINS = 4
+
+
+def redact(parameters: Any) -> Any:
+    """Replace parameter values with their type (and length for strings and bytes)."""
+    if isinstance(parameters, (list, tuple)):
+        return [redact(value) for value in parameters]
+    if isinstance(parameters, dict):
+        return {key: redact(value) for key, value in parameters.items()}
+    if parameters is None or isinstance(parameters, bool):
+        return parameters
+    if isinstance(parameters, (str, bytes)):
+        return f'<{type(parameters).__name__}:{len(parameters)}>'
+    return f'<{type(parameters).__name__}>'
+
+
+class SlowQueryLog:
+    """
+    Logs statements that take longer than `threshold_ms` to execute.
+
+    Each entry carries the originating route and repository method and the redacted parameters.
+    With `explain` enabled, read-only statements are also re-run with `EXPLAIN (ANALYZE, BUFFERS)`
+    on a side connection in the background, and the plan is logged once it is ready.
+    """
+
+    def __init__(self, engine: AsyncEngine, threshold_ms: float, explain: bool = False):
+        self.engine = engine
+        self.threshold = threshold_ms / 1000
+        self.explain = explain
+        self._tasks: set[asyncio.Task] = set()
+
+    def attach(self) -> None:
+        event.listen(self.engine.sync_engine, 'before_cursor_execute', self._before_cursor_execute, named=True)
+        event.listen(self.engine.sync_engine, 'after_cursor_execute', self._after_cursor_execute, named=True)
+        event.listen(self.engine.sync_engine, 'handle_error', self._handle_error)
+
+    def detach(self) -> None:
+        event.remove(self.engine.sync_engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.remove(self.engine.sync_engine, 'after_cursor_execute', self._after_cursor_execute)
+        event.remove(self.engine.sync_engine, 'handle_error', self._handle_error)
+
+    def _before_cursor_execute(self, conn, **kw) -> None:
+        conn.info.setdefault('slow_query_start', []).append(time.perf_counter())
+
+    @staticmethod
+    def _handle_error(context) -> None:
+        # A failed statement never reaches after_cursor_execute, its start would stay on the pooled connection.
+        if context.connection is not None and context.connection.info.get('slow_query_start'):
+            context.connection.info['slow_query_start'].pop()
+
+    def _after_cursor_execute(self, conn, statement, parameters, **kw) -> None:
+        duration = time.perf_counter() - conn.info['slow_query_start'].pop()
+
+        if duration < self.threshold or conn.get_execution_options().get('slow_query_log') is False:
+            return
+
+        logger.warning(
+            'Slow query (%.1f ms) in %s [%s]: %s; parameters: %s',
+            duration * 1000,
+            current_route() or '-',
+            current_repository_method.get() or '-',
+            statement,
+            redact(parameters),
+        )
+
+        if self.explain and statement.lstrip()[:6].upper() == 'SELECT':
+            self._schedule_explain(statement, parameters)
+
+    def _schedule_explain(self, statement: str, parameters: Any) -> None:
+        if len(self._tasks) >= MAX_PENDING_EXPLAINS:
+            return
+
+        # Cursor events run inside the event loop thread, the plan is captured off the request's path.
+        task = asyncio.get_running_loop().create_task(self._explain(statement, parameters))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _explain(self, statement: str, parameters: Any) -> None:
+        try:
+            async with self.engine.connect() as conn:
+                await conn.execution_options(slow_query_log=False)
+                result = await conn.exec_driver_sql(f'EXPLAIN (ANALYZE, BUFFERS) {statement}', parameters)
+                plan = '\n'.join(row[0] for row in result)
+                # ANALYZE runs the statement, never keep what it did.
+                await conn.rollback()
+        except Exception:
+            logger.exception('Could not capture the plan of a slow query')
+            return
+
+        logger.warning('Plan of slow query: %s\n%s', statement, plan)
+
+
+def log_slow_queries(engine: AsyncEngine, threshold_ms: float, explain: bool = False) -> SlowQueryLog:
+    """Attach a SlowQueryLog to `engine` and return it."""
+    slow_query_log = SlowQueryLog(engine, threshold_ms, explain)
+    slow_query_log.attach()
+    return slow_query_log
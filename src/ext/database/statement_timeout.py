@@ -0,0 +1,36 @@
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+# `time.monotonic()` by which the request being served must be answered, set by DeadlineMiddleware.
+current_deadline: ContextVar[Optional[float]] = ContextVar('current_deadline', default=None)
+
+QUERY_CANCELED = '57014'
+
+
+class DeadlineSession(Session):
+    """Session whose transactions can't outlive the deadline of the request they run in."""
+
+
+@event.listens_for(DeadlineSession, 'after_begin')
+def set_statement_timeout(session, transaction, connection) -> None:
+    """
+    Bound the transaction's statements by the time left before the deadline.
+    Postgres cancels a statement running past it, which frees the connection instead of holding it
+    for as long as the query takes. `SET LOCAL` only lasts until the end of the transaction.
+    """
+    deadline = current_deadline.get()
+    if deadline is None:
+        return
+
+    remaining_ms = max(1, int((deadline - time.monotonic()) * 1000))
+    connection.exec_driver_sql(f'SET LOCAL statement_timeout = {remaining_ms}')
+
+
+def is_statement_timeout(error: BaseException) -> bool:
+    """Whether the error is Postgres cancelling a statement, which is how a statement timeout surfaces."""
+    return isinstance(error, DBAPIError) and getattr(error.orig, 'sqlstate', None) == QUERY_CANCELED
@@ -0,0 +1,83 @@
+import asyncio
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from starlette.datastructures import State
+
+from src.ext.database.loader import EntityLoader
+from src.resources.events.repository import EventRepository
+from src.resources.shared.schemas import PaginationParams
+from src.resources.speakers.repository import SpeakerRepository
+from src.resources.talks.repository import TalkRepository
+from src.resources.users.repository import UserRepository
+
+logger = logging.getLogger('src.warmup')
+
+# A well-formed id that doesn't exist, lookups by id compile and prepare their statements without hydrating rows.
+MISSING_ID = '0' * 26
+MAX_RETRY_DELAY = 30
+
+
+async def _prime(session: AsyncSession) -> None:
+    """Run the hot repository queries once, the way requests run them."""
+    loader = EntityLoader(session)
+    page = PaginationParams()
+    events = EventRepository(session, loader)
+    speakers = SpeakerRepository(session, loader)
+    talks = TalkRepository(session, loader)
+    users = UserRepository(session, loader)
+
+    for repository in (events, speakers, talks, users):
+        await repository.get_by_id(MISSING_ID)
+
+    await events.list_events(page)
+    await speakers.list_speakers(page)
+    await talks.list_talks(page)
+    await users.list_users(page)
+    await users.get_by_email('warm-up@example.com')
+    await users.get_by_username('warm-up')
+
+
+async def _warm_connection(engine: AsyncEngine, barrier: asyncio.Barrier) -> None:
+    try:
+        async with engine.connect() as conn:
+            # Every task holds its connection until all are open, so each one primes a different connection.
+            await barrier.wait()
+            async with AsyncSession(bind=conn, expire_on_commit=False) as session:
+                await _prime(session)
+    except BaseException:
+        await barrier.abort()
+        raise
+
+
+async def warm_up(engine: AsyncEngine, connections: int) -> None:
+    """
+    Open `connections` pool connections and run the hot queries on each of them.
+
+    That moves connection setup, asyncpg type introspection, SQLAlchemy statement compilation and
+    asyncpg statement preparation out of the first requests. Connections beyond the pool size would
+    be closed when returned, so `connections` should not exceed it.
+    """
+    if connections <= 0:
+        return
+
+    barrier = asyncio.Barrier(connections)
+    await asyncio.gather(*(_warm_connection(engine, barrier) for _ in range(connections)))
+
+
+async def warm_up_until_ready(state: State, engine: AsyncEngine, connections: int) -> None:
+    """Warm up the engine, retrying while the database is unavailable, then mark the app as ready."""
+    attempt = 0
+    while True:
+        try:
+            await warm_up(engine, connections)
+        except Exception:
+            delay = min(2**attempt, MAX_RETRY_DELAY)
+            logger.warning('Warm-up failed, retrying in %d s', delay, exc_info=True)
+            await asyncio.sleep(delay)
+            attempt += 1
+        else:
+            break
+
+    state.ready = True
+    logger.info('Warm-up done with %d connections', connections)
@@ -0,0 +1,107 @@
+import asyncio
+import time
+from http import HTTPStatus
+from typing import Optional
+
+from starlette.responses import JSONResponse
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.ext.database.statement_timeout import current_deadline, is_statement_timeout
+from src.ext.metrics.metrics import HTTP_CLIENT_DISCONNECTS, HTTP_REQUEST_TIMEOUTS
+from src.ext.metrics.middleware import UNMATCHED_ROUTE
+
+
+def deadline(seconds: float):
+    """Give an endpoint its own deadline instead of the default one."""
+
+    def decorator(endpoint):
+        endpoint.__deadline__ = seconds
+        return endpoint
+
+    return decorator
+
+
+class DeadlineMiddleware:
+    """
+    ASGI middleware that bounds how long a request may run and stops work nobody is waiting for.
+
+    Each request gets the deadline of its endpoint, set with `deadline`, or `default_timeout` seconds.
+    The deadline is published in `current_deadline`, which database sessions turn into a statement timeout.
+    A request past its deadline, or whose statement timed out, is answered with 504. When the client
+    disconnects first, the request is cancelled, which also cancels the query asyncpg is running.
+    """
+
+    def __init__(self, app: ASGIApp, default_timeout: Optional[float], exempt: tuple[str, ...] = ()):
+        self.app = app
+        self.default_timeout = default_timeout
+        self.exempt = exempt
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http' or scope['path'].startswith(self.exempt):
+            await self.app(scope, receive, send)
+            return
+
+        timeout = self._timeout(scope)
+        task = asyncio.current_task()
+        messages: asyncio.Queue[Message] = asyncio.Queue(maxsize=1)
+        response_started = response_complete = disconnected = False
+
+        async def watch_receive() -> None:
+            # The only reader of `receive`, so a disconnect is noticed even when the endpoint never reads the body.
+            nonlocal disconnected
+            while True:
+                message = await receive()
+                # Servers also report a disconnect once the response is sent, that one is not an abort.
+                if message['type'] == 'http.disconnect' and not response_complete:
+                    disconnected = True
+                    task.cancel()
+                    return
+                await messages.put(message)
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started, response_complete
+            if message['type'] == 'http.response.start':
+                response_started = True
+            elif message['type'] == 'http.response.body' and not message.get('more_body', False):
+                response_complete = True
+            await send(message)
+
+        watcher = asyncio.create_task(watch_receive())
+        token = current_deadline.set(time.monotonic() + timeout if timeout is not None else None)
+        try:
+            async with asyncio.timeout(timeout):
+                await self.app(scope, messages.get, send_wrapper)
+        except TimeoutError:
+            await self._timed_out('deadline', response_started, scope, receive, send)
+        except asyncio.CancelledError:
+            if not disconnected or task.uncancel() > 0:
+                raise
+            HTTP_CLIENT_DISCONNECTS.labels(self._route(scope)).inc()
+        except Exception as error:
+            if not is_statement_timeout(error):
+                raise
+            await self._timed_out('statement_timeout', response_started, scope, receive, send)
+        finally:
+            current_deadline.reset(token)
+            watcher.cancel()
+
+    def _timeout(self, scope: Scope) -> Optional[float]:
+        for route in scope['app'].router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return getattr(getattr(route, 'endpoint', None), '__deadline__', self.default_timeout)
+        return self.default_timeout
+
+    @staticmethod
+    def _route(scope: Scope) -> str:
+        return getattr(scope.get('route'), 'path', UNMATCHED_ROUTE)
+
+    async def _timed_out(self, cause: str, response_started: bool, scope: Scope, receive: Receive, send: Send):
+        HTTP_REQUEST_TIMEOUTS.labels(self._route(scope), cause).inc()
+        if response_started:
+            # Part of the response is out already, the connection can only be cut.
+            raise RuntimeError(f'Request timed out ({cause}) after the response started')
+
+        response = JSONResponse({'detail': 'Request timed out'}, status_code=HTTPStatus.GATEWAY_TIMEOUT)
+        await response(scope, receive, send)
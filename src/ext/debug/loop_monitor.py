@@ -0,0 +1,78 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+
+from src.ext.metrics.metrics import EVENT_LOOP_LAG
+
+logger = logging.getLogger('src.loop_monitor')
+
+
+class LoopMonitor:
+    """
+    Measures event loop lag: how late a sleep scheduled every `interval` seconds wakes up.
+
+    With `blocking_threshold` set, a watchdog thread also checks that the loop keeps waking up,
+    and logs the stack of the event loop thread whenever a callback holds it longer than the threshold,
+    which points at the synchronous call (bcrypt, a big validation, blocking I/O) that stalled every request.
+    """
+
+    def __init__(self, interval: float = 0.1, blocking_threshold: Optional[float] = None):
+        self.interval = interval
+        self.blocking_threshold = blocking_threshold
+        self._heartbeat = time.perf_counter()
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        self._heartbeat = time.perf_counter()
+        self._task = asyncio.get_running_loop().create_task(self._measure())
+
+        if self.blocking_threshold is not None:
+            self._stop.clear()
+            self._watchdog = threading.Thread(
+                target=self._watch, args=(threading.get_ident(),), name='loop-watchdog', daemon=True
+            )
+            self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._watchdog is not None:
+            self._watchdog.join()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _measure(self) -> None:
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self._heartbeat = time.perf_counter()
+            EVENT_LOOP_LAG.observe(max(self._heartbeat - start - self.interval, 0.0))
+
+    def _watch(self, loop_thread_id: int) -> None:
+        reported = None
+        while not self._stop.wait(self.blocking_threshold / 2):
+            heartbeat = self._heartbeat
+            blocked = time.perf_counter() - heartbeat - self.interval
+            if blocked < self.blocking_threshold or heartbeat == reported:
+                continue
+
+            frame = sys._current_frames().get(loop_thread_id)
+            if frame is None:
+                return
+
+            # Only once per stall, the loop may stay blocked for many watchdog checks.
+            reported = heartbeat
+            logger.warning(
+                'Event loop blocked for more than %.0f ms:\n%s',
+                blocked * 1000,
+                ''.join(traceback.format_stack(frame)),
+            )
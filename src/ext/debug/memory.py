@@ -0,0 +1,133 @@
+import asyncio
+import itertools
+import logging
+import tracemalloc
+from collections import OrderedDict
+from typing import Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.ext.metrics.metrics import HTTP_REQUEST_PEAK_MEMORY
+
+logger = logging.getLogger('src.memory')
+
+TOP_SITES = 5
+MAX_SNAPSHOTS = 5
+
+# Allocations made by tracemalloc itself and by the import system are noise in every report.
+_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+)
+
+
+def _snapshot() -> tracemalloc.Snapshot:
+    return tracemalloc.take_snapshot().filter_traces(_FILTERS)
+
+
+def _format_stat(stat: tracemalloc.StatisticDiff) -> str:
+    return f'{stat.traceback[0]}: {stat.size_diff / 1024:+.1f} KiB ({stat.count_diff:+d} blocks)'
+
+
+class MemoryProfilingMiddleware:
+    """
+    ASGI middleware that reports the peak memory allocated while serving each request.
+
+    The peak is returned in the `X-Memory-Peak` header and exported per route, and the allocation
+    sites still holding the most memory when the response starts are logged. tracemalloc counts
+    allocations for the whole process, so requests are profiled one at a time while it is enabled:
+    this is a diagnostic mode for sizing workers, not something to leave on in production.
+    """
+
+    def __init__(self, app: ASGIApp, enabled: bool = False):
+        self.app = app
+        self.enabled = enabled
+        self._lock = asyncio.Lock()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http' or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+        async with self._lock:
+            await self._profile(scope, receive, send)
+
+    async def _profile(self, scope: Scope, receive: Receive, send: Send) -> None:
+        before = _snapshot()
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        top: list[tracemalloc.StatisticDiff] = []
+
+        async def send_wrapper(message: Message) -> None:
+            if message['type'] == 'http.response.start':
+                # The body is rendered and the ORM objects are still referenced, this is close to the peak.
+                top.extend(_snapshot().compare_to(before, 'lineno')[:TOP_SITES])
+                peak = tracemalloc.get_traced_memory()[1] - baseline
+                MutableHeaders(scope=message).append('X-Memory-Peak', str(peak))
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+        route = getattr(scope.get('route'), 'path', scope['path'])
+        HTTP_REQUEST_PEAK_MEMORY.labels(scope['method'], route).observe(peak)
+        logger.info(
+            '%s %s peak memory %.1f KiB, top allocation sites:\n%s',
+            scope['method'],
+            route,
+            peak / 1024,
+            '\n'.join(_format_stat(stat) for stat in top),
+        )
+
+
+class HeapSnapshots:
+    """
+    Heap snapshots kept in memory so two points in time can be diffed to find what keeps growing.
+    Tracing starts with the first snapshot and only covers allocations made after it.
+    """
+
+    def __init__(self, limit: int = MAX_SNAPSHOTS):
+        self.limit = limit
+        self._snapshots: OrderedDict[int, tracemalloc.Snapshot] = OrderedDict()
+        self._ids = itertools.count(1)
+
+    def take(self) -> int:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+        snapshot_id = next(self._ids)
+        self._snapshots[snapshot_id] = _snapshot()
+        while len(self._snapshots) > self.limit:
+            self._snapshots.popitem(last=False)
+        return snapshot_id
+
+    def diff(self, snapshot_id: int, limit: int) -> Optional[list[dict]]:
+        """Allocation sites that grew the most since the snapshot, or None if it doesn't exist."""
+        snapshot = self._snapshots.get(snapshot_id)
+        if snapshot is None:
+            return None
+
+        stats = _snapshot().compare_to(snapshot, 'lineno')[:limit]
+        return [
+            {
+                'site': str(stat.traceback[0]),
+                'size_diff': stat.size_diff,
+                'count_diff': stat.count_diff,
+                'size': stat.size,
+            }
+            for stat in stats
+        ]
+
+    def clear(self) -> None:
+        """Drop every snapshot and stop tracing, which removes tracemalloc's overhead."""
+        self._snapshots.clear()
+        tracemalloc.stop()
+
+
+heap_snapshots = HeapSnapshots()
@@ -0,0 +1,112 @@
+import asyncio
+import secrets
+from http import HTTPStatus
+from typing import Annotated, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse
+
+from src.ext.debug.memory import heap_snapshots
+from src.ext.debug.profiler import SamplingProfiler
+from src.settings import Settings
+
+MAX_PROFILE_SECONDS = 120
+
+
+def require_debug_token(request: Request, x_debug_token: Annotated[Optional[str], Header()] = None) -> None:
+    """
+    Dependency that guards the debug endpoints.
+    They don't exist unless DEBUG_TOKEN is set in the settings the app was created with, and require the
+    `X-Debug-Token` header to match it.
+    """
+    settings: Settings = request.app.state.settings
+    if settings.DEBUG_TOKEN is None:
+        raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail='Not Found')
+    if x_debug_token is None or not secrets.compare_digest(x_debug_token, settings.DEBUG_TOKEN):
+        raise HTTPException(status_code=HTTPStatus.FORBIDDEN, detail='Invalid debug token')
+
+
+router = APIRouter(
+    prefix='/_debug',
+    tags=['debug'],
+    include_in_schema=False,
+    dependencies=[Depends(require_debug_token)],
+)
+
+_profile_lock = asyncio.Lock()
+
+
+@router.post(
+    '/profile',
+    response_class=PlainTextResponse,
+    summary='Perfilar o worker',
+    description="""
+    Amostra as pilhas de execução de todas as threads do worker durante o período informado
+    e retorna o resultado no formato de pilhas colapsadas (flamegraph.pl, speedscope).
+
+    - **seconds**: Duração da amostragem, em segundos (máximo 120)
+    """,
+)
+async def profile(seconds: Annotated[float, Query(gt=0, le=MAX_PROFILE_SECONDS)] = 30):
+    """Amostra as pilhas de execução do worker."""
+
+    if _profile_lock.locked():
+        raise HTTPException(status_code=HTTPStatus.CONFLICT, detail='A profile is already running')
+
+    async with _profile_lock:
+        profiler = SamplingProfiler()
+        profiler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            stacks = profiler.stop()
+
+    return PlainTextResponse(stacks, headers={'X-Profile-Samples': str(profiler.samples)})
+
+
+@router.post(
+    '/heap-snapshots',
+    status_code=HTTPStatus.CREATED,
+    summary='Capturar snapshot do heap',
+    description="""
+    Captura um snapshot das alocações de memória do worker, para comparar com o estado futuro.
+    O rastreamento (tracemalloc) começa no primeiro snapshot e só cobre alocações feitas depois dele.
+    """,
+)
+async def take_heap_snapshot():
+    """Captura um snapshot do heap."""
+
+    return {'id': heap_snapshots.take()}
+
+
+@router.get(
+    '/heap-snapshots/{snapshot_id}/diff',
+    summary='Comparar heap com snapshot',
+    description="""
+    Retorna os pontos de alocação que mais cresceram desde o snapshot informado.
+
+    - **snapshot_id**: ID do snapshot
+    - **limit**: Quantidade de pontos de alocação retornados (máximo 100)
+    """,
+)
+async def diff_heap_snapshot(snapshot_id: int, limit: Annotated[int, Query(ge=1, le=100)] = 25):
+    """Compara o heap atual com um snapshot."""
+
+    diff = heap_snapshots.diff(snapshot_id, limit)
+
+    if diff is None:
+        raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail='Snapshot not found')
+
+    return {'items': diff}
+
+
+@router.delete(
+    '/heap-snapshots',
+    status_code=HTTPStatus.NO_CONTENT,
+    summary='Descartar snapshots do heap',
+    description='Descarta todos os snapshots e interrompe o rastreamento de memória.',
+)
+async def clear_heap_snapshots():
+    """Descarta os snapshots do heap."""
+
+    heap_snapshots.clear()
@@ -0,0 +1,105 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger('src.health')
+
+MIGRATIONS = Path(__file__).parents[3] / 'migrations'
+# A result older than this many intervals means the refresh loop is stuck, which is reported as not ready.
+STALE_AFTER_INTERVALS = 3
+
+
+def migration_heads(script_location: Path = MIGRATIONS) -> set[str]:
+    """The head revisions of the Alembic scripts, the versions a migrated database is at."""
+    from alembic.script import ScriptDirectory  # noqa: PLC0415
+
+    return set(ScriptDirectory(str(script_location)).get_heads())
+
+
+@dataclass
+class Readiness:
+    ready: bool
+    checks: dict[str, str] = field(default_factory=dict)
+    checked_at: float = field(default_factory=time.monotonic)
+
+
+class ReadinessProbe:
+    """
+    Checks the database in the background and keeps the last result, so probes are answered from memory.
+
+    Every `interval` seconds it checks out a pool connection, which fails or times out when the database
+    is down or the pool is exhausted, and compares the Alembic version of the database to `expected_heads`.
+    Orchestrator probes never wait for a connection and add no load to the database however often they come.
+    """
+
+    def __init__(self, engine: AsyncEngine, interval: float, timeout: float, expected_heads: Optional[set[str]] = None):
+        self.engine = engine
+        self.interval = interval
+        self.timeout = timeout
+        self.expected_heads = expected_heads
+        self.result: Optional[Readiness] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def _check_migrations(self, conn) -> str:
+        from alembic.runtime.migration import MigrationContext  # noqa: PLC0415
+
+        current = await conn.run_sync(lambda sync_conn: set(MigrationContext.configure(sync_conn).get_current_heads()))
+        if current == self.expected_heads:
+            return 'ok'
+        return f'at {", ".join(sorted(current)) or "no revision"}, expected {", ".join(sorted(self.expected_heads))}'
+
+    @staticmethod
+    def _failed_check(checks: dict[str, str]) -> str:
+        return 'migrations' if 'database' in checks else 'database'
+
+    async def refresh(self) -> Readiness:
+        checks = {}
+        try:
+            async with asyncio.timeout(self.timeout):
+                async with self.engine.connect() as conn:
+                    checks['database'] = 'ok'
+                    if self.expected_heads is not None:
+                        checks['migrations'] = await self._check_migrations(conn)
+        except TimeoutError:
+            checks[self._failed_check(checks)] = 'timeout'
+        except Exception as error:
+            logger.warning('Readiness check failed', exc_info=True)
+            checks[self._failed_check(checks)] = f'failed: {type(error).__name__}'
+
+        ready = all(check == 'ok' for check in checks.values())
+        # Reported for context only, a busy pool already shows up as a timeout above.
+        pool = self.engine.pool
+        checks['pool'] = f'{pool.checkedout()} checked out, {pool.checkedin()} idle'
+        self.result = Readiness(ready=ready, checks=checks)
+        return self.result
+
+    def current(self) -> Readiness:
+        """The last result, or a failed one when there is none yet or it is stale."""
+        if self.result is None:
+            return Readiness(ready=False, checks={'database': 'not checked yet'})
+        if time.monotonic() - self.result.checked_at > self.interval * STALE_AFTER_INTERVALS:
+            return Readiness(ready=False, checks={**self.result.checks, 'probe': 'stale'})
+        return self.result
+
+    async def _run(self) -> None:
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
@@ -0,0 +1,46 @@
+from http import HTTPStatus
+
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+
+router = APIRouter(prefix='/health', tags=['health'])
+
+
+@router.get(
+    '/live',
+    summary='Vivacidade',
+    description="""
+    Indica que o processo está de pé e atendendo requisições.
+    Não consulta o banco de dados.
+    """,
+)
+async def live():
+    """Indica que o processo está de pé e atendendo requisições."""
+
+    return {'status': 'alive'}
+
+
+@router.get(
+    '/ready',
+    summary='Prontidão',
+    description="""
+    Indica se a aplicação está pronta para receber tráfego.
+    Responde 503 até que o aquecimento das conexões termine e enquanto o banco de dados estiver
+    indisponível ou com migrações pendentes. O resultado vem da última verificação feita em segundo plano,
+    a requisição nunca espera pelo banco de dados.
+    """,
+)
+async def ready(request: Request):
+    """Indica se a aplicação está pronta para receber tráfego."""
+
+    state = request.app.state
+    if not getattr(state, 'ready', False):
+        return JSONResponse({'status': 'warming up'}, status_code=HTTPStatus.SERVICE_UNAVAILABLE)
+
+    readiness = state.readiness_probe.current()
+    if not readiness.ready:
+        return JSONResponse(
+            {'status': 'not ready', 'checks': readiness.checks}, status_code=HTTPStatus.SERVICE_UNAVAILABLE
+        )
+
+    return {'status': 'ready', 'checks': readiness.checks}
@@ -0,0 +1,149 @@
+import hashlib
+from http import HTTPStatus
+from typing import Optional
+
+from sqlalchemy import Row
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.ext.idempotency.store import IdempotencyKeys
+from src.ext.metrics.metrics import IDEMPOTENCY_REQUESTS
+
+MAX_KEY_LENGTH = 255
+
+
+def idempotent(endpoint):
+    """Let clients retry requests to a POST endpoint safely by sending an `Idempotency-Key` header."""
+    endpoint.__idempotent__ = True
+    return endpoint
+
+
+class IdempotencyMiddleware:
+    """
+    ASGI middleware that runs a request to an `idempotent` endpoint once per `Idempotency-Key`.
+
+    The first request with a key claims it in the `IdempotencyKeys` store on `app.state.idempotency_keys`
+    and its response is stored, unless it is a server error or never completed, in which case the key is
+    released for the retry. Later requests with the key get the stored response, marked with an
+    `Idempotent-Replayed` header, without reaching the endpoint. A key reused with a different body is
+    rejected with 422, and a retry arriving while the first request is still running with 409.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        key = Headers(scope=scope).get('idempotency-key') if scope['type'] == 'http' else None
+        route = self._idempotent_route(scope) if key is not None and scope['method'] == 'POST' else None
+        if route is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not 0 < len(key) <= MAX_KEY_LENGTH:
+            response = JSONResponse(
+                {'detail': f'Idempotency-Key must have 1 to {MAX_KEY_LENGTH} characters'},
+                status_code=HTTPStatus.BAD_REQUEST,
+            )
+            await response(scope, receive, send)
+            return
+
+        body = await self._read_body(receive)
+        if body is None:
+            # The client left before sending the body.
+            return
+
+        store: IdempotencyKeys = scope['app'].state.idempotency_keys
+        fingerprint = hashlib.sha256(body).hexdigest()
+        record = await store.claim(key, scope['path'], fingerprint)
+        if record is not None:
+            response = self._response_for(record, fingerprint, route)
+            await response(scope, receive, send)
+            return
+
+        IDEMPOTENCY_REQUESTS.labels(route, 'processed').inc()
+        await self._run(store, key, scope, self._replaying(body, receive), send)
+
+    def _idempotent_route(self, scope: Scope) -> Optional[str]:
+        for route in scope['app'].router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route.path if getattr(getattr(route, 'endpoint', None), '__idempotent__', False) else None
+        return None
+
+    @staticmethod
+    async def _read_body(receive: Receive) -> Optional[bytes]:
+        chunks = []
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return None
+            chunks.append(message.get('body', b''))
+            more_body = message.get('more_body', False)
+        return b''.join(chunks)
+
+    @staticmethod
+    def _replaying(body: bytes, receive: Receive) -> Receive:
+        # The body was read to fingerprint it, the endpoint gets it from here.
+        body_sent = False
+
+        async def replay_receive() -> Message:
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {'type': 'http.request', 'body': body, 'more_body': False}
+            return await receive()
+
+        return replay_receive
+
+    async def _run(self, store: IdempotencyKeys, key: str, scope: Scope, receive: Receive, send: Send) -> None:
+        start: Optional[Message] = None
+        chunks = []
+        complete = False
+
+        async def recording_send(message: Message) -> None:
+            nonlocal start, complete
+            if message['type'] == 'http.response.start':
+                start = message
+            elif message['type'] == 'http.response.body':
+                chunks.append(message.get('body', b''))
+                complete = not message.get('more_body', False)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, recording_send)
+        except BaseException:
+            await store.release(key, scope['path'])
+            raise
+
+        if not complete or start['status'] >= HTTPStatus.INTERNAL_SERVER_ERROR:
+            await store.release(key, scope['path'])
+            return
+        headers = [[name.decode('latin-1'), value.decode('latin-1')] for name, value in start['headers']]
+        await store.complete(key, scope['path'], start['status'], headers, b''.join(chunks))
+
+    @staticmethod
+    def _response_for(record: Row, fingerprint: str, route: str) -> Response:
+        if record.fingerprint != fingerprint:
+            IDEMPOTENCY_REQUESTS.labels(route, 'mismatch').inc()
+            return JSONResponse(
+                {'detail': 'Idempotency-Key was already used for a different request'},
+                status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+            )
+        if record.status_code is None:
+            IDEMPOTENCY_REQUESTS.labels(route, 'in_progress').inc()
+            return JSONResponse(
+                {'detail': 'A request with this Idempotency-Key is in progress'},
+                status_code=HTTPStatus.CONFLICT,
+                headers={'Retry-After': '1'},
+            )
+
+        IDEMPOTENCY_REQUESTS.labels(route, 'replayed').inc()
+        response = Response(record.body, status_code=record.status_code)
+        response.raw_headers = [
+            *((name.encode('latin-1'), value.encode('latin-1')) for name, value in record.headers),
+            (b'idempotent-replayed', b'true'),
+        ]
+        return response
@@ -0,0 +1,25 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, Integer, LargeBinary, String, func
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.resources import Base
+
+
+class IdempotencyKey(Base):
+    """A request made with an `Idempotency-Key` header and, once it finished, its response."""
+
+    __tablename__ = 'idempotency_keys'
+
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    path: Mapped[str] = mapped_column(String(255), primary_key=True)
+    # SHA-256 of the request body, a key reused for another request is rejected.
+    fingerprint: Mapped[str] = mapped_column(String(64), nullable=False)
+    # Null while the request is in progress.
+    status_code: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    headers: Mapped[Optional[list]] = mapped_column(JSONB, nullable=True)
+    body: Mapped[Optional[bytes]] = mapped_column(LargeBinary, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import time
+from datetime import timedelta
+from typing import Optional
+
+from sqlalchemy import Row, delete, func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.ext.idempotency.model import IdempotencyKey
+
+logger = logging.getLogger('src.idempotency')
+
+
+class IdempotencyKeys:
+    """
+    Requests made with an `Idempotency-Key` header and their responses, kept in Postgres so every worker sees them.
+
+    A request holds its key for `lock_timeout` seconds, so a claim left behind by a crashed worker doesn't
+    block retries for long; once it completes, its response is kept for `ttl` seconds. A background task
+    deletes the expired keys every `cleanup_interval` seconds, `batch_size` rows per statement.
+    """
+
+    def __init__(
+        self, engine: AsyncEngine, ttl: float, lock_timeout: float, cleanup_interval: float, batch_size: int = 1000
+    ):
+        self.engine = engine
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+        self.cleanup_interval = cleanup_interval
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+
+    async def claim(self, key: str, path: str, fingerprint: str) -> Optional[Row]:
+        """
+        Claim `key` for a request to `path`, taking it over when it expired.
+        Returns None once claimed, or the fingerprint, status code, headers and body of the request holding it;
+        the status code is None while that request is in progress.
+        """
+        statement = insert(IdempotencyKey).values(
+            key=key,
+            path=path,
+            fingerprint=fingerprint,
+            expires_at=func.now() + timedelta(seconds=self.lock_timeout),
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[IdempotencyKey.key, IdempotencyKey.path],
+            set_={
+                'fingerprint': statement.excluded.fingerprint,
+                'status_code': None,
+                'headers': None,
+                'body': None,
+                'created_at': func.now(),
+                'expires_at': statement.excluded.expires_at,
+            },
+            where=IdempotencyKey.expires_at < func.now(),
+        ).returning(IdempotencyKey.key)
+        existing = select(
+            IdempotencyKey.fingerprint, IdempotencyKey.status_code, IdempotencyKey.headers, IdempotencyKey.body
+        ).where(IdempotencyKey.key == key, IdempotencyKey.path == path)
+
+        while True:
+            async with self.engine.begin() as conn:
+                if await conn.scalar(statement) is not None:
+                    return None
+                record = (await conn.execute(existing)).one_or_none()
+            # Otherwise the key was deleted in between, claim it again.
+            if record is not None:
+                return record
+
+    async def complete(self, key: str, path: str, status_code: int, headers: list[list[str]], body: bytes) -> None:
+        async with self.engine.begin() as conn:
+            await conn.execute(
+                update(IdempotencyKey)
+                .where(IdempotencyKey.key == key, IdempotencyKey.path == path)
+                .values(
+                    status_code=status_code,
+                    headers=headers,
+                    body=body,
+                    expires_at=func.now() + timedelta(seconds=self.ttl),
+                )
+            )
+
+    async def release(self, key: str, path: str) -> None:
+        """Drop the claim of a request that didn't complete, so a retry runs it again."""
+        async with self.engine.begin() as conn:
+            await conn.execute(
+                delete(IdempotencyKey).where(
+                    IdempotencyKey.key == key, IdempotencyKey.path == path, IdempotencyKey.status_code.is_(None)
+                )
+            )
+
+    async def purge(self) -> int:
+        """Delete the expired keys in batches, so no statement holds locks on many rows; returns how many."""
+        expired = (
+            select(IdempotencyKey.key, IdempotencyKey.path)
+            .where(IdempotencyKey.expires_at < func.now())
+            .limit(self.batch_size)
+        )
+        statement = delete(IdempotencyKey).where(tuple_(IdempotencyKey.key, IdempotencyKey.path).in_(expired))
+        purged = 0
+        while True:
+            async with self.engine.begin() as conn:
+                deleted = (await conn.execute(statement)).rowcount
+            purged += deleted
+            if deleted < self.batch_size:
+                return purged
+
+    async def _run(self) -> None:
+        while True:
+            started = time.monotonic()
+            try:
+                await self.purge()
+            except Exception:
+                logger.warning('Could not delete the expired idempotency keys', exc_info=True)
+            await asyncio.sleep(max(0.0, self.cleanup_interval - (time.monotonic() - started)))
+
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,66 @@
+import logging
+import re
+import time
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.ext.log.setup import correlation_id
+from src.utils import generate_ulid
+
+logger = logging.getLogger('src.access')
+
+# Incoming ids are echoed back and logged, so only short, printable ones are accepted.
+_VALID_REQUEST_ID = re.compile(r'^[A-Za-z0-9._:-]{1,128}$')
+
+
+class AccessLogMiddleware:
+    """
+    ASGI middleware that assigns each request a correlation id and logs it once it has been served.
+
+    The id comes from the `X-Request-ID` header when the client (or a proxy) sends a valid one and is
+    generated otherwise. It is returned in the same header and attached to every log record emitted
+    while the request is served, so the access log line can be joined with its SQL statements.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        request_id = Headers(scope=scope).get('x-request-id')
+        if request_id is None or not _VALID_REQUEST_ID.match(request_id):
+            request_id = generate_ulid()
+
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+                MutableHeaders(scope=message).append('X-Request-ID', request_id)
+            await send(message)
+
+        token = correlation_id.set(request_id)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            logger.info(
+                '%s %s %d',
+                scope['method'],
+                scope['path'],
+                status,
+                extra={
+                    'method': scope['method'],
+                    'path': scope['path'],
+                    'route': getattr(scope.get('route'), 'path', None),
+                    'status': status,
+                    'duration_ms': round((time.perf_counter() - start) * 1000, 2),
+                    'client': scope['client'][0] if scope.get('client') else None,
+                },
+            )
+            correlation_id.reset(token)
@@ -0,0 +1,127 @@
+"""
+Structured logging.
+
+Records are emitted from the event loop into an in-memory queue and written by a background
+listener thread, so a slow stdout or log collector never blocks request handling.
+"""
+
+import copy
+import json
+import logging
+import queue
+import random
+import sys
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import IO, Optional
+
+correlation_id: ContextVar[Optional[str]] = ContextVar('correlation_id', default=None)
+
+# Attributes every LogRecord has; anything else was passed through `extra=` and is logged as a field.
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {'message', 'correlation_id'}
+
+
+class CorrelationIdFilter(logging.Filter):
+    """Stamps records with the correlation id of the request being served."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.correlation_id = correlation_id.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps only a fraction of the records of noisy loggers.
+    `rates` maps a logger name to the fraction kept, which also applies to its children.
+    Warnings and errors are always kept.
+    """
+
+    def __init__(self, rates: dict[str, float]):
+        super().__init__()
+        # Longest names first, so the most specific logger wins.
+        self.rates = sorted(rates.items(), key=lambda item: len(item[0]), reverse=True)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+
+        for name, rate in self.rates:
+            if record.name == name or record.name.startswith(name + '.'):
+                return random.random() < rate
+        return True
+
+
+class JSONFormatter(logging.Formatter):
+    """Formats records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'timestamp': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'correlation_id': getattr(record, 'correlation_id', None),
+        }
+        entry.update({key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES})
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        if record.stack_info:
+            entry['stack'] = record.stack_info
+
+        return json.dumps(entry, default=str)
+
+
+class StructuredQueueHandler(QueueHandler):
+    """
+    QueueHandler that keeps records structured.
+    The stock handler formats the whole record into its message before queueing it; here only the
+    arguments are merged and the traceback rendered, the listener's formatter does the rest.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def configure_logging(
+    level: str = 'INFO',
+    json_format: bool = True,
+    sample_rates: Optional[dict[str, float]] = None,
+    stream: Optional[IO[str]] = None,
+) -> QueueListener:
+    """
+    Route every log record through a queue to a background listener writing to `stream` (stdout by default).
+    Returns the started listener, stop it on shutdown to flush the queue.
+    """
+    handler = logging.StreamHandler(stream or sys.stdout)
+    handler.setFormatter(JSONFormatter() if json_format else logging.Formatter(logging.BASIC_FORMAT))
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = StructuredQueueHandler(log_queue)
+    # Filters run in the emitting thread, where the request's context variables are visible.
+    queue_handler.addFilter(CorrelationIdFilter())
+    if sample_rates:
+        queue_handler.addFilter(SamplingFilter(sample_rates))
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(level)
+
+    for name in ('uvicorn', 'uvicorn.error', 'uvicorn.access'):
+        logging.getLogger(name).handlers = []
+        logging.getLogger(name).propagate = True
+    # Requests are logged by AccessLogMiddleware, with the route and correlation id.
+    logging.getLogger('uvicorn.access').disabled = True
+
+    listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    listener.start()
+    return listener
@@ -0,0 +1,277 @@
+"""
+Prometheus metrics for the API.
+
+With several uvicorn workers, point the `PROMETHEUS_MULTIPROC_DIR` environment variable to an empty
+directory shared by the workers before they start; every worker then writes its samples to memory-mapped
+files there and `/metrics` aggregates them, whichever worker serves the scrape. `python -m src.server`
+creates one when it starts several workers and the variable is not set.
+"""
+
+import functools
+import inspect
+import os
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from starlette.types import Scope
+
+from src.ext.metrics.server_timing import current_timing
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# Where the code currently running was called from, for logs that need to point back at a request.
+current_request: ContextVar[Optional[Scope]] = ContextVar('current_request', default=None)
+current_repository_method: ContextVar[Optional[str]] = ContextVar('current_repository_method', default=None)
+
+HTTP_REQUESTS = Counter(
+    'http_requests_total',
+    'HTTP requests by route and status.',
+    ['method', 'route', 'status'],
+)
+HTTP_REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds',
+    'HTTP request latency by route.',
+    ['method', 'route'],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    'http_requests_in_progress',
+    'HTTP requests currently being served.',
+    ['method'],
+    multiprocess_mode='livesum',
+)
+HTTP_RESPONSE_SIZE = Histogram(
+    'http_response_size_bytes',
+    'HTTP response body size by route.',
+    ['method', 'route'],
+    buckets=SIZE_BUCKETS,
+)
+HTTP_COMPRESSION = Counter(
+    'http_compressed_responses_total',
+    'Compressed responses by encoding, and whether the body was compressed or served from the variant cache.',
+    ['encoding', 'result'],
+)
+RESPONSE_CACHE = Counter(
+    'http_response_cache_total',
+    'Requests to cached endpoints by route, and whether they were a hit, a miss or bypassed the cache.',
+    ['route', 'result'],
+)
+IDEMPOTENCY_REQUESTS = Counter(
+    'http_idempotent_requests_total',
+    'Requests with an Idempotency-Key by route, and whether they were processed, replayed or rejected.',
+    ['route', 'result'],
+)
+HTTP_REQUEST_TIMEOUTS = Counter(
+    'http_request_timeouts_total',
+    'Requests answered with 504, by route and cause (deadline or statement_timeout).',
+    ['route', 'cause'],
+)
+HTTP_CLIENT_DISCONNECTS = Counter(
+    'http_client_disconnects_total',
+    'Requests cancelled because the client disconnected before the response was sent.',
+    ['route'],
+)
+HTTP_REQUEST_PEAK_MEMORY = Histogram(
+    'http_request_peak_memory_bytes',
+    'Peak memory allocated while serving a request, recorded only in memory profiling mode.',
+    ['method', 'route'],
+    buckets=SIZE_BUCKETS + (16777216, 67108864),
+)
+
+DB_POOL_CHECKED_OUT = Gauge(
+    'db_pool_checked_out_connections',
+    'Connections currently checked out of the pool.',
+    multiprocess_mode='livesum',
+)
+DB_POOL_OVERFLOW = Gauge(
+    'db_pool_overflow_connections',
+    'Connections opened beyond pool_size.',
+    multiprocess_mode='livesum',
+)
+DB_POOL_WAIT = Histogram(
+    'db_pool_wait_seconds',
+    'Time spent waiting for a pool connection.',
+    buckets=LATENCY_BUCKETS,
+)
+
+DB_REPLICA_LAG = Gauge(
+    'db_replica_lag_seconds',
+    'Replication lag of each read replica, as last measured.',
+    ['replica'],
+    multiprocess_mode='max',
+)
+DB_READ_ROUTING = Counter(
+    'db_read_routing_total',
+    (
+        'Read requests by where their queries were sent: replica, primary_replicas_behind, primary_read_your_writes'
+        ' or primary_cache_fill.'
+    ),
+    ['target'],
+)
+
+REPOSITORY_DURATION = Histogram(
+    'repository_method_duration_seconds',
+    'Duration of repository methods, including their queries.',
+    ['repository', 'method'],
+    buckets=LATENCY_BUCKETS,
+)
+
+EVENT_LOOP_LAG = Histogram(
+    'event_loop_lag_seconds',
+    'Delay between when the event loop should have resumed a task and when it did.',
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+ADMISSION_IN_FLIGHT = Gauge(
+    'admission_in_flight_requests',
+    'Admitted requests currently being served, by admission class.',
+    ['admission_class'],
+    multiprocess_mode='livesum',
+)
+ADMISSION_QUEUE_WAIT = Histogram(
+    'admission_queue_wait_seconds',
+    'Time requests waited for admission, by admission class.',
+    ['admission_class'],
+    buckets=LATENCY_BUCKETS,
+)
+ADMISSION_REJECTED = Counter(
+    'admission_rejected_total',
+    'Requests shed with 503, by admission class and reason.',
+    ['admission_class', 'reason'],
+)
+
+SINGLE_FLIGHT_LEADERS = Counter(
+    'single_flight_leaders_total',
+    'Coalesced requests that ran the endpoint.',
+)
+SINGLE_FLIGHT_FOLLOWERS = Counter(
+    'single_flight_followers_total',
+    'Coalesced requests served with the response of a leader.',
+)
+SINGLE_FLIGHT_ABSORBED = Histogram(
+    'single_flight_absorbed_requests',
+    'Followers absorbed by each leader.',
+    buckets=(0, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000),
+)
+
+
+class DecayingAverage:
+    """
+    Moving average of recent observations that decays towards zero while nothing is observed.
+    The decay matters when the average drives load shedding: shed traffic produces no observations,
+    a plain moving average would then stay high and keep shedding forever.
+    """
+
+    def __init__(self, half_life: float, weight: float = 0.2):
+        self.half_life = half_life
+        self.weight = weight
+        self._value = 0.0
+        self._at = time.monotonic()
+
+    def value(self) -> float:
+        return self._value * 0.5 ** ((time.monotonic() - self._at) / self.half_life)
+
+    def observe(self, amount: float) -> None:
+        current = self.value()
+        self._value = current + self.weight * (amount - current)
+        self._at = time.monotonic()
+
+
+# Recent pool checkout wait of this worker, read by the admission control middleware.
+RECENT_POOL_WAIT = DecayingAverage(half_life=1.0)
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long each checkout waits for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            duration = time.perf_counter() - start
+            DB_POOL_WAIT.observe(duration)
+            RECENT_POOL_WAIT.observe(duration)
+            timing = current_timing.get()
+            if timing is not None:
+                timing.pool += duration
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Keep the pool gauges up to date as connections are checked out and returned."""
+    pool = engine.sync_engine.pool
+
+    def update_pool_gauges(*args):
+        DB_POOL_CHECKED_OUT.set(pool.checkedout())
+        DB_POOL_OVERFLOW.set(max(pool.overflow(), 0))
+
+    event.listen(pool, 'checkout', update_pool_gauges)
+    event.listen(pool, 'checkin', update_pool_gauges)
+
+
+def instrument_repository(cls):
+    """Class decorator that times every public coroutine method of a repository."""
+    for name, method in list(vars(cls).items()):
+        if not name.startswith('_') and inspect.iscoroutinefunction(method):
+            setattr(cls, name, _timed(f'{cls.__name__}.{name}', REPOSITORY_DURATION.labels(cls.__name__, name), method))
+    return cls
+
+
+def _timed(qualname, histogram, method):
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        outermost = current_repository_method.get() is None
+        token = current_repository_method.set(qualname)
+        start = time.perf_counter()
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            duration = time.perf_counter() - start
+            histogram.observe(duration)
+            current_repository_method.reset(token)
+            timing = current_timing.get()
+            # Repository methods calling each other would otherwise count the same time twice.
+            if timing is not None and outermost:
+                timing.repository += duration
+
+    return wrapper
+
+
+def mark_process_dead() -> None:
+    """In multiprocess mode, drop this worker's `livesum` gauges so a recycled worker stops counting."""
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Render all metrics in the Prometheus text format, aggregating workers in multiprocess mode."""
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def current_route() -> Optional[str]:
+    """Route template of the request being served, once the router has matched it."""
+    scope = current_request.get()
+    if scope is None:
+        return None
+    return getattr(scope.get('route'), 'path', None)
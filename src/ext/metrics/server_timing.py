@@ -0,0 +1,172 @@
+"""
+Per-request timing breakdown reported in the `Server-Timing` response header.
+
+Timing is enabled for every request with the `SERVER_TIMING` setting, or per request by sending the
+`X-Server-Timing` header with the value of `SERVER_TIMING_TOKEN`. When it is off, every hook below
+returns after a single context variable lookup.
+"""
+
+import secrets
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+@dataclass
+class ServerTiming:
+    """Time (in seconds) spent in each phase of the request being served."""
+
+    pool: float = 0.0
+    db: float = 0.0
+    queries: int = 0
+    repository: float = 0.0
+    validation: float = 0.0
+    encoding: float = 0.0
+
+    def header(self, total: float) -> str:
+        # Repository time minus the time spent in the database is ORM work, mostly hydrating rows.
+        orm = max(self.repository - self.db - self.pool, 0.0)
+        metrics = [
+            f'pool;dur={self.pool * 1000:.2f};desc="Pool wait"',
+            f'db;dur={self.db * 1000:.2f};desc="SQL ({self.queries} queries)"',
+            f'orm;dur={orm * 1000:.2f};desc="ORM hydration"',
+            f'validation;dur={self.validation * 1000:.2f};desc="Response validation"',
+            f'encoding;dur={self.encoding * 1000:.2f};desc="JSON encoding"',
+            f'total;dur={total * 1000:.2f}',
+        ]
+        return ', '.join(metrics)
+
+
+current_timing: ContextVar[Optional[ServerTiming]] = ContextVar('current_timing', default=None)
+
+
+class ServerTimingMiddleware:
+    """ASGI middleware that collects a ServerTiming for enabled requests and adds the header to the response."""
+
+    def __init__(self, app: ASGIApp, enabled: bool = False, token: Optional[str] = None):
+        self.app = app
+        self.enabled = enabled
+        self.token = token
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http' or not self._is_enabled(scope):
+            await self.app(scope, receive, send)
+            return
+
+        timing = ServerTiming()
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            if message['type'] == 'http.response.start':
+                headers = MutableHeaders(scope=message)
+                headers.append('Server-Timing', timing.header(time.perf_counter() - start))
+            await send(message)
+
+        token = current_timing.set(timing)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_timing.reset(token)
+
+    def _is_enabled(self, scope: Scope) -> bool:
+        if self.enabled:
+            return True
+        if self.token is None:
+            return False
+
+        requested = Headers(scope=scope).get('x-server-timing')
+        return requested is not None and secrets.compare_digest(requested, self.token)
+
+
+def time_queries(engine: AsyncEngine) -> Callable[[], None]:
+    """Add the time spent executing statements on `engine` to the current ServerTiming; returns a detach function."""
+
+    def before_cursor_execute(conn, **kw):
+        if current_timing.get() is not None:
+            conn.info.setdefault('server_timing_start', []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, **kw):
+        timing = current_timing.get()
+        if timing is not None and conn.info.get('server_timing_start'):
+            timing.db += time.perf_counter() - conn.info['server_timing_start'].pop()
+            timing.queries += 1
+
+    def handle_error(context):
+        # A failed statement never reaches after_cursor_execute, its start would stay on the pooled connection.
+        if context.connection is not None and context.connection.info.get('server_timing_start'):
+            start = context.connection.info['server_timing_start'].pop()
+            timing = current_timing.get()
+            if timing is not None:
+                timing.db += time.perf_counter() - start
+
+    event.listen(engine.sync_engine, 'before_cursor_execute', before_cursor_execute, named=True)
+    event.listen(engine.sync_engine, 'after_cursor_execute', after_cursor_execute, named=True)
+    event.listen(engine.sync_engine, 'handle_error', handle_error)
+
+    def detach() -> None:
+        event.remove(engine.sync_engine, 'before_cursor_execute', before_cursor_execute)
+        event.remove(engine.sync_engine, 'after_cursor_execute', after_cursor_execute)
+        event.remove(engine.sync_engine, 'handle_error', handle_error)
+
+    return detach
+
+
+class _TimedResponseField:
+    """Proxy for a route's response field that times response_model validation and serialization."""
+
+    def __init__(self, field: Any):
+        self._field = field
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._field, name)
+
+    def validate(self, *args, **kwargs):
+        return _timed('validation', self._field.validate, *args, **kwargs)
+
+    def serialize(self, *args, **kwargs):
+        return _timed('encoding', self._field.serialize, *args, **kwargs)
+
+
+class ServerTimingJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return _timed('encoding', super().render, content)
+
+
+def _timed(phase: str, function: Callable, *args, **kwargs):
+    timing = current_timing.get()
+    if timing is None:
+        return function(*args, **kwargs)
+
+    start = time.perf_counter()
+    try:
+        return function(*args, **kwargs)
+    finally:
+        setattr(timing, phase, getattr(timing, phase) + time.perf_counter() - start)
+
+
+class ServerTimingRoute(APIRoute):
+    """APIRoute that reports response_model validation and JSON encoding to the current ServerTiming."""
+
+    def get_route_handler(self):
+        response_field = self.secure_cloned_response_field
+        response_class = self.response_class
+
+        # The request handler captures both when it is built, so they are only swapped while building it.
+        if response_field is not None:
+            self.secure_cloned_response_field = _TimedResponseField(response_field)
+        if isinstance(response_class, DefaultPlaceholder) and response_class.value is JSONResponse:
+            self.response_class = DefaultPlaceholder(ServerTimingJSONResponse)
+        try:
+            return super().get_route_handler()
+        finally:
+            self.secure_cloned_response_field = response_field
+            self.response_class = response_class
@@ -0,0 +1,121 @@
+import asyncio
+import hashlib
+from dataclasses import dataclass
+from typing import Optional
+
+from starlette.routing import BaseRoute, Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.ext.metrics.metrics import SINGLE_FLIGHT_ABSORBED, SINGLE_FLIGHT_FOLLOWERS, SINGLE_FLIGHT_LEADERS
+
+# Added to the leader's response by outer middleware, which add their own to each follower's.
+PER_REQUEST_HEADERS = frozenset({b'server-timing'})
+
+
+def single_flight(endpoint):
+    """
+    Opt a read endpoint into request coalescing.
+    Concurrent identical requests then share the response of the first one instead of each querying the database.
+    """
+    endpoint.__single_flight__ = True
+    return endpoint
+
+
+@dataclass
+class _Flight:
+    future: asyncio.Future
+    followers: int = 0
+
+
+class SingleFlightMiddleware:
+    """
+    ASGI middleware that coalesces concurrent identical GET requests to endpoints marked with `single_flight`.
+
+    Requests are identical when they share path, query string and auth scope (Authorization and Cookie headers).
+    The first request (the leader) runs the endpoint; the others wait and replay its buffered response.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._flights: dict[tuple, _Flight] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        route = self._single_flight_route(scope) if scope['type'] == 'http' and scope['method'] == 'GET' else None
+        if route is None:
+            await self.app(scope, receive, send)
+            return
+
+        key = self._key(scope)
+        flight = self._flights.get(key)
+
+        if flight is not None:
+            flight.followers += 1
+            SINGLE_FLIGHT_FOLLOWERS.inc()
+            # Shielded so a follower disconnecting doesn't cancel the leader's result.
+            messages = await asyncio.shield(flight.future)
+
+            if messages is None:
+                # The leader was cancelled before responding, serve this request on its own.
+                await self.app(scope, receive, send)
+                return
+
+            # Followers skip the router, which stores the matched route for the outer middleware.
+            scope['route'] = route
+            for message in messages:
+                await send(self._for_follower(message))
+            return
+
+        flight = _Flight(future=asyncio.get_running_loop().create_future())
+        self._flights[key] = flight
+        SINGLE_FLIGHT_LEADERS.inc()
+        messages: list[Message] = []
+
+        async def buffer(message: Message) -> None:
+            messages.append(message)
+
+        try:
+            await self.app(scope, receive, buffer)
+        except Exception as exc:
+            flight.future.set_exception(exc)
+            # Mark the exception as retrieved when there are no followers to re-raise it.
+            flight.future.exception()
+            raise
+        except BaseException:
+            flight.future.set_result(None)
+            raise
+        else:
+            # Middleware inside may end a request without a response, e.g. when its client disconnected;
+            # followers then serve themselves, as when the leader is cancelled.
+            responded = any(message['type'] == 'http.response.start' for message in messages)
+            flight.future.set_result(messages if responded else None)
+        finally:
+            del self._flights[key]
+            SINGLE_FLIGHT_ABSORBED.observe(flight.followers)
+
+        for message in messages:
+            await send(message)
+
+    @staticmethod
+    def _for_follower(message: Message) -> Message:
+        # A copy, outer middleware edit the headers of the leader's messages in place.
+        if message['type'] != 'http.response.start':
+            return message
+        return {
+            **message,
+            'headers': [(name, value) for name, value in message['headers'] if name.lower() not in PER_REQUEST_HEADERS],
+        }
+
+    def _single_flight_route(self, scope: Scope) -> Optional[BaseRoute]:
+        for route in scope['app'].router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route if getattr(getattr(route, 'endpoint', None), '__single_flight__', False) else None
+        return None
+
+    def _key(self, scope: Scope) -> tuple:
+        auth = hashlib.blake2b(digest_size=16)
+        for name, value in scope['headers']:
+            if name in {b'authorization', b'cookie'}:
+                auth.update(name + b':' + value + b'\n')
+
+        return scope['path'], scope['query_string'], auth.digest()
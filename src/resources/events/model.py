@@ -31,6 +31,7 @@ class Event(Base):
     image_url: Mapped[str] = mapped_column(String(255), nullable=False)
     is_active: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
     is_published: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    talk_count: Mapped[int] = mapped_column(Integer, nullable=False, server_default='0')
 
     talks: Mapped[List[Talk]] = relationship(back_populates='event', lazy='selectin')  # type: ignore  # noqa: F821
     created_at: Mapped[datetime] = mapped_column(
@@ -1,20 +1,32 @@
-from typing import Annotated
+from typing import Annotated, Optional
 
 from fastapi import Depends
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import noload
 
-from src.ext.database.db import get_async_session
+from src.ext.cache.response_cache import invalidates_cache
+from src.ext.database.db import get_async_session, get_entity_loader
+from src.ext.database.loader import EntityLoader
+from src.ext.metrics.metrics import instrument_repository
 from src.resources.events.model import Event
-from src.resources.events.schema import EventCreate, EventUpdate
+from src.resources.events.schema import EventCreate, EventDB, EventUpdate
+from src.resources.shared.batch import id_in, in_request_order
+from src.resources.shared.fieldsets import FieldSelection, Fieldset
 from src.resources.shared.schemas import PaginationParams
+from src.resources.talks.schema import TalkDB
 
 SessionDep = Annotated[AsyncSession, Depends(get_async_session)]
 
+event_fieldset = Fieldset(Event, EventDB, relationships={'talks': (Event.talks, TalkDB)})
 
+
+@invalidates_cache('events', 'talks')
+@instrument_repository
 class EventRepository:
-    def __init__(self, session: SessionDep):
+    def __init__(self, session: SessionDep, loader: Optional[EntityLoader] = None):
         self.session = session
+        self.loader = loader or EntityLoader(session)
 
     async def create(self, event_data: EventCreate):
         event = Event(
@@ -31,15 +43,32 @@ class EventRepository:
 
         await self.session.commit()
         await self.session.refresh(event)
+        self.loader.prime(event)
 
         return event
 
-    async def get_by_id(self, event_id: str):
-        query = select(Event).where(Event.id == event_id)
+    async def get_by_id(self, event_id: str, selection: Optional[FieldSelection] = None):
+        if not selection:
+            return await self.loader.load(Event, event_id)
+
+        query = select(Event).where(Event.id == event_id).options(*event_fieldset.load_options(selection))
+
         result = await self.session.execute(query)
 
         return result.scalar_one_or_none()
 
+    async def get_many(self, event_ids: list[str], selection: Optional[FieldSelection] = None):
+        query = select(Event).where(id_in(Event.id, event_ids))
+        if selection:
+            query = query.options(*event_fieldset.load_options(selection))
+        else:
+            # Like list pages, batches expose talk_count instead of the talks themselves.
+            query = query.options(noload(Event.talks))
+
+        result = await self.session.execute(query)
+
+        return in_request_order(event_ids, result.scalars().all())
+
     async def get_by_edition(self, edition: int):
         query = select(Event).where(Event.edition == edition)
         result = await self.session.execute(query)
@@ -72,14 +101,21 @@ class EventRepository:
 
         await self.session.delete(event)
         await self.session.commit()
+        self.loader.clear(Event, event_id)
 
         return event
 
-    async def list_events(self, params: PaginationParams):
+    async def list_events(self, params: PaginationParams, selection: Optional[FieldSelection] = None):
         count_query = select(func.count()).select_from(Event)
         total = await self.session.scalar(count_query) or 0
 
         query = select(Event).offset((params.page - 1) * params.per_page).limit(params.per_page)
+
+        if selection:
+            query = query.options(*event_fieldset.load_options(selection))
+        else:
+            # List pages expose talk_count instead of the talks themselves.
+            query = query.options(noload(Event.talks))
         result = await self.session.execute(query)
         events = result.scalars().all()
 
@@ -96,8 +132,9 @@ class EventRepository:
 
 def get_event_repository(
     session: Annotated[AsyncSession, Depends(get_async_session)],
+    loader: Annotated[EntityLoader, Depends(get_entity_loader)],
 ) -> EventRepository:
     """
     Dependency that provides a EventRepository instance.
     """
-    return EventRepository(session)
+    return EventRepository(session, loader)
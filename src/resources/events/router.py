@@ -1,15 +1,24 @@
 from http import HTTPStatus
-from typing import Annotated
+from typing import Annotated, Optional, Union
 
 from fastapi import APIRouter, Depends, HTTPException
-
-from src.resources.events.repository import EventRepository, get_event_repository
-from src.resources.events.schema import EventCreate, EventDB, EventsPaginatedResponse, EventUpdate
+from fastapi.responses import JSONResponse
+
+from src.ext.cache.response_cache import cache_response
+from src.ext.deadline.middleware import deadline
+from src.ext.idempotency.middleware import idempotent
+from src.ext.metrics.server_timing import ServerTimingRoute
+from src.ext.singleflight.middleware import single_flight
+from src.resources.events.repository import EventRepository, event_fieldset, get_event_repository
+from src.resources.events.schema import EventCreate, EventDB, EventsBatchResponse, EventsPaginatedResponse, EventUpdate
+from src.resources.shared.batch import batch_ids
+from src.resources.shared.fieldsets import FieldSelection
 from src.resources.shared.schemas import PaginationParams
 
 router = APIRouter(
     prefix='/events',
     tags=['events'],
+    route_class=ServerTimingRoute,
     responses={
         404: {'description': 'Evento não encontrado'},
         400: {'description': 'Dados inválidos'},
@@ -19,6 +28,8 @@ router = APIRouter(
 
 
 EventRepositoryDep = Annotated[EventRepository, Depends(get_event_repository)]
+EventSelectionDep = Annotated[Optional[FieldSelection], Depends(event_fieldset)]
+BatchIdsDep = Annotated[Optional[list[str]], Depends(batch_ids)]
 
 
 @router.post(
@@ -36,8 +47,12 @@ EventRepositoryDep = Annotated[EventRepository, Depends(get_event_repository)]
     - **end_date**: Data de término do evento
     - **location**: Localização do evento
     - **image_url**: URL da imagem do evento
+
+    Envie o cabeçalho **Idempotency-Key** para repetir a requisição com segurança: repetições com a mesma
+    chave recebem a resposta da primeira, sem criar outro registro.
     """,
 )
+@idempotent
 async def create_event(
     event_data: EventCreate,
     repository: EventRepositoryDep,
@@ -66,15 +81,22 @@ async def create_event(
 
     - **event_id**: ID único do evento (ULID)
 
+    Parâmetros opcionais:
+    - **fields**: Campos retornados, separados por vírgula (ex.: `id,title`)
+    - **expand**: Relacionamentos incluídos na resposta (`talks`)
+
     Retorna os dados do evento.
     """,
 )
+@cache_response(ttl=60, tags=('events',))
+@single_flight
 async def get_event(
     event_id: str,
     repository: EventRepositoryDep,
+    selection: EventSelectionDep,
 ):
     """Retorna os dados de um evento pelo seu ID."""
-    event = await repository.get_by_id(event_id)
+    event = await repository.get_by_id(event_id, selection)
 
     if not event:
         raise HTTPException(
@@ -82,6 +104,9 @@ async def get_event(
             detail='Event not found',
         )
 
+    if selection:
+        return JSONResponse(event_fieldset.dump(event, selection))
+
     return event
 
 
@@ -162,7 +187,7 @@ async def delete_event(
 
 @router.get(
     '',
-    response_model=EventsPaginatedResponse,
+    response_model=Union[EventsPaginatedResponse, EventsBatchResponse],
     summary='Listar eventos',
     description="""
     Retorna uma lista paginada de eventos.
@@ -171,18 +196,37 @@ async def delete_event(
     - **page**: Número da página (padrão: 1)
     - **per_page**: Itens por página (padrão: 10, máximo: 100)
 
+    Parâmetros opcionais:
+    - **fields**: Campos retornados, separados por vírgula (ex.: `id,title`)
+    - **expand**: Relacionamentos incluídos na resposta (`talks`)
+    - **ids**: IDs separados por vírgula para busca em lote (máximo: 200). Ignora a paginação e retorna
+      os itens na ordem pedida, com os IDs não encontrados em **missing**
+
     Retorna:
-    - Lista de eventos
+    - Lista de eventos (sem as palestras, com o total em **talk_count**)
     - Total de eventos
     - Total de páginas
     - Página atual
     - Itens por página
     """,
 )
+@cache_response(ttl=30, tags=('events',))
+@single_flight
+@deadline(5)
 async def list_events(
     params: Annotated[PaginationParams, Depends()],
     repository: EventRepositoryDep,
+    selection: EventSelectionDep,
+    ids: BatchIdsDep,
 ):
     """Retorna uma lista paginada de eventos."""
-    events = await repository.list_events(params)
+    if ids:
+        events = await repository.get_many(ids, selection)
+    else:
+        events = await repository.list_events(params, selection)
+
+    if selection:
+        items = [event_fieldset.dump(event, selection) for event in events['items']]
+        return JSONResponse({**events, 'items': items})
+
     return events
@@ -5,7 +5,7 @@ from typing import List, Optional
 
 from pydantic import BaseModel, ConfigDict
 
-from src.resources.shared.schemas import BasePaginatedResponse
+from src.resources.shared.schemas import BaseBatchResponse, BasePaginatedResponse
 from src.resources.talks.schema import PublicTalk, TalkDB
 
 
@@ -22,6 +22,7 @@ class EventDB(BaseModel):
     image_url: str
     is_active: bool
     is_published: bool
+    talk_count: int
     talks: List['TalkDB']
     created_at: datetime
     updated_at: datetime
@@ -29,6 +30,26 @@ class EventDB(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class EventSummary(BaseModel):
+    """Schema for event data in list pages, without the embedded talks."""
+
+    id: str
+    edition: int
+    title: str
+    description: str
+    start_date: datetime
+    end_date: datetime
+    location: str
+    image_url: str
+    is_active: bool
+    is_published: bool
+    talk_count: int
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 class PublicEvent(BaseModel):
     id: str
     edition: int
@@ -66,4 +87,8 @@ class EventUpdate(BaseModel):
 
 
 class EventsPaginatedResponse(BasePaginatedResponse):
-    items: List['EventDB']
+    items: List['EventSummary']
+
+
+class EventsBatchResponse(BaseBatchResponse):
+    items: List['EventSummary']
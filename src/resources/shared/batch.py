@@ -0,0 +1,49 @@
+from http import HTTPStatus
+from typing import Annotated, Any, Optional, Sequence
+
+from fastapi import HTTPException, Query
+from sqlalchemy import ColumnElement, String, any_, bindparam
+from sqlalchemy.dialects.postgresql import ARRAY
+
+MAX_BATCH_SIZE = 200
+
+
+def batch_ids(
+    ids: Annotated[Optional[str], Query(description='IDs separados por vírgula para busca em lote')] = None,
+) -> Optional[list[str]]:
+    """
+    Dependency that parses `?ids=a,b,c` for batch lookups.
+    Returns the unique ids in request order, or None when the parameter is absent.
+    """
+    if ids is None:
+        return None
+
+    keys = list(dict.fromkeys(key.strip() for key in ids.split(',') if key.strip()))
+
+    if not keys:
+        raise HTTPException(status_code=HTTPStatus.BAD_REQUEST, detail='At least one id is required')
+    if len(keys) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail=f'At most {MAX_BATCH_SIZE} ids can be requested at once',
+        )
+
+    return keys
+
+
+def id_in(column: Any, ids: Sequence[str]) -> ColumnElement[bool]:
+    """
+    `column = ANY(:ids)` with the ids bound as a single array parameter,
+    so the statement text (and its prepared statement) is the same for any number of ids.
+    """
+    return column == any_(bindparam('ids', list(ids), type_=ARRAY(String), unique=True))
+
+
+def in_request_order(ids: Sequence[str], instances: Sequence[Any]) -> dict:
+    """Order the found instances as requested and report the ids that were not found."""
+    found = {instance.id: instance for instance in instances}
+
+    return {
+        'items': [found[key] for key in ids if key in found],
+        'missing': [key for key in ids if key not in found],
+    }
@@ -0,0 +1,105 @@
+from dataclasses import dataclass
+from http import HTTPStatus
+from typing import Annotated, Any, Optional
+
+from fastapi import HTTPException, Query
+from pydantic import BaseModel
+from sqlalchemy.orm import InstrumentedAttribute, joinedload, load_only, noload, selectinload
+
+
+@dataclass(frozen=True)
+class FieldSelection:
+    """Columns (`?fields=`) and relationships (`?expand=`) requested by the client."""
+
+    fields: Optional[tuple[str, ...]]
+    expand: tuple[str, ...]
+
+
+def _split(value: Optional[str]) -> list[str]:
+    if not value:
+        return []
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+class Fieldset:
+    """
+    Sparse fieldset support for a resource.
+
+    Used as a FastAPI dependency it parses `?fields=` and `?expand=` into a FieldSelection,
+    or None when neither is given so the endpoint keeps its default representation.
+    Repositories turn the selection into loader options and routers into the response body.
+    """
+
+    def __init__(
+        self,
+        model: type,
+        schema: type[BaseModel],
+        relationships: dict[str, tuple[InstrumentedAttribute, type[BaseModel]]],
+    ):
+        self.model = model
+        self.schema = schema
+        self.relationships = relationships
+        self.columns = [name for name in schema.model_fields if name not in relationships]
+
+    def __call__(
+        self,
+        fields: Annotated[Optional[str], Query(description='Campos retornados, separados por vírgula')] = None,
+        expand: Annotated[Optional[str], Query(description='Relacionamentos incluídos, separados por vírgula')] = None,
+    ) -> Optional[FieldSelection]:
+        if fields is None and expand is None:
+            return None
+
+        selected = _split(fields)
+        expanded = _split(expand)
+
+        for name in selected:
+            if name not in self.columns:
+                raise HTTPException(status_code=HTTPStatus.BAD_REQUEST, detail=f'Unknown field: {name}')
+        for name in expanded:
+            if name not in self.relationships:
+                raise HTTPException(status_code=HTTPStatus.BAD_REQUEST, detail=f'Unknown relationship: {name}')
+
+        return FieldSelection(
+            fields=tuple(dict.fromkeys(selected)) if selected else None,
+            expand=tuple(dict.fromkeys(expanded)),
+        )
+
+    def load_options(self, selection: FieldSelection) -> list:
+        """Loader options that fetch only the selected columns and expanded relationships."""
+        options = []
+
+        if selection.fields is not None:
+            columns = {'id', *selection.fields}
+            # Relationship loaders need the join columns even when the client did not ask for them.
+            for name in selection.expand:
+                attribute, _ = self.relationships[name]
+                columns.update(column.key for column in attribute.property.local_columns)
+            options.append(load_only(*(getattr(self.model, name) for name in columns)))
+
+        for name, (attribute, _) in self.relationships.items():
+            if name in selection.expand:
+                loader = selectinload(attribute) if attribute.property.uselist else joinedload(attribute)
+                # Embedded entities are serialized without their own relationships.
+                options.append(loader.noload('*'))
+            else:
+                options.append(noload(attribute))
+
+        return options
+
+    def dump(self, instance: Any, selection: FieldSelection) -> dict:
+        """Serialize the selected columns and expanded relationships of an instance."""
+        names = selection.fields if selection.fields is not None else self.columns
+        values = {name: getattr(instance, name) for name in names}
+        data = self.schema.model_construct(**values).model_dump(mode='json', include=set(values))
+
+        for name in selection.expand:
+            _, related_schema = self.relationships[name]
+            value = getattr(instance, name)
+            if value is None:
+                data[name] = None
+            elif isinstance(value, list):
+                data[name] = [related_schema.model_validate(item).model_dump(mode='json') for item in value]
+            else:
+                data[name] = related_schema.model_validate(value).model_dump(mode='json')
+
+        return data
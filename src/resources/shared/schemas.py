@@ -1,3 +1,5 @@
+from typing import List
+
 from pydantic import BaseModel, Field
 
 
@@ -15,3 +17,9 @@ class BasePaginatedResponse(BaseModel):
     page: int
     per_page: int
     total_pages: int
+
+
+class BaseBatchResponse(BaseModel):
+    """Schema for batch lookup response."""
+
+    missing: List[str]
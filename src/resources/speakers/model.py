@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, String, Text, func
+from sqlalchemy import DateTime, Integer, String, Text, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.resources import Base
@@ -24,6 +24,7 @@ class Speaker(Base):
     website_url: Mapped[str] = mapped_column(String(255), nullable=True)
     bio: Mapped[str] = mapped_column(Text, nullable=True)
     image_url: Mapped[str] = mapped_column(String(255), nullable=True)
+    talk_count: Mapped[int] = mapped_column(Integer, nullable=False, server_default='0')
 
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
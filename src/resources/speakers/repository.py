@@ -1,18 +1,30 @@
-from typing import Annotated
+from typing import Annotated, Optional
 
 from fastapi.params import Depends
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
-
-from src.ext.database.db import get_async_session
+from sqlalchemy.orm import noload
+
+from src.ext.cache.response_cache import invalidates_cache
+from src.ext.database.db import get_async_session, get_entity_loader
+from src.ext.database.loader import EntityLoader
+from src.ext.metrics.metrics import instrument_repository
+from src.resources.shared.batch import id_in, in_request_order
+from src.resources.shared.fieldsets import FieldSelection, Fieldset
 from src.resources.shared.schemas import PaginationParams
 from src.resources.speakers.model import Speaker
-from src.resources.speakers.schema import SpeakerCreate, SpeakerUpdate
+from src.resources.speakers.schema import SpeakerCreate, SpeakerDB, SpeakerUpdate
+from src.resources.talks.schema import TalkDB
+
+speaker_fieldset = Fieldset(Speaker, SpeakerDB, relationships={'talks': (Speaker.talks, TalkDB)})
 
 
+@invalidates_cache('speakers', 'talks')
+@instrument_repository
 class SpeakerRepository:
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, loader: Optional[EntityLoader] = None):
         self.session = session
+        self.loader = loader or EntityLoader(session)
 
     async def create(self, speaker_data: SpeakerCreate):
         speaker = Speaker(
@@ -30,14 +42,31 @@ class SpeakerRepository:
 
         await self.session.commit()
         await self.session.refresh(speaker)
+        self.loader.prime(speaker)
 
         return speaker
 
-    async def get_by_id(self, speaker_id: str):
-        query = select(Speaker).where(Speaker.id == speaker_id)
+    async def get_by_id(self, speaker_id: str, selection: Optional[FieldSelection] = None):
+        if not selection:
+            return await self.loader.load(Speaker, speaker_id)
+
+        query = select(Speaker).where(Speaker.id == speaker_id).options(*speaker_fieldset.load_options(selection))
+
         result = await self.session.execute(query)
         return result.scalar_one_or_none()
 
+    async def get_many(self, speaker_ids: list[str], selection: Optional[FieldSelection] = None):
+        query = select(Speaker).where(id_in(Speaker.id, speaker_ids))
+        if selection:
+            query = query.options(*speaker_fieldset.load_options(selection))
+        else:
+            # Like list pages, batches expose talk_count instead of the talks themselves.
+            query = query.options(noload(Speaker.talks))
+
+        result = await self.session.execute(query)
+
+        return in_request_order(speaker_ids, result.scalars().all())
+
     async def get_by_email(self, email: str):
         query = select(Speaker).where(Speaker.email == email)
         result = await self.session.execute(query)
@@ -67,12 +96,18 @@ class SpeakerRepository:
 
         await self.session.delete(speaker)
         await self.session.commit()
+        self.loader.clear(Speaker, speaker_id)
 
-    async def list_speakers(self, params: PaginationParams):
+    async def list_speakers(self, params: PaginationParams, selection: Optional[FieldSelection] = None):
         count_query = select(func.count()).select_from(Speaker)
         total = await self.session.scalar(count_query) or 0
 
         query = select(Speaker).offset((params.page - 1) * params.per_page).limit(params.per_page)
+
+        if selection:
+            query = query.options(*speaker_fieldset.load_options(selection))
+        else:
+            query = query.options(noload(Speaker.talks))
         result = await self.session.execute(query)
 
         speakers = result.scalars().all()
@@ -90,8 +125,9 @@ class SpeakerRepository:
 
 def get_speaker_repository(
     session: Annotated[AsyncSession, Depends(get_async_session)],
+    loader: Annotated[EntityLoader, Depends(get_entity_loader)],
 ) -> SpeakerRepository:
     """
     Dependency that provides a SpeakerRepository instance.
     """
-    return SpeakerRepository(session)
+    return SpeakerRepository(session, loader)
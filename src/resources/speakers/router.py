@@ -1,15 +1,29 @@
 from http import HTTPStatus
-from typing import Annotated
+from typing import Annotated, Optional, Union
 
 from fastapi import APIRouter, Depends, HTTPException
-
+from fastapi.responses import JSONResponse
+
+from src.ext.cache.response_cache import cache_response
+from src.ext.deadline.middleware import deadline
+from src.ext.idempotency.middleware import idempotent
+from src.ext.metrics.server_timing import ServerTimingRoute
+from src.resources.shared.batch import batch_ids
+from src.resources.shared.fieldsets import FieldSelection
 from src.resources.shared.schemas import PaginationParams
-from src.resources.speakers.repository import SpeakerRepository, get_speaker_repository
-from src.resources.speakers.schema import SpeakerCreate, SpeakerDB, SpeakersPaginatedResponse, SpeakerUpdate
+from src.resources.speakers.repository import SpeakerRepository, get_speaker_repository, speaker_fieldset
+from src.resources.speakers.schema import (
+    SpeakerCreate,
+    SpeakerDB,
+    SpeakersBatchResponse,
+    SpeakersPaginatedResponse,
+    SpeakerUpdate,
+)
 
 router = APIRouter(
     prefix='/speakers',
     tags=['speakers'],
+    route_class=ServerTimingRoute,
     responses={
         404: {'description': 'Speaker não encontrado'},
         400: {'description': 'Dados inválidos'},
@@ -19,6 +33,8 @@ router = APIRouter(
 
 
 speaker_repository_dep = Annotated[SpeakerRepository, Depends(get_speaker_repository)]
+SpeakerSelectionDep = Annotated[Optional[FieldSelection], Depends(speaker_fieldset)]
+BatchIdsDep = Annotated[Optional[list[str]], Depends(batch_ids)]
 
 
 @router.post(
@@ -39,8 +55,12 @@ speaker_repository_dep = Annotated[SpeakerRepository, Depends(get_speaker_reposi
     - **image_url**: URL da imagem do palestrante
 
     Retorna os dados do palestrante criado.
+
+    Envie o cabeçalho **Idempotency-Key** para repetir a requisição com segurança: repetições com a mesma
+    chave recebem a resposta da primeira, sem criar outro registro.
     """,
 )
+@idempotent
 async def create_speaker(
     speaker_data: SpeakerCreate,
     speaker_repository: speaker_repository_dep,
@@ -69,16 +89,21 @@ async def create_speaker(
 
     - **speaker_id**: ID único do palestrante (ULID)
 
+    Parâmetros opcionais:
+    - **fields**: Campos retornados, separados por vírgula (ex.: `id,name`)
+    - **expand**: Relacionamentos incluídos na resposta (`talks`)
+
     Retorna os dados do palestrante.
     """,
 )
 async def get_speaker(
     speaker_id: str,
     speaker_repository: speaker_repository_dep,
+    selection: SpeakerSelectionDep,
 ):
     """Retorna os dados de um palestrante pelo seu ID."""
 
-    speaker = await speaker_repository.get_by_id(speaker_id)
+    speaker = await speaker_repository.get_by_id(speaker_id, selection)
 
     if not speaker:
         raise HTTPException(
@@ -86,6 +111,9 @@ async def get_speaker(
             detail='Speaker not found',
         )
 
+    if selection:
+        return JSONResponse(speaker_fieldset.dump(speaker, selection))
+
     return speaker
 
 
@@ -160,7 +188,7 @@ async def delete_speaker(
 
 @router.get(
     '',
-    response_model=SpeakersPaginatedResponse,
+    response_model=Union[SpeakersPaginatedResponse, SpeakersBatchResponse],
     summary='Listar palestrantes',
     description="""
     Retorna uma lista paginada de palestrantes.
@@ -169,15 +197,33 @@ async def delete_speaker(
     - **page**: Número da página (padrão: 1)
     - **per_page**: Itens por página (padrão: 10, máximo: 100)
 
+    Parâmetros opcionais:
+    - **fields**: Campos retornados, separados por vírgula (ex.: `id,name`)
+    - **expand**: Relacionamentos incluídos na resposta (`talks`)
+    - **ids**: IDs separados por vírgula para busca em lote (máximo: 200). Ignora a paginação e retorna
+      os itens na ordem pedida, com os IDs não encontrados em **missing**
+
 
     Retorna:
-    - Lista de palestrantes
+    - Lista de palestrantes, com o total de palestras em **talk_count**
     """,
 )
+@cache_response(ttl=30, tags=('speakers',))
+@deadline(5)
 async def list_speakers(
     params: Annotated[PaginationParams, Depends()],
     speaker_repository: speaker_repository_dep,
+    selection: SpeakerSelectionDep,
+    ids: BatchIdsDep,
 ):
     """Retorna uma lista paginada de palestrantes."""
-    speakers = await speaker_repository.list_speakers(params)
+    if ids:
+        speakers = await speaker_repository.get_many(ids, selection)
+    else:
+        speakers = await speaker_repository.list_speakers(params, selection)
+
+    if selection:
+        items = [speaker_fieldset.dump(speaker, selection) for speaker in speakers['items']]
+        return JSONResponse({**speakers, 'items': items})
+
     return speakers
@@ -3,7 +3,7 @@ from typing import List, Optional
 
 from pydantic import BaseModel, ConfigDict
 
-from ..shared.schemas import BasePaginatedResponse
+from ..shared.schemas import BaseBatchResponse, BasePaginatedResponse
 
 
 class SpeakerDB(BaseModel):
@@ -16,6 +16,7 @@ class SpeakerDB(BaseModel):
     website_url: str
     bio: str
     image_url: str
+    talk_count: int
     created_at: datetime
     updated_at: datetime
 
@@ -58,3 +59,7 @@ class SpeakerUpdate(BaseModel):
 
 class SpeakersPaginatedResponse(BasePaginatedResponse):
     items: List[SpeakerDB]
+
+
+class SpeakersBatchResponse(BaseBatchResponse):
+    items: List[SpeakerDB]
@@ -2,7 +2,8 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, String, func
+from sqlalchemy import DDL, DateTime, ForeignKey, String, func
+from sqlalchemy.event import listen
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.resources import Base
@@ -42,3 +43,45 @@ class Talk(Base):
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=False, default=func.now(), onupdate=func.now()
     )
+
+
+# Keeps events.talk_count and speakers.talk_count in sync with the talks table.
+# The same DDL ships in the Alembic migration that introduced the counters; it is
+# attached here as well so that ``Base.metadata.create_all`` (used by the tests)
+# produces an equivalent schema.
+TALK_COUNT_FUNCTION = DDL("""
+CREATE OR REPLACE FUNCTION talks_maintain_talk_count() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' OR (TG_OP = 'UPDATE' AND NEW.event_id IS DISTINCT FROM OLD.event_id) THEN
+        UPDATE events SET talk_count = talk_count + 1 WHERE id = NEW.event_id;
+    END IF;
+    IF TG_OP = 'DELETE' OR (TG_OP = 'UPDATE' AND NEW.event_id IS DISTINCT FROM OLD.event_id) THEN
+        UPDATE events SET talk_count = talk_count - 1 WHERE id = OLD.event_id;
+    END IF;
+    IF TG_OP = 'INSERT' OR (TG_OP = 'UPDATE' AND NEW.speaker_id IS DISTINCT FROM OLD.speaker_id) THEN
+        UPDATE speakers SET talk_count = talk_count + 1 WHERE id = NEW.speaker_id;
+    END IF;
+    IF TG_OP = 'DELETE' OR (TG_OP = 'UPDATE' AND NEW.speaker_id IS DISTINCT FROM OLD.speaker_id) THEN
+        UPDATE speakers SET talk_count = talk_count - 1 WHERE id = OLD.speaker_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+""")
+
+TALK_COUNT_INSERT_DELETE_TRIGGER = DDL("""
+CREATE TRIGGER talks_talk_count_insert_delete
+AFTER INSERT OR DELETE ON talks
+FOR EACH ROW EXECUTE FUNCTION talks_maintain_talk_count()
+""")
+
+TALK_COUNT_UPDATE_TRIGGER = DDL("""
+CREATE TRIGGER talks_talk_count_update
+AFTER UPDATE OF event_id, speaker_id ON talks
+FOR EACH ROW
+WHEN (OLD.event_id IS DISTINCT FROM NEW.event_id OR OLD.speaker_id IS DISTINCT FROM NEW.speaker_id)
+EXECUTE FUNCTION talks_maintain_talk_count()
+""")
+
+for ddl in (TALK_COUNT_FUNCTION, TALK_COUNT_INSERT_DELETE_TRIGGER, TALK_COUNT_UPDATE_TRIGGER):
+    listen(Talk.__table__, 'after_create', ddl.execute_if(dialect='postgresql'))
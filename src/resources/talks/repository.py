@@ -1,19 +1,50 @@
+from typing import Optional
+
 from fastapi.params import Depends
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from typing_extensions import Annotated
 
-from src.ext.database.db import get_async_session
+from src.ext.cache.response_cache import invalidates_cache
+from src.ext.database.db import get_async_session, get_entity_loader
+from src.ext.database.loader import EntityLoader
+from src.ext.metrics.metrics import instrument_repository
 from src.resources.events.model import Event
+from src.resources.events.schema import EventSummary
+from src.resources.shared.batch import id_in, in_request_order
+from src.resources.shared.fieldsets import FieldSelection, Fieldset
 from src.resources.shared.schemas import PaginationParams
+from src.resources.speakers.model import Speaker
+from src.resources.speakers.schema import SpeakerDB
 from src.resources.talks.model import Talk
-from src.resources.talks.schema import TalkCreate, TalkUpdate
+from src.resources.talks.schema import TalkCreate, TalkDB, TalkUpdate
+
+talk_fieldset = Fieldset(
+    Talk,
+    TalkDB,
+    relationships={
+        'speaker': (Talk.speaker, SpeakerDB),
+        'event': (Talk.event, EventSummary),
+    },
+)
 
 
+@invalidates_cache('talks', 'events', 'speakers')
+@instrument_repository
 class TalkRepository:
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, loader: Optional[EntityLoader] = None):
         self.session = session
+        self.loader = loader or EntityLoader(session)
+
+    def _expire_talk_counts(self):
+        """
+        Expire talk_count on loaded events and speakers.
+        The counters are maintained by database triggers, so the values in the session are stale after a talk write.
+        """
+        for instance in self.session.identity_map.values():
+            if isinstance(instance, (Event, Speaker)):
+                self.session.expire(instance, ['talk_count'])
 
     async def create(self, talk_data: TalkCreate):
         talk = Talk(
@@ -28,16 +59,33 @@ class TalkRepository:
         self.session.add(talk)
 
         await self.session.commit()
+        self._expire_talk_counts()
         await self.session.refresh(talk)
+        self.loader.prime(talk)
 
         return talk
 
-    async def get_by_id(self, talk_id: str):
-        query = select(Talk).where(Talk.id == talk_id)
+    async def get_by_id(self, talk_id: str, selection: Optional[FieldSelection] = None):
+        if not selection:
+            return await self.loader.load(Talk, talk_id)
+
+        query = select(Talk).where(Talk.id == talk_id).options(*talk_fieldset.load_options(selection))
+
         result = await self.session.execute(query)
 
         return result.scalar_one_or_none()
 
+    async def get_many(self, talk_ids: list[str], selection: Optional[FieldSelection] = None):
+        if not selection:
+            talks = await self.loader.load_many(Talk, talk_ids)
+            return in_request_order(talk_ids, [talk for talk in talks if talk is not None])
+
+        query = select(Talk).where(id_in(Talk.id, talk_ids)).options(*talk_fieldset.load_options(selection))
+
+        result = await self.session.execute(query)
+
+        return in_request_order(talk_ids, result.scalars().all())
+
     async def get_by_event_edition(self, event_edition: int):
         query = select(Talk).join(Talk.event).where(Event.edition == event_edition).options(selectinload(Talk.event))
         result = await self.session.execute(query)
@@ -55,6 +103,7 @@ class TalkRepository:
             setattr(talk, field, value)
 
         await self.session.commit()
+        self._expire_talk_counts()
         await self.session.refresh(talk)
 
         return talk
@@ -67,14 +116,19 @@ class TalkRepository:
 
         await self.session.delete(talk)
         await self.session.commit()
+        self.loader.clear(Talk, talk_id)
+        self._expire_talk_counts()
 
         return talk
 
-    async def list_talks(self, params: PaginationParams):
+    async def list_talks(self, params: PaginationParams, selection: Optional[FieldSelection] = None):
         count_query = select(func.count()).select_from(Talk)
         total = await self.session.scalar(count_query) or 0
 
         query = select(Talk).offset((params.page - 1) * params.per_page).limit(params.per_page)
+
+        if selection:
+            query = query.options(*talk_fieldset.load_options(selection))
         result = await self.session.execute(query)
         talks = result.scalars().all()
 
@@ -91,8 +145,9 @@ class TalkRepository:
 
 def get_talk_repository(
     session: Annotated[AsyncSession, Depends(get_async_session)],
+    loader: Annotated[EntityLoader, Depends(get_entity_loader)],
 ) -> TalkRepository:
     """
     Dependency that provides a TalkRepository instance.
     """
-    return TalkRepository(session)
+    return TalkRepository(session, loader)
@@ -1,17 +1,26 @@
 from http import HTTPStatus
+from typing import Optional, Union
 
 from fastapi import APIRouter, HTTPException
 from fastapi.params import Depends
+from fastapi.responses import JSONResponse
 from typing_extensions import Annotated
 
+from src.ext.cache.response_cache import cache_response
+from src.ext.deadline.middleware import deadline
+from src.ext.idempotency.middleware import idempotent
+from src.ext.metrics.server_timing import ServerTimingRoute
 from src.resources.events.repository import EventRepository, get_event_repository
+from src.resources.shared.batch import batch_ids
+from src.resources.shared.fieldsets import FieldSelection
 from src.resources.shared.schemas import PaginationParams
-from src.resources.talks.repository import TalkRepository, get_talk_repository
-from src.resources.talks.schema import TalkCreate, TalkDB, TalksPaginatedResponse, TalkUpdate
+from src.resources.talks.repository import TalkRepository, get_talk_repository, talk_fieldset
+from src.resources.talks.schema import TalkCreate, TalkDB, TalksBatchResponse, TalksPaginatedResponse, TalkUpdate
 
 router = APIRouter(
     prefix='/talks',
     tags=['talks'],
+    route_class=ServerTimingRoute,
     responses={
         404: {'description': 'Talk não encontrado'},
         400: {'description': 'Dados inválidos'},
@@ -22,6 +31,8 @@ router = APIRouter(
 
 TalkRepositoryDep = Annotated[TalkRepository, Depends(get_talk_repository)]
 EventRepositoryDep = Annotated[EventRepository, Depends(get_event_repository)]
+TalkSelectionDep = Annotated[Optional[FieldSelection], Depends(talk_fieldset)]
+BatchIdsDep = Annotated[Optional[list[str]], Depends(batch_ids)]
 
 
 @router.post(
@@ -40,8 +51,12 @@ EventRepositoryDep = Annotated[EventRepository, Depends(get_event_repository)]
     - **event_id**: ID do evento da palestra
 
     Retorna os dados da palestra criada.
+
+    Envie o cabeçalho **Idempotency-Key** para repetir a requisição com segurança: repetições com a mesma
+    chave recebem a resposta da primeira, sem criar outro registro.
     """,
 )
+@idempotent
 async def create_talk(
     talk_data: TalkCreate,
     talk_repository: TalkRepositoryDep,
@@ -77,16 +92,21 @@ async def create_talk(
 
     - **talk_id**: ID único da palestra (ULID)
 
+    Parâmetros opcionais:
+    - **fields**: Campos retornados, separados por vírgula (ex.: `id,title`)
+    - **expand**: Relacionamentos incluídos na resposta (`speaker`, `event`)
+
     Retorna os dados da palestra.
     """,
 )
 async def get_talk(
     talk_id: str,
     talk_repository: TalkRepositoryDep,
+    selection: TalkSelectionDep,
 ):
     """Retorna os dados de uma palestra pelo seu ID."""
 
-    talk = await talk_repository.get_by_id(talk_id)
+    talk = await talk_repository.get_by_id(talk_id, selection)
 
     if not talk:
         raise HTTPException(
@@ -94,6 +114,9 @@ async def get_talk(
             detail='Talk not found',
         )
 
+    if selection:
+        return JSONResponse(talk_fieldset.dump(talk, selection))
+
     return talk
 
 
@@ -172,7 +195,7 @@ async def delete_talk(
 
 @router.get(
     '',
-    response_model=TalksPaginatedResponse,
+    response_model=Union[TalksPaginatedResponse, TalksBatchResponse],
     summary='Listar palestras',
     description="""
     Retorna uma lista paginada de palestras.
@@ -181,14 +204,32 @@ async def delete_talk(
     - **page**: Número da página (padrão: 1)
     - **per_page**: Itens por página (padrão: 10, máximo: 100)
 
+    Parâmetros opcionais:
+    - **fields**: Campos retornados, separados por vírgula (ex.: `id,title`)
+    - **expand**: Relacionamentos incluídos na resposta (`speaker`, `event`)
+    - **ids**: IDs separados por vírgula para busca em lote (máximo: 200). Ignora a paginação e retorna
+      os itens na ordem pedida, com os IDs não encontrados em **missing**
+
     Retorna:
     - Lista de palestras
     """,
 )
+@cache_response(ttl=30, tags=('talks',))
+@deadline(5)
 async def list_talks(
     params: Annotated[PaginationParams, Depends()],
     talk_repository: TalkRepositoryDep,
+    selection: TalkSelectionDep,
+    ids: BatchIdsDep,
 ):
     """Retorna uma lista paginada de palestras."""
-    talks = await talk_repository.list_talks(params)
+    if ids:
+        talks = await talk_repository.get_many(ids, selection)
+    else:
+        talks = await talk_repository.list_talks(params, selection)
+
+    if selection:
+        items = [talk_fieldset.dump(talk, selection) for talk in talks['items']]
+        return JSONResponse({**talks, 'items': items})
+
     return talks
@@ -5,7 +5,7 @@ from typing import List, Optional
 
 from pydantic import BaseModel, ConfigDict
 
-from src.resources.shared.schemas import BasePaginatedResponse
+from src.resources.shared.schemas import BaseBatchResponse, BasePaginatedResponse
 
 
 class TalkDB(BaseModel):
@@ -51,3 +51,7 @@ class TalkUpdate(BaseModel):
 
 class TalksPaginatedResponse(BasePaginatedResponse):
     items: List[TalkDB]
+
+
+class TalksBatchResponse(BaseBatchResponse):
+    items: List[TalkDB]
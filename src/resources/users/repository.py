@@ -1,11 +1,15 @@
-from typing import Annotated, Optional
+from functools import lru_cache
+from typing import TYPE_CHECKING, Annotated, Optional
 
 from fastapi import Depends
-from passlib.context import CryptContext
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.ext.database.db import get_async_session
+from src.ext.database.db import get_async_session, get_entity_loader
+from src.ext.database.loader import EntityLoader
+from src.ext.metrics.metrics import instrument_repository
+from src.resources.shared.batch import id_in, in_request_order
+from src.resources.shared.fieldsets import FieldSelection, Fieldset
 from src.resources.shared.schemas import PaginationParams
 from src.resources.users.model import User, UserProfile
 from src.resources.users.schema import (
@@ -14,15 +18,30 @@ from src.resources.users.schema import (
     UsersPaginatedResponse,
     UserUpdate,
 )
+from src.resources.users.schema import UserProfile as UserProfileSchema
 
-pwd_context = CryptContext(schemes=['bcrypt'], deprecated='auto')
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+
+@lru_cache
+def password_context() -> 'CryptContext':
+    """The bcrypt context, imported on first use since only writes to users hash passwords."""
+    from passlib.context import CryptContext  # noqa: PLC0415
+
+    return CryptContext(schemes=['bcrypt'], deprecated='auto')
+
+
+user_fieldset = Fieldset(User, UserPublic, relationships={'profile': (User.profile, UserProfileSchema)})
 
 SessionDep = Annotated[AsyncSession, Depends(get_async_session)]
 
 
+@instrument_repository
 class UserRepository:
-    def __init__(self, session: SessionDep):
+    def __init__(self, session: SessionDep, loader: Optional[EntityLoader] = None):
         self.session = session
+        self.loader = loader or EntityLoader(session)
 
     async def create(self, user_data: UserCreate):
         """Create a new user and return the public schema."""
@@ -30,7 +49,7 @@ class UserRepository:
         user = User(
             email=user_data.email,
             username=user_data.username,
-            hashed_password=pwd_context.hash(user_data.password),
+            hashed_password=password_context().hash(user_data.password),
         )
 
         # Create profile if provided
@@ -48,15 +67,32 @@ class UserRepository:
         self.session.add(user)
         await self.session.commit()
         await self.session.refresh(user)
+        self.loader.prime(user)
         return user
 
-    async def get_by_id(self, user_id: str):
+    async def get_by_id(self, user_id: str, selection: Optional[FieldSelection] = None):
         """Get a user by ID."""
 
-        query = select(User).where(User.id == user_id)
+        if not selection:
+            return await self.loader.load(User, user_id)
+
+        query = select(User).where(User.id == user_id).options(*user_fieldset.load_options(selection))
+
         result = await self.session.execute(query)
         return result.scalar_one_or_none()
 
+    async def get_many(self, user_ids: list[str], selection: Optional[FieldSelection] = None):
+        """Get users by ID, in request order, reporting the ids that were not found."""
+        if not selection:
+            users = await self.loader.load_many(User, user_ids)
+            return in_request_order(user_ids, [user for user in users if user is not None])
+
+        query = select(User).where(id_in(User.id, user_ids)).options(*user_fieldset.load_options(selection))
+
+        result = await self.session.execute(query)
+
+        return in_request_order(user_ids, result.scalars().all())
+
     async def get_by_email(self, email: str) -> Optional[User]:
         """Get a user by email."""
         query = select(User).where(User.email == email)
@@ -79,7 +115,7 @@ class UserRepository:
         update_data = user_data.model_dump(exclude_unset=True, exclude={'profile'})
         for field, value in update_data.items():
             if field == 'password':
-                setattr(user, 'hashed_password', pwd_context.hash(value))
+                setattr(user, 'hashed_password', password_context().hash(value))
             else:
                 setattr(user, field, value)
 
@@ -107,9 +143,12 @@ class UserRepository:
 
         await self.session.delete(user)
         await self.session.commit()
+        self.loader.clear(User, user_id)
         return user
 
-    async def list_users(self, params: PaginationParams) -> UsersPaginatedResponse:
+    async def list_users(
+        self, params: PaginationParams, selection: Optional[FieldSelection] = None
+    ) -> UsersPaginatedResponse | dict:
         """List users with pagination."""
         # Get total count efficiently
         count_query = select(func.count()).select_from(User)
@@ -117,12 +156,26 @@ class UserRepository:
 
         # Get paginated users
         query = select(User).offset((params.page - 1) * params.per_page).limit(params.per_page)
+
+        if selection:
+            query = query.options(*user_fieldset.load_options(selection))
+
         result = await self.session.execute(query)
         users = result.scalars().all()
 
         # Calculate total pages
         total_pages = (total + params.per_page - 1) // params.per_page
 
+        # Sparse pages can't be validated against UserPublic, return them already serialized
+        if selection:
+            return {
+                'total': total,
+                'page': params.page,
+                'per_page': params.per_page,
+                'total_pages': total_pages,
+                'items': [user_fieldset.dump(user, selection) for user in users],
+            }
+
         # Convert to public schemas
         items = [UserPublic.model_validate(user) for user in users]
 
@@ -137,8 +190,9 @@ class UserRepository:
 
 def get_user_repository(
     session: Annotated[AsyncSession, Depends(get_async_session)],
+    loader: Annotated[EntityLoader, Depends(get_entity_loader)],
 ) -> UserRepository:
     """
     Dependency that provides a UserRepository instance.
     """
-    return UserRepository(session)
+    return UserRepository(session, loader)
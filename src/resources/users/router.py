@@ -1,15 +1,23 @@
 from http import HTTPStatus
-from typing import Annotated
+from typing import Annotated, Optional, Union
 
 from fastapi import APIRouter, Depends, HTTPException, status
-
+from fastapi.responses import JSONResponse
+
+from src.ext.admission.middleware import admission_class
+from src.ext.deadline.middleware import deadline
+from src.ext.idempotency.middleware import idempotent
+from src.ext.metrics.server_timing import ServerTimingRoute
+from src.resources.shared.batch import batch_ids
+from src.resources.shared.fieldsets import FieldSelection
 from src.resources.shared.schemas import PaginationParams
-from src.resources.users.repository import UserRepository, get_user_repository
-from src.resources.users.schema import UserCreate, UserPublic, UsersPaginatedResponse, UserUpdate
+from src.resources.users.repository import UserRepository, get_user_repository, user_fieldset
+from src.resources.users.schema import UserCreate, UserPublic, UsersBatchResponse, UsersPaginatedResponse, UserUpdate
 
 router = APIRouter(
     prefix='/users',
     tags=['users'],
+    route_class=ServerTimingRoute,
     responses={
         404: {'description': 'Usuário não encontrado'},
         400: {'description': 'Dados inválidos'},
@@ -19,6 +27,8 @@ router = APIRouter(
 
 
 UserRepositoryDep = Annotated[UserRepository, Depends(get_user_repository)]
+UserSelectionDep = Annotated[Optional[FieldSelection], Depends(user_fieldset)]
+BatchIdsDep = Annotated[Optional[list[str]], Depends(batch_ids)]
 
 
 @router.post(
@@ -40,8 +50,13 @@ UserRepositoryDep = Annotated[UserRepository, Depends(get_user_repository)]
         - **bio**: Biografia (máximo 500 caracteres)
 
     Retorna os dados do usuário criado, excluindo a senha.
+
+    Envie o cabeçalho **Idempotency-Key** para repetir a requisição com segurança: repetições com a mesma
+    chave recebem a resposta da primeira, sem criar outro registro.
     """,
 )
+@admission_class('password')
+@idempotent
 async def create_user(
     user_data: UserCreate,
     repository: UserRepositoryDep,
@@ -76,15 +91,20 @@ async def create_user(
 
     - **user_id**: ID único do usuário (ULID)
 
+    Parâmetros opcionais:
+    - **fields**: Campos retornados, separados por vírgula (ex.: `id,username`)
+    - **expand**: Relacionamentos incluídos na resposta (`profile`)
+
     Retorna os dados do usuário, excluindo a senha.
     """,
 )
 async def get_user(
     user_id: str,
     repository: UserRepositoryDep,
+    selection: UserSelectionDep,
 ):
     """Retorna os dados de um usuário pelo seu ID."""
-    user = await repository.get_by_id(user_id)
+    user = await repository.get_by_id(user_id, selection)
 
     if not user:
         raise HTTPException(
@@ -92,6 +112,9 @@ async def get_user(
             detail='User not found',
         )
 
+    if selection:
+        return JSONResponse(user_fieldset.dump(user, selection))
+
     return user
 
 
@@ -114,6 +137,7 @@ async def get_user(
     Retorna os dados atualizados do usuário.
     """,
 )
+@admission_class('password')
 async def update_user(
     user_id: str,
     user_data: UserUpdate,
@@ -183,7 +207,7 @@ async def delete_user(
 
 @router.get(
     '',
-    response_model=UsersPaginatedResponse,
+    response_model=Union[UsersPaginatedResponse, UsersBatchResponse],
     summary='Listar usuários',
     description="""
     Retorna uma lista paginada de usuários.
@@ -192,6 +216,12 @@ async def delete_user(
     - **page**: Número da página (padrão: 1)
     - **per_page**: Itens por página (padrão: 10, máximo: 100)
 
+    Parâmetros opcionais:
+    - **fields**: Campos retornados, separados por vírgula (ex.: `id,username`)
+    - **expand**: Relacionamentos incluídos na resposta (`profile`)
+    - **ids**: IDs separados por vírgula para busca em lote (máximo: 200). Ignora a paginação e retorna
+      os itens na ordem pedida, com os IDs não encontrados em **missing**
+
     Retorna:
     - Lista de usuários
     - Total de usuários
@@ -200,9 +230,26 @@ async def delete_user(
     - Itens por página
     """,
 )
+@deadline(5)
 async def list_users(
     params: Annotated[PaginationParams, Depends()],
     repository: UserRepositoryDep,
-) -> UsersPaginatedResponse:
+    selection: UserSelectionDep,
+    ids: BatchIdsDep,
+) -> Union[UsersPaginatedResponse, UsersBatchResponse]:
     """Retorna uma lista paginada de usuários."""
-    return await repository.list_users(params)
+    if ids:
+        users = await repository.get_many(ids, selection)
+
+        if selection:
+            items = [user_fieldset.dump(user, selection) for user in users['items']]
+            return JSONResponse({**users, 'items': items})
+
+        return users
+
+    users = await repository.list_users(params, selection)
+
+    if selection:
+        return JSONResponse(users)
+
+    return users
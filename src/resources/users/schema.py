@@ -3,7 +3,7 @@ from typing import Annotated, List, Optional
 
 from pydantic import BaseModel, ConfigDict, EmailStr, Field, constr, field_validator
 
-from src.resources.shared.schemas import BasePaginatedResponse
+from src.resources.shared.schemas import BaseBatchResponse, BasePaginatedResponse
 from src.utils import validade_password
 
 # Custom validators
@@ -15,6 +15,8 @@ GithubUrl = Annotated[str, constr(pattern=r'^https://github\.com/[\w-]+$')]
 class UserProfile(BaseModel):
     """Base schema for user profile data."""
 
+    model_config = ConfigDict(from_attributes=True)
+
     full_name: Optional[str] = Field(None, max_length=100)
     linkedin_url: Optional[LinkedInUrl] = Field(None, max_length=255)
     github_url: Optional[GithubUrl] = Field(None, max_length=255)
@@ -129,3 +131,9 @@ class UsersPaginatedResponse(BasePaginatedResponse):
     """Schema for paginated response of users."""
 
     items: List[UserPublic]
+
+
+class UsersBatchResponse(BaseBatchResponse):
+    """Schema for batch lookup response of users."""
+
+    items: List[UserPublic]
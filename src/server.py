@@ -0,0 +1,84 @@
+"""
+Production entry point: `python -m src.server`.
+
+Runs `src.app:app` under uvicorn with one worker per available core, uvloop and httptools, and the
+keep-alive, backlog, recycling and graceful shutdown limits from the settings. Worker processes re-read
+the settings, `WORKERS` is exported to them so each one sizes its database pool for its share of
+`DB_MAX_CONNECTIONS`.
+"""
+
+import math
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+import uvicorn
+
+from src.settings import Settings, get_settings
+
+CGROUP_CPU_MAX = Path('/sys/fs/cgroup/cpu.max')
+SHARED_MEMORY = Path('/dev/shm')
+
+
+def _cgroup_cpu_limit() -> Optional[int]:
+    """The CPU quota of the container in whole cores, None when it is unlimited or not under cgroup v2."""
+    try:
+        quota, period = CGROUP_CPU_MAX.read_text(encoding='utf-8').split()
+    except (OSError, ValueError):
+        return None
+    if quota == 'max':
+        return None
+    return max(1, math.ceil(int(quota) / int(period)))
+
+
+def available_cores() -> int:
+    """Cores this process may run on, honouring CPU affinity and the container CPU quota."""
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cores = os.cpu_count() or 1
+    limit = _cgroup_cpu_limit()
+    return min(cores, limit) if limit else cores
+
+
+def server_config(settings: Settings) -> dict:
+    """Keyword arguments for `uvicorn.run`."""
+    workers = settings.WORKERS or available_cores()
+    return {
+        'host': settings.SERVER_HOST,
+        'port': settings.SERVER_PORT,
+        'workers': workers,
+        'loop': 'uvloop',
+        'http': 'httptools',
+        'backlog': settings.SERVER_BACKLOG,
+        'timeout_keep_alive': settings.SERVER_KEEP_ALIVE,
+        # The supervisor replaces recycled workers; a single worker has none, the whole server would stop.
+        'limit_max_requests': settings.SERVER_MAX_REQUESTS if workers > 1 else None,
+        'timeout_graceful_shutdown': settings.SERVER_GRACEFUL_TIMEOUT,
+        # The app logs requests itself, see AccessLogMiddleware.
+        'access_log': False,
+        'proxy_headers': True,
+        'server_header': False,
+    }
+
+
+def main() -> None:
+    settings = get_settings()
+    config = server_config(settings)
+
+    # Inherited by the workers, which are started after this.
+    os.environ['WORKERS'] = str(config['workers'])
+    if config['workers'] > 1 and 'PROMETHEUS_MULTIPROC_DIR' not in os.environ:
+        os.environ['PROMETHEUS_MULTIPROC_DIR'] = tempfile.mkdtemp(prefix='prometheus-')
+    if config['workers'] > 1 and settings.RESPONSE_CACHE and not settings.RESPONSE_CACHE_DIR:
+        # Workers share the response cache, so a write invalidates it for all of them.
+        os.environ['RESPONSE_CACHE_DIR'] = tempfile.mkdtemp(
+            prefix='response-cache-', dir=SHARED_MEMORY if SHARED_MEMORY.is_dir() else None
+        )
+
+    uvicorn.run('src.app:app', **config)
+
+
+if __name__ == '__main__':
+    main()
@@ -10,6 +10,7 @@ from sqlalchemy.ext.asyncio import (
 from testcontainers.postgres import PostgresContainer
 
 from src.app import app
+from src.ext.cache.response_cache import response_cache
 from src.ext.database.db import get_async_session
 from src.resources import Base
 from src.resources.events.model import Event
@@ -55,6 +56,8 @@ async def setup_database(engine):
         await conn.run_sync(Base.metadata.drop_all)
         await conn.run_sync(Base.metadata.create_all)
     engine.dispose()
+    # Cached responses would describe the rows just dropped.
+    await response_cache.clear()
 
 
 @pytest.fixture
@@ -1,7 +1,10 @@
+import asyncio
 from http import HTTPStatus
 
 import pytest
 
+from src.ext.metrics.metrics import SINGLE_FLIGHT_FOLLOWERS
+
 
 @pytest.mark.anyio
 async def test_create_event(client):
@@ -65,3 +68,81 @@ async def test_already_exists_edition(client, create_event):
     response = await client.post('/events', json=event_data)
     assert response.status_code == HTTPStatus.BAD_REQUEST
     assert response.json()['detail'] == 'Event with this edition already exists'
+
+
+@pytest.mark.anyio
+async def test_list_events_talk_count(client, create_event, create_speaker):
+    talk_data = {
+        'title': 'Talk 1',
+        'description': 'Description 1',
+        'speaker_id': create_speaker.id,
+        'start_time': '2021-01-01T07:00:00Z',
+        'end_time': '2021-01-01T09:45:00Z',
+        'event_id': create_event.id,
+    }
+    await client.post('/talks', json=talk_data)
+
+    response = await client.get('/events')
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['items'][0]['talk_count'] == 1
+    assert 'talks' not in response.json()['items'][0]
+
+
+@pytest.mark.anyio
+async def test_get_event_with_fields(client, create_event):
+    response = await client.get(f'/events/{create_event.id}', params={'fields': 'id,title'})
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {'id': create_event.id, 'title': create_event.title}
+
+
+@pytest.mark.anyio
+async def test_list_events_with_expand(client, create_talk):
+    response = await client.get('/events', params={'fields': 'title', 'expand': 'talks'})
+    assert response.status_code == HTTPStatus.OK
+    item = response.json()['items'][0]
+    assert set(item) == {'title', 'talks'}
+    assert item['talks'][0]['id'] == create_talk.id
+
+
+@pytest.mark.anyio
+async def test_get_event_with_unknown_field(client, create_event):
+    response = await client.get(f'/events/{create_event.id}', params={'fields': 'id,secret'})
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json()['detail'] == 'Unknown field: secret'
+
+
+@pytest.mark.anyio
+async def test_concurrent_get_event_is_coalesced(client, create_event):
+    followers = SINGLE_FLIGHT_FOLLOWERS._value.get()
+
+    responses = await asyncio.gather(*(client.get(f'/events/{create_event.id}') for _ in range(5)))
+
+    assert all(response.status_code == HTTPStatus.OK for response in responses)
+    assert all(response.json() == responses[0].json() for response in responses)
+    assert SINGLE_FLIGHT_FOLLOWERS._value.get() > followers
+
+
+@pytest.mark.anyio
+async def test_batch_get_events(client, create_event, create_talk):
+    second = await client.post(
+        '/events',
+        json={
+            'edition': 2,
+            'title': 'Event 2',
+            'description': 'Description 2',
+            'start_date': '2022-01-01',
+            'end_date': '2022-01-02',
+            'location': 'Location 2',
+            'image_url': 'https://example.com/image.jpg',
+        },
+    )
+
+    response = await client.get('/events', params={'ids': f'{second.json()["id"]},missing-id,{create_event.id}'})
+
+    assert response.status_code == HTTPStatus.OK
+    items = response.json()['items']
+    assert [event['id'] for event in items] == [second.json()['id'], create_event.id]
+    assert response.json()['missing'] == ['missing-id']
+    # Like list pages, batches carry the talk count instead of the talks.
+    assert 'talk_count' in items[1]
+    assert 'talks' not in items[1]
@@ -1,6 +1,20 @@
 from http import HTTPStatus
 
 import pytest
+from sqlalchemy import event
+
+
+@pytest.fixture
+def statements(session):
+    executed = []
+
+    def before_cursor_execute(**kw):
+        executed.append(kw['statement'])
+
+    engine = session.bind.sync_engine
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute, named=True)
+    yield executed
+    event.remove(engine, 'before_cursor_execute', before_cursor_execute)
 
 
 @pytest.mark.anyio
@@ -146,3 +160,45 @@ async def test_delete_non_existent_speaker(client):
 
     assert response.status_code == HTTPStatus.NOT_FOUND
     assert response.json()['detail'] == 'Speaker not found'
+
+
+@pytest.mark.anyio
+async def test_list_speakers_talk_count(client, create_event, create_speaker):
+    talk_data = {
+        'title': 'Talk 1',
+        'description': 'Description 1',
+        'speaker_id': create_speaker.id,
+        'start_time': '2021-01-01T07:00:00Z',
+        'end_time': '2021-01-01T09:45:00Z',
+        'event_id': create_event.id,
+    }
+    created = await client.post('/talks', json=talk_data)
+
+    response = await client.get('/speakers')
+    assert response.json()['items'][0]['talk_count'] == 1
+
+    await client.delete(f'/talks/{created.json()["id"]}')
+
+    response = await client.get('/speakers')
+    assert response.json()['items'][0]['talk_count'] == 0
+
+
+@pytest.mark.anyio
+async def test_batch_get_speakers(client, create_speaker, statements):
+    response = await client.get('/speakers', params={'ids': f'missing-id,{create_speaker.id}'})
+
+    assert response.status_code == HTTPStatus.OK
+    # The talks are not loaded, the batch only exposes talk_count.
+    assert len(statements) == 1
+    assert [speaker['id'] for speaker in response.json()['items']] == [create_speaker.id]
+    assert response.json()['missing'] == ['missing-id']
+
+
+@pytest.mark.anyio
+async def test_batch_get_speakers_too_many_ids(client):
+    ids = ','.join(f'id-{i}' for i in range(201))
+
+    response = await client.get('/speakers', params={'ids': ids})
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json()['detail'] == 'At most 200 ids can be requested at once'
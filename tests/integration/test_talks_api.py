@@ -146,3 +146,43 @@ async def test_create_talk_with_invalid_event_id(client, create_speaker):
 
     assert response.status_code == HTTPStatus.BAD_REQUEST
     assert response.json()['detail'] == 'Event does not exist'
+
+
+@pytest.mark.anyio
+async def test_get_talk_with_expand(client, create_talk, create_speaker):
+    response = await client.get(f'/talks/{create_talk.id}', params={'fields': 'title', 'expand': 'speaker,event'})
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['title'] == create_talk.title
+    assert response.json()['speaker']['id'] == create_speaker.id
+    assert response.json()['event']['id'] == create_talk.event_id
+    assert 'description' not in response.json()
+
+
+@pytest.mark.anyio
+async def test_list_talks_with_unknown_relationship(client, create_talk):
+    response = await client.get('/talks', params={'expand': 'comments'})
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json()['detail'] == 'Unknown relationship: comments'
+
+
+@pytest.mark.anyio
+async def test_batch_get_talks(client, create_talk, create_event, create_speaker):
+    second = await client.post(
+        '/talks',
+        json={
+            'title': 'Talk 2',
+            'description': 'Description 2',
+            'speaker_id': create_speaker.id,
+            'start_time': '2021-01-01T10:00:00Z',
+            'end_time': '2021-01-01T11:00:00Z',
+            'event_id': create_event.id,
+        },
+    )
+
+    response = await client.get('/talks', params={'ids': f'{second.json()["id"]},missing-id,{create_talk.id}'})
+
+    assert response.status_code == HTTPStatus.OK
+    assert [talk['id'] for talk in response.json()['items']] == [second.json()['id'], create_talk.id]
+    assert response.json()['missing'] == ['missing-id']
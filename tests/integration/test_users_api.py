@@ -2,6 +2,8 @@ from http import HTTPStatus
 
 import pytest
 
+from src.resources.users.model import UserProfile
+
 
 @pytest.mark.anyio
 async def test_create_user(client):
@@ -93,6 +95,17 @@ async def test_create_user_with_profile(client):
     assert response.json()['profile']['bio'] == 'teste'
 
 
+@pytest.mark.anyio
+async def test_list_users_with_profile(client, session, create_user):
+    session.add(UserProfile(user_id=create_user.id, full_name='Bento'))
+    await session.commit()
+
+    response = await client.get('/users')
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['items'][0]['profile']['full_name'] == 'Bento'
+
+
 @pytest.mark.anyio
 async def test_update_user_with_profile(client, create_user):
     update_data = {
@@ -122,3 +135,17 @@ async def test_invalid_password(client):
     response = await client.post('/users', json=user_data)
     assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
     assert response.json()['detail'][0]['msg'] == 'String should have at least 8 characters'
+
+
+@pytest.mark.anyio
+async def test_list_users_with_fields(client, create_user):
+    response = await client.get('/users', params={'fields': 'id,username'})
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['items'] == [{'id': create_user.id, 'username': create_user.username}]
+
+
+@pytest.mark.anyio
+async def test_batch_get_users_with_fields(client, create_user):
+    response = await client.get('/users', params={'ids': f'{create_user.id},123', 'fields': 'username'})
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {'items': [{'username': create_user.username}], 'missing': ['123']}
@@ -0,0 +1,118 @@
+import asyncio
+from http import HTTPStatus
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from src.ext.admission.middleware import AdmissionControlMiddleware, Limit, admission_class
+from src.ext.metrics import metrics
+from src.ext.metrics.metrics import ADMISSION_REJECTED
+
+QUEUE_TIMEOUT = 0.2
+
+
+def admission_app(limits: dict[str, Limit]) -> tuple[FastAPI, asyncio.Event]:
+    release = asyncio.Event()
+    app = FastAPI()
+
+    @app.get('/slow')
+    async def slow():
+        await release.wait()
+        return {'ok': True}
+
+    @app.post('/password')
+    @admission_class('password')
+    async def password():
+        return {'ok': True}
+
+    @app.get('/health/live')
+    async def live():
+        return {'ok': True}
+
+    app.add_middleware(
+        AdmissionControlMiddleware, limits=limits, queue_timeout=QUEUE_TIMEOUT, max_pool_wait=0.5, exempt=('/health',)
+    )
+    return app, release
+
+
+async def started(task: asyncio.Task) -> asyncio.Task:
+    # Lets the request reach the endpoint before the next one is sent.
+    await asyncio.sleep(0.05)
+    return task
+
+
+def rejected(name: str, reason: str) -> float:
+    return ADMISSION_REJECTED.labels(name, reason)._value.get()
+
+
+@pytest.mark.anyio
+async def test_request_over_the_limit_is_shed_when_the_queue_is_full():
+    app, release = admission_app({'read': Limit(concurrency=1, queue=0)})
+    before = rejected('read', 'queue_full')
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url='http://test') as client:
+        first = await started(asyncio.create_task(client.get('/slow')))
+        response = await client.get('/slow')
+        release.set()
+        assert (await first).status_code == HTTPStatus.OK
+
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert response.headers['retry-after'] == '1'
+    assert rejected('read', 'queue_full') == before + 1
+
+
+@pytest.mark.anyio
+async def test_queued_request_runs_when_a_slot_frees_up():
+    app, release = admission_app({'read': Limit(concurrency=1, queue=1)})
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url='http://test') as client:
+        first = await started(asyncio.create_task(client.get('/slow')))
+        queued = await started(asyncio.create_task(client.get('/slow')))
+        release.set()
+        responses = [await first, await queued]
+
+    assert [response.status_code for response in responses] == [HTTPStatus.OK, HTTPStatus.OK]
+
+
+@pytest.mark.anyio
+async def test_queued_request_is_shed_after_the_queue_timeout():
+    app, release = admission_app({'read': Limit(concurrency=1, queue=1)})
+    before = rejected('read', 'queue_timeout')
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url='http://test') as client:
+        first = await started(asyncio.create_task(client.get('/slow')))
+        response = await client.get('/slow')
+        release.set()
+        await first
+
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert rejected('read', 'queue_timeout') == before + 1
+
+
+@pytest.mark.anyio
+async def test_requests_are_shed_while_the_pool_wait_is_high(monkeypatch):
+    app, _ = admission_app({'read': Limit(concurrency=1, queue=1), 'password': Limit(concurrency=1, queue=1)})
+    monkeypatch.setattr(metrics.RECENT_POOL_WAIT, 'value', lambda: 2.0)
+    before = rejected('password', 'pool_wait')
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url='http://test') as client:
+        response = await client.post('/password')
+        live = await client.get('/health/live')
+
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert rejected('password', 'pool_wait') == before + 1
+    assert live.status_code == HTTPStatus.OK
+
+
+@pytest.mark.anyio
+async def test_marked_endpoints_have_their_own_class():
+    app, release = admission_app({'read': Limit(concurrency=1, queue=0), 'password': Limit(concurrency=1, queue=0)})
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url='http://test') as client:
+        first = await started(asyncio.create_task(client.get('/slow')))
+        response = await client.post('/password')
+        release.set()
+        await first
+
+    assert response.status_code == HTTPStatus.OK
@@ -0,0 +1,94 @@
+from http import HTTPStatus
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from src.ext.compression.middleware import CompressionMiddleware, negotiate
+from src.ext.metrics.metrics import HTTP_COMPRESSION
+
+MINIMUM_SIZE = 1024
+
+
+@pytest.fixture
+async def compression_client():
+    app = FastAPI()
+
+    @app.get('/large')
+    async def large():
+        return {'items': [{'title': f'Talk {number}', 'description': 'Python Floripa'} for number in range(200)]}
+
+    @app.get('/small')
+    async def small():
+        return {'ok': True}
+
+    app.add_middleware(CompressionMiddleware, minimum_size=MINIMUM_SIZE, thread_minimum_size=4096, cache_bytes=2**20)
+    # httpx would otherwise ask for compression and decode it transparently.
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url='http://test', headers={'Accept-Encoding': 'identity'}
+    ) as client:
+        yield client
+
+
+def compressed(result: str) -> float:
+    return HTTP_COMPRESSION.labels('gzip', result)._value.get()
+
+
+@pytest.mark.anyio
+async def test_large_response_is_compressed(compression_client):
+    response = await compression_client.get('/large', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['content-encoding'] == 'gzip'
+    assert response.headers['vary'] == 'Accept-Encoding'
+    # httpx decodes the body, the header still has the size on the wire.
+    assert int(response.headers['content-length']) < len(response.content) / 4
+    assert response.json()['items'][0]['title'] == 'Talk 0'
+
+
+@pytest.mark.anyio
+async def test_small_or_unaccepted_responses_are_not_compressed(compression_client):
+    small = await compression_client.get('/small', headers={'Accept-Encoding': 'gzip'})
+    identity = await compression_client.get('/large')
+
+    assert 'content-encoding' not in small.headers
+    assert 'content-encoding' not in identity.headers
+    assert identity.json()['items'][0]['title'] == 'Talk 0'
+
+
+@pytest.mark.anyio
+async def test_unchanged_body_is_compressed_once(compression_client):
+    first = await compression_client.get('/large', headers={'Accept-Encoding': 'gzip'})
+    before = compressed('compressed'), compressed('cached')
+
+    second = await compression_client.get('/large', headers={'Accept-Encoding': 'gzip'})
+
+    assert second.content == first.content
+    assert (compressed('compressed'), compressed('cached')) == (before[0], before[1] + 1)
+
+
+@pytest.mark.anyio
+async def test_matching_etag_gets_304(compression_client):
+    etag = (await compression_client.get('/large')).headers['etag']
+
+    response = await compression_client.get('/large', headers={'If-None-Match': etag})
+
+    assert etag.startswith('W/"')
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert response.headers['etag'] == etag
+    assert not response.content
+
+
+@pytest.mark.parametrize(
+    ('accept_encoding', 'expected'),
+    [
+        ('gzip, deflate', 'gzip'),
+        ('gzip;q=0', None),
+        ('*', 'gzip'),
+        ('identity', None),
+        ('', None),
+    ],
+)
+@pytest.mark.anyio
+async def test_negotiate(accept_encoding, expected):
+    assert negotiate(accept_encoding) == expected
@@ -0,0 +1,181 @@
+import asyncio
+import time
+from http import HTTPStatus
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.ext.database.statement_timeout import DeadlineSession, current_deadline
+from src.ext.deadline.middleware import DeadlineMiddleware, deadline
+from src.ext.metrics.metrics import HTTP_CLIENT_DISCONNECTS, HTTP_REQUEST_TIMEOUTS
+from src.ext.singleflight.middleware import SingleFlightMiddleware, single_flight
+
+SLOW_SECONDS = 2
+DEADLINE_MS = 5000
+
+
+def deadline_app(engine=None) -> FastAPI:
+    app = FastAPI()
+    app.state.cancelled = asyncio.Event()
+
+    @app.get('/slow')
+    async def slow():
+        try:
+            await asyncio.sleep(SLOW_SECONDS)
+        except asyncio.CancelledError:
+            app.state.cancelled.set()
+            raise
+        return {'ok': True}
+
+    @app.get('/quick-deadline')
+    @deadline(0.05)
+    async def quick_deadline():
+        await asyncio.sleep(SLOW_SECONDS)
+
+    @app.get('/slow-query')
+    async def slow_query():
+        async with async_sessionmaker(engine, class_=AsyncSession, sync_session_class=DeadlineSession)() as session:
+            await session.execute(text(f'SELECT pg_sleep({SLOW_SECONDS})'))
+
+    return app
+
+
+def timeouts(route: str, cause: str) -> float:
+    return HTTP_REQUEST_TIMEOUTS.labels(route, cause)._value.get()
+
+
+@pytest.mark.anyio
+async def test_request_past_the_deadline_gets_504():
+    app = deadline_app()
+    app.add_middleware(DeadlineMiddleware, default_timeout=0.05)
+    before = timeouts('/slow', 'deadline')
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url='http://test') as client:
+        response = await client.get('/slow')
+
+    assert response.status_code == HTTPStatus.GATEWAY_TIMEOUT
+    assert response.json() == {'detail': 'Request timed out'}
+    assert app.state.cancelled.is_set()
+    assert timeouts('/slow', 'deadline') == before + 1
+
+
+@pytest.mark.anyio
+async def test_endpoint_deadline_overrides_the_default():
+    app = deadline_app()
+    app.add_middleware(DeadlineMiddleware, default_timeout=None)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url='http://test') as client:
+        response = await client.get('/quick-deadline')
+
+    assert response.status_code == HTTPStatus.GATEWAY_TIMEOUT
+
+
+@pytest.mark.anyio
+async def test_statement_timeout_follows_the_deadline(engine):
+    token = current_deadline.set(time.monotonic() + DEADLINE_MS / 1000)
+    try:
+        async with async_sessionmaker(engine, class_=AsyncSession, sync_session_class=DeadlineSession)() as session:
+            statement_timeout = await session.scalar(text('SHOW statement_timeout'))
+    finally:
+        current_deadline.reset(token)
+
+    assert statement_timeout.endswith('ms')
+    assert DEADLINE_MS - 1000 < int(statement_timeout.removesuffix('ms')) <= DEADLINE_MS
+
+
+@pytest.mark.anyio
+async def test_slow_query_is_cancelled_at_the_deadline(engine):
+    app = deadline_app(engine)
+    app.add_middleware(DeadlineMiddleware, default_timeout=0.3)
+
+    start = time.monotonic()
+    async with AsyncClient(transport=ASGITransport(app=app), base_url='http://test') as client:
+        response = await client.get('/slow-query')
+
+    assert response.status_code == HTTPStatus.GATEWAY_TIMEOUT
+    assert time.monotonic() - start < SLOW_SECONDS
+
+
+def http_scope(path: str) -> dict:
+    return {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'root_path': '',
+        'query_string': b'',
+        'headers': [],
+        'server': ('test', 80),
+        'client': ('127.0.0.1', 1234),
+    }
+
+
+def disconnecting_receive():
+    messages = iter([{'type': 'http.request', 'body': b'', 'more_body': False}, {'type': 'http.disconnect'}])
+
+    async def receive():
+        message = next(messages)
+        if message['type'] == 'http.disconnect':
+            await asyncio.sleep(0.05)
+        return message
+
+    return receive
+
+
+@pytest.mark.anyio
+async def test_client_disconnect_cancels_the_request():
+    app = deadline_app()
+    app.add_middleware(DeadlineMiddleware, default_timeout=None)
+    before = HTTP_CLIENT_DISCONNECTS.labels('/slow')._value.get()
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    await asyncio.wait_for(app(http_scope('/slow'), disconnecting_receive(), send), timeout=1)
+
+    assert app.state.cancelled.is_set()
+    assert not sent
+    assert HTTP_CLIENT_DISCONNECTS.labels('/slow')._value.get() == before + 1
+
+
+@pytest.mark.anyio
+async def test_followers_serve_themselves_when_the_leader_disconnects():
+    app = FastAPI()
+    calls = []
+
+    @app.get('/coalesced')
+    @single_flight
+    async def coalesced():
+        calls.append(None)
+        if len(calls) == 1:
+            # The leader, its client hangs up meanwhile.
+            await asyncio.sleep(SLOW_SECONDS)
+        return {'ok': True}
+
+    app.add_middleware(DeadlineMiddleware, default_timeout=None)
+    app.add_middleware(SingleFlightMiddleware)
+    follower_sent = []
+
+    async def follower_receive():
+        await asyncio.Event().wait()
+
+    async def follower_send(message):
+        follower_sent.append(message)
+
+    async def ignore(message):
+        pass
+
+    leader = asyncio.create_task(app(http_scope('/coalesced'), disconnecting_receive(), ignore))
+    await asyncio.sleep(0.01)
+    await asyncio.wait_for(app(http_scope('/coalesced'), follower_receive, follower_send), timeout=1)
+    await leader
+
+    assert follower_sent[0]['type'] == 'http.response.start'
+    assert follower_sent[0]['status'] == HTTPStatus.OK
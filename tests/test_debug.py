@@ -0,0 +1,75 @@
+from http import HTTPStatus
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from src.app import app, create_app
+from src.settings import get_settings
+
+
+@pytest.fixture
+def debug_token(client, monkeypatch):
+    monkeypatch.setattr(app.state, 'settings', app.state.settings.model_copy(update={'DEBUG_TOKEN': 'secret'}))
+    return 'secret'
+
+
+@pytest.mark.anyio
+async def test_debug_endpoints_are_disabled_without_token(client):
+    response = await client.post('/_debug/profile', params={'seconds': 0.1})
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.anyio
+async def test_debug_token_comes_from_the_app_settings():
+    debug_app = create_app(get_settings().model_copy(update={'DEBUG_TOKEN': 'secret'}))
+    async with AsyncClient(transport=ASGITransport(app=debug_app), base_url='http://test') as client:
+        response = await client.post('/_debug/profile', params={'seconds': 0.1})
+
+    assert response.status_code == HTTPStatus.FORBIDDEN
+
+
+@pytest.mark.anyio
+async def test_profile_requires_debug_token(client, debug_token):
+    response = await client.post('/_debug/profile', params={'seconds': 0.1}, headers={'X-Debug-Token': 'wrong'})
+
+    assert response.status_code == HTTPStatus.FORBIDDEN
+    assert response.json()['detail'] == 'Invalid debug token'
+
+
+@pytest.mark.anyio
+async def test_profile_returns_collapsed_stacks(client, debug_token):
+    response = await client.post('/_debug/profile', params={'seconds': 0.2}, headers={'X-Debug-Token': debug_token})
+
+    assert response.status_code == HTTPStatus.OK
+    assert int(response.headers['x-profile-samples']) > 0
+    stacks = dict(line.rsplit(' ', 1) for line in response.text.splitlines())
+    assert any(stack.startswith('MainThread;') for stack in stacks)
+    assert all(int(count) > 0 for count in stacks.values())
+
+
+@pytest.mark.anyio
+async def test_heap_snapshot_diff(client, debug_token):
+    headers = {'X-Debug-Token': debug_token}
+
+    response = await client.post('/_debug/heap-snapshots', headers=headers)
+    assert response.status_code == HTTPStatus.CREATED
+    snapshot_id = response.json()['id']
+
+    retained = [bytearray(1024) for _ in range(1000)]
+    response = await client.get(f'/_debug/heap-snapshots/{snapshot_id}/diff', headers=headers)
+    await client.delete('/_debug/heap-snapshots', headers=headers)
+
+    assert response.status_code == HTTPStatus.OK
+    assert any(
+        'test_debug.py' in item['site'] and item['size_diff'] >= len(retained) * 1024
+        for item in response.json()['items']
+    )
+
+
+@pytest.mark.anyio
+async def test_diff_unknown_heap_snapshot(client, debug_token):
+    response = await client.get('/_debug/heap-snapshots/999/diff', headers={'X-Debug-Token': debug_token})
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert response.json()['detail'] == 'Snapshot not found'
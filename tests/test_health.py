@@ -0,0 +1,72 @@
+from http import HTTPStatus
+
+import pytest
+
+from src.app import app
+from src.ext.health.probe import STALE_AFTER_INTERVALS, ReadinessProbe, migration_heads
+
+
+@pytest.fixture
+def ready_app():
+    app.state.ready = True
+    yield app
+    del app.state.ready
+    if hasattr(app.state, 'readiness_probe'):
+        del app.state.readiness_probe
+
+
+@pytest.mark.anyio
+async def test_live(client):
+    response = await client.get('/health/live')
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {'status': 'alive'}
+
+
+@pytest.mark.anyio
+async def test_ready_waits_for_warm_up(client):
+    response = await client.get('/health/ready')
+
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert response.json() == {'status': 'warming up'}
+
+
+@pytest.mark.anyio
+async def test_ready_answers_from_the_last_check(client, engine, ready_app):
+    ready_app.state.readiness_probe = ReadinessProbe(engine, interval=60, timeout=5)
+    await ready_app.state.readiness_probe.refresh()
+
+    response = await client.get('/health/ready')
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['status'] == 'ready'
+    assert response.json()['checks']['database'] == 'ok'
+
+
+@pytest.mark.anyio
+async def test_ready_reports_pending_migrations(client, engine, ready_app):
+    # The test database is created from the models, it has no Alembic revision.
+    ready_app.state.readiness_probe = ReadinessProbe(engine, interval=60, timeout=5, expected_heads={'abc123'})
+    await ready_app.state.readiness_probe.refresh()
+
+    response = await client.get('/health/ready')
+
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert response.json()['checks']['migrations'] == 'at no revision, expected abc123'
+
+
+@pytest.mark.anyio
+async def test_stale_result_is_not_ready(engine):
+    probe = ReadinessProbe(engine, interval=1, timeout=5)
+    result = await probe.refresh()
+    assert probe.current().ready
+
+    result.checked_at -= STALE_AFTER_INTERVALS + 1
+
+    assert not probe.current().ready
+    assert probe.current().checks['probe'] == 'stale'
+
+
+@pytest.mark.anyio
+async def test_migration_heads():
+    assert len(migration_heads()) == 1
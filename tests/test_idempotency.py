@@ -0,0 +1,150 @@
+import hashlib
+from http import HTTPStatus
+from itertools import count
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from httpx import ASGITransport, AsyncClient
+
+from src.app import app as main_app
+from src.ext.admission.middleware import AdmissionControlMiddleware, Limit
+from src.ext.idempotency.middleware import IdempotencyMiddleware, idempotent
+from src.ext.idempotency.store import IdempotencyKeys
+from src.ext.metrics import metrics
+
+TTL = 60
+
+
+@pytest.fixture
+def store(engine):
+    return IdempotencyKeys(engine, ttl=TTL, lock_timeout=TTL, cleanup_interval=TTL)
+
+
+@pytest.fixture
+async def idempotent_client(store):
+    app = FastAPI()
+    app.state.idempotency_keys = store
+    calls = count(1)
+
+    @app.post('/items', status_code=HTTPStatus.CREATED)
+    @idempotent
+    async def create_item(item: dict):
+        return {'call': next(calls), **item}
+
+    @app.post('/failing')
+    @idempotent
+    async def failing():
+        return JSONResponse({'call': next(calls)}, status_code=HTTPStatus.SERVICE_UNAVAILABLE)
+
+    app.add_middleware(IdempotencyMiddleware)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url='http://test') as client:
+        yield client
+
+
+@pytest.mark.anyio
+async def test_retry_replays_the_stored_response(idempotent_client):
+    first = await idempotent_client.post('/items', json={'name': 'a'}, headers={'Idempotency-Key': 'key-1'})
+    retry = await idempotent_client.post('/items', json={'name': 'a'}, headers={'Idempotency-Key': 'key-1'})
+
+    assert first.status_code == retry.status_code == HTTPStatus.CREATED
+    assert first.json() == retry.json() == {'call': 1, 'name': 'a'}
+    assert 'idempotent-replayed' not in first.headers
+    assert retry.headers['idempotent-replayed'] == 'true'
+
+
+@pytest.mark.anyio
+async def test_requests_without_a_key_always_run(idempotent_client):
+    first = await idempotent_client.post('/items', json={'name': 'a'})
+    second = await idempotent_client.post('/items', json={'name': 'a'})
+
+    assert first.json() != second.json()
+
+
+@pytest.mark.anyio
+async def test_key_reused_for_another_request_is_rejected(idempotent_client):
+    await idempotent_client.post('/items', json={'name': 'a'}, headers={'Idempotency-Key': 'key-1'})
+    response = await idempotent_client.post('/items', json={'name': 'b'}, headers={'Idempotency-Key': 'key-1'})
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.anyio
+async def test_request_in_progress_is_rejected(idempotent_client, store):
+    await store.claim('key-1', '/items', hashlib.sha256(b'{}').hexdigest())
+    response = await idempotent_client.post(
+        '/items', content=b'{}', headers={'Idempotency-Key': 'key-1', 'Content-Type': 'application/json'}
+    )
+
+    assert response.status_code == HTTPStatus.CONFLICT
+    assert response.headers['retry-after'] == '1'
+
+
+@pytest.mark.anyio
+async def test_server_errors_release_the_key(idempotent_client):
+    first = await idempotent_client.post('/failing', headers={'Idempotency-Key': 'key-1'})
+    retry = await idempotent_client.post('/failing', headers={'Idempotency-Key': 'key-1'})
+
+    assert first.json() != retry.json()
+    assert 'idempotent-replayed' not in retry.headers
+
+
+@pytest.mark.anyio
+async def test_too_long_key_is_rejected(idempotent_client):
+    response = await idempotent_client.post('/items', json={}, headers={'Idempotency-Key': 'k' * 256})
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.anyio
+async def test_shed_requests_never_claim_their_key(store, monkeypatch):
+    app = FastAPI()
+    app.state.idempotency_keys = store
+
+    @app.post('/items')
+    @idempotent
+    async def create_item():
+        return {}
+
+    app.add_middleware(IdempotencyMiddleware)
+    app.add_middleware(
+        AdmissionControlMiddleware, limits={'write': Limit(concurrency=1, queue=0)}, queue_timeout=1, max_pool_wait=0.5
+    )
+    monkeypatch.setattr(metrics.RECENT_POOL_WAIT, 'value', lambda: 2.0)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url='http://test') as client:
+        response = await client.post('/items', content=b'{}', headers={'Idempotency-Key': 'key-1'})
+
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert await store.claim('key-1', '/items', hashlib.sha256(b'{}').hexdigest()) is None
+
+
+@pytest.mark.anyio
+async def test_expired_keys_are_purged_and_can_be_reused(engine):
+    store = IdempotencyKeys(engine, ttl=-1, lock_timeout=TTL, cleanup_interval=TTL)
+    await store.claim('key-1', '/items', 'fingerprint')
+    await store.complete('key-1', '/items', HTTPStatus.CREATED, [], b'{}')
+    assert await store.claim('key-1', '/items', 'other') is None
+
+    await store.complete('key-1', '/items', HTTPStatus.CREATED, [], b'{}')
+    assert await store.purge() == 1
+
+
+@pytest.mark.anyio
+async def test_create_event_with_idempotency_key(client, store, monkeypatch):
+    monkeypatch.setattr(main_app.state, 'idempotency_keys', store, raising=False)
+    event = {
+        'edition': 1,
+        'title': 'Event 1',
+        'description': 'Description 1',
+        'start_date': '2021-01-01',
+        'end_date': '2021-01-02',
+        'location': 'Location 1',
+        'image_url': 'https://example.com/image.jpg',
+    }
+
+    first = await client.post('/events', json=event, headers={'Idempotency-Key': 'event-1'})
+    retry = await client.post('/events', json=event, headers={'Idempotency-Key': 'event-1'})
+
+    assert first.status_code == retry.status_code == HTTPStatus.CREATED
+    assert retry.json()['id'] == first.json()['id']
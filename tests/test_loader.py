@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+from sqlalchemy import event
+
+from src.ext.database.loader import EntityLoader
+from src.resources.events.model import Event
+from src.resources.speakers.model import Speaker
+
+
+@pytest.fixture
+def statements(session):
+    executed = []
+
+    def before_cursor_execute(**kw):
+        executed.append(kw['statement'])
+
+    engine = session.bind.sync_engine
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute, named=True)
+    yield executed
+    event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+@pytest.mark.anyio
+async def test_loads_in_the_same_tick_are_batched(session, create_event, create_speaker, statements):
+    loader = EntityLoader(session)
+
+    speaker, missing, event = await asyncio.gather(
+        loader.load(Speaker, create_speaker.id),
+        loader.load(Speaker, 'missing-id'),
+        loader.load(Event, create_event.id),
+    )
+
+    assert speaker is create_speaker
+    assert missing is None
+    assert event is create_event
+    assert len([statement for statement in statements if 'FROM speakers' in statement]) == 1
+
+
+@pytest.mark.anyio
+async def test_results_are_memoized(session, create_speaker, statements):
+    loader = EntityLoader(session)
+
+    await loader.load(Speaker, create_speaker.id)
+    executed = len(statements)
+    speakers = await loader.load_many(Speaker, [create_speaker.id, create_speaker.id])
+
+    assert speakers == [create_speaker, create_speaker]
+    assert len(statements) == executed
@@ -0,0 +1,59 @@
+import io
+import json
+import logging
+
+import pytest
+
+from src.ext.database.query_log import log_queries
+from src.ext.log.setup import SamplingFilter, configure_logging
+
+
+@pytest.fixture
+def log_stream(session):
+    root = logging.getLogger()
+    handlers, level = root.handlers, root.level
+    stream = io.StringIO()
+    detach = log_queries(session.bind)
+
+    listener = configure_logging(stream=stream)
+    yield stream, listener
+    root.handlers, root.level = handlers, level
+    logging.getLogger('uvicorn.access').disabled = False
+    # The engine is shared by the whole module.
+    detach()
+
+
+@pytest.mark.anyio
+async def test_access_log_shares_correlation_id_with_queries(client, create_event, log_stream):
+    stream, listener = log_stream
+
+    response = await client.get(f'/events/{create_event.id}', headers={'X-Request-ID': 'request-1'})
+    listener.stop()
+
+    entries = [json.loads(line) for line in stream.getvalue().splitlines()]
+    access = next(entry for entry in entries if entry['logger'] == 'src.access')
+    queries = [entry for entry in entries if entry['logger'] == 'src.sql' and entry['correlation_id'] == 'request-1']
+    assert response.headers['x-request-id'] == 'request-1'
+    assert access['correlation_id'] == 'request-1'
+    assert access['route'] == '/events/{event_id}'
+    assert access['status'] == response.status_code
+    assert queries[0]['repository_method'] == 'EventRepository.get_by_id'
+
+
+@pytest.mark.anyio
+async def test_invalid_request_id_is_replaced(client):
+    response = await client.get('/', headers={'X-Request-ID': 'not valid\n'})
+
+    assert response.headers['x-request-id'] != 'not valid\n'
+
+
+@pytest.mark.anyio
+async def test_sampling_filter_keeps_warnings():
+    sampling = SamplingFilter({'src.sql': 0.0})
+
+    def record(name, level):
+        return logging.makeLogRecord({'name': name, 'levelno': level})
+
+    assert not sampling.filter(record('src.sql', logging.INFO))
+    assert sampling.filter(record('src.sql', logging.WARNING))
+    assert sampling.filter(record('src.access', logging.INFO))
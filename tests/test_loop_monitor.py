@@ -0,0 +1,32 @@
+import asyncio
+import logging
+import time
+
+import pytest
+
+from src.ext.debug.loop_monitor import LoopMonitor
+from src.ext.metrics.metrics import EVENT_LOOP_LAG
+
+BLOCKED_SECONDS = 0.2
+
+
+def block_the_loop():
+    time.sleep(BLOCKED_SECONDS)
+
+
+@pytest.mark.anyio
+async def test_blocking_call_is_reported_with_its_stack(caplog):
+    caplog.set_level(logging.WARNING, logger='src.loop_monitor')
+    monitor = LoopMonitor(interval=0.01, blocking_threshold=0.05)
+    observed = EVENT_LOOP_LAG._sum.get()
+
+    monitor.start()
+    await asyncio.sleep(0.02)
+    block_the_loop()
+    await asyncio.sleep(0.02)
+    await monitor.stop()
+
+    assert EVENT_LOOP_LAG._sum.get() - observed >= BLOCKED_SECONDS / 2
+    (record,) = [record for record in caplog.records if record.name == 'src.loop_monitor']
+    assert 'Event loop blocked' in record.getMessage()
+    assert 'block_the_loop' in record.getMessage()
@@ -0,0 +1,22 @@
+import tracemalloc
+from http import HTTPStatus
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from src.app import app
+from src.ext.debug.memory import MemoryProfilingMiddleware
+
+
+@pytest.mark.anyio
+async def test_memory_profiling_reports_request_peak(client, create_event, caplog):
+    transport = ASGITransport(app=MemoryProfilingMiddleware(app, enabled=True))
+    caplog.set_level('INFO', logger='src.memory')
+
+    async with AsyncClient(transport=transport, base_url='http://test') as profiled_client:
+        response = await profiled_client.get('/events', params={'per_page': 100})
+    tracemalloc.stop()
+
+    assert response.status_code == HTTPStatus.OK
+    assert int(response.headers['x-memory-peak']) > 0
+    assert any(record.getMessage().startswith('GET /events peak memory') for record in caplog.records)
@@ -0,0 +1,85 @@
+import asyncio
+from http import HTTPStatus
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from src.ext.cache.backends import MemoryBackend
+from src.ext.cache.response_cache import ResponseCache, ResponseCacheMiddleware, cache_response
+from src.ext.metrics.metrics import HTTP_REQUESTS
+from src.ext.metrics.middleware import MetricsMiddleware
+from src.ext.singleflight.middleware import SingleFlightMiddleware, single_flight
+
+COALESCED_REQUESTS = 3
+# A miss, then a hit.
+CACHED_REQUESTS = 2
+TTL = 30
+
+
+@pytest.mark.anyio
+async def test_metrics_exposes_route_latency(client, create_event):
+    await client.get(f'/events/{create_event.id}')
+
+    response = await client.get('/metrics')
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['content-type'].startswith('text/plain')
+    assert 'http_request_duration_seconds_bucket{le="0.005",method="GET",route="/events/{event_id}"}' in response.text
+    assert 'repository_method_duration_seconds_count{method="get_by_id",repository="EventRepository"}' in response.text
+    assert 'db_pool_wait_seconds_count' in response.text
+
+
+@pytest.mark.anyio
+async def test_metrics_groups_unmatched_paths(client):
+    await client.get('/does-not-exist')
+
+    response = await client.get('/metrics')
+
+    assert 'http_requests_total{method="GET",route="<unmatched>",status="404"}' in response.text
+
+
+def requests_to(route: str) -> float:
+    return HTTP_REQUESTS.labels('GET', route, str(HTTPStatus.OK.value))._value.get()
+
+
+@pytest.mark.anyio
+async def test_cache_hits_are_labelled_with_their_route():
+    cached_app = FastAPI()
+
+    @cached_app.get('/cached/{name}')
+    @cache_response(ttl=TTL, tags=('events',))
+    async def cached(name: str):
+        return {'name': name}
+
+    cached_app.add_middleware(ResponseCacheMiddleware, cache=ResponseCache(MemoryBackend()))
+    before = requests_to('/cached/{name}')
+    transport = ASGITransport(app=MetricsMiddleware(cached_app))
+    async with AsyncClient(transport=transport, base_url='http://test') as client:
+        responses = [await client.get('/cached/first') for _ in range(CACHED_REQUESTS)]
+
+    assert 'age' in responses[-1].headers
+    assert requests_to('/cached/{name}') - before == CACHED_REQUESTS
+
+
+@pytest.mark.anyio
+async def test_coalesced_requests_are_labelled_with_their_route():
+    single_flight_app = FastAPI()
+    release = asyncio.Event()
+
+    @single_flight_app.get('/coalesced/{name}')
+    @single_flight
+    async def coalesced(name: str):
+        await release.wait()
+        return {'name': name}
+
+    single_flight_app.add_middleware(SingleFlightMiddleware)
+    before = requests_to('/coalesced/{name}')
+    transport = ASGITransport(app=MetricsMiddleware(single_flight_app))
+    async with AsyncClient(transport=transport, base_url='http://test') as client:
+        requests = [asyncio.create_task(client.get('/coalesced/first')) for _ in range(COALESCED_REQUESTS)]
+        await asyncio.sleep(0.05)
+        release.set()
+        await asyncio.gather(*requests)
+
+    assert requests_to('/coalesced/{name}') - before == COALESCED_REQUESTS
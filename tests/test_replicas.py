@@ -0,0 +1,104 @@
+from http import HTTPStatus
+from typing import Annotated
+
+import pytest
+from fastapi import Depends, FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from src.ext.database.db import (
+    READ_PRIMARY_COOKIE,
+    build_engine,
+    build_session_maker,
+    get_async_session,
+    primary_reads,
+)
+from src.ext.database.replicas import Replica, Replicas
+from src.ext.metrics.metrics import InstrumentedAsyncQueuePool
+from src.settings import get_settings
+
+
+@pytest.fixture
+async def replica_engine(postgres_container):
+    # A second engine on the test database stands in for a replica; a primary reports no lag.
+    engine = create_async_engine(postgres_container.get_connection_url())
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+async def replicas(replica_engine):
+    replicas = Replicas(
+        [Replica(replica_engine, build_session_maker(replica_engine))], max_lag=1, interval=60, read_your_writes=5
+    )
+    await replicas.measure(replicas.replicas[0])
+    return replicas
+
+
+@pytest.fixture
+async def routing_client(engine, replica_engine, replicas):
+    app = FastAPI()
+    app.state.session_maker = build_session_maker(engine)
+    app.state.replicas = replicas
+
+    @app.api_route('/where', methods=['GET', 'POST'])
+    async def where(session: Annotated[AsyncSession, Depends(get_async_session)]):
+        return {'replica': session.bind is replica_engine}
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url='http://test') as client:
+        yield client
+
+
+@pytest.mark.anyio
+async def test_lag_of_a_primary_is_zero(replicas):
+    assert replicas.replicas[0].lag == 0
+    assert replicas.pick() is replicas.replicas[0]
+
+
+@pytest.mark.anyio
+async def test_reads_go_to_the_replica(routing_client):
+    response = await routing_client.get('/where')
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {'replica': True}
+
+
+@pytest.mark.anyio
+async def test_writes_go_to_the_primary_and_pin_the_next_reads(routing_client):
+    response = await routing_client.post('/where')
+
+    assert response.json() == {'replica': False}
+    assert READ_PRIMARY_COOKIE in response.cookies
+    assert (await routing_client.get('/where')).json() == {'replica': False}
+
+
+@pytest.mark.anyio
+async def test_reads_fall_back_to_the_primary_when_the_replica_lags(routing_client, replicas):
+    replicas.replicas[0].lag = 30
+
+    response = await routing_client.get('/where')
+
+    assert response.json() == {'replica': False}
+
+
+@pytest.mark.anyio
+async def test_reads_filling_the_response_cache_go_to_the_primary(routing_client):
+    token = primary_reads.set(True)
+    try:
+        response = await routing_client.get('/where')
+    finally:
+        primary_reads.reset(token)
+
+    assert response.json() == {'replica': False}
+
+
+@pytest.mark.anyio
+async def test_only_the_primary_pool_reports_its_waits(postgres_container):
+    settings = get_settings()
+    primary = build_engine(settings)
+    replica = build_engine(settings, postgres_container.get_connection_url())
+
+    assert isinstance(primary.sync_engine.pool, InstrumentedAsyncQueuePool)
+    assert not isinstance(replica.sync_engine.pool, InstrumentedAsyncQueuePool)
+    await primary.dispose()
+    await replica.dispose()
@@ -0,0 +1,173 @@
+import time
+from itertools import count
+
+import pytest
+from fastapi import FastAPI, Header
+from fastapi.responses import JSONResponse
+from httpx import ASGITransport, AsyncClient
+
+from src.app import create_app
+from src.ext.cache.backends import FileBackend, MemoryBackend
+from src.ext.cache.response_cache import (
+    ResponseCache,
+    ResponseCacheMiddleware,
+    cache_response,
+    invalidates_cache,
+    response_cache,
+)
+from src.ext.database.db import READ_PRIMARY_COOKIE, primary_reads
+from src.settings import get_settings
+
+TTL = 30
+
+
+@pytest.fixture
+def cache():
+    return ResponseCache(MemoryBackend(max_entries=16))
+
+
+@pytest.fixture
+async def cache_client(cache):
+    app = FastAPI()
+    calls = count(1)
+
+    @app.get('/events')
+    @cache_response(ttl=TTL, tags=('events',))
+    async def events():
+        return {'call': next(calls), 'primary': primary_reads.get()}
+
+    @app.get('/greeting')
+    @cache_response(ttl=TTL, tags=('events',))
+    async def greeting(accept_language: str = Header('pt')):
+        return JSONResponse({'call': next(calls), 'language': accept_language}, headers={'Vary': 'Accept-Language'})
+
+    @app.get('/private')
+    @cache_response(ttl=TTL, tags=('events',))
+    async def private():
+        return JSONResponse({'call': next(calls)}, headers={'Cache-Control': 'private'})
+
+    @app.get('/uncached')
+    async def uncached():
+        return {'call': next(calls)}
+
+    app.add_middleware(ResponseCacheMiddleware, cache=cache)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url='http://test') as client:
+        yield client
+
+
+@pytest.mark.anyio
+async def test_response_is_served_from_cache(cache_client):
+    first = await cache_client.get('/events')
+    second = await cache_client.get('/events')
+
+    assert first.json() == second.json() == {'call': 1, 'primary': True}
+    assert first.headers['cache-control'] == f'public, max-age={TTL}'
+    assert 'age' not in first.headers
+    assert second.headers['age'] == '0'
+
+
+@pytest.mark.anyio
+async def test_query_string_is_part_of_the_key(cache_client):
+    first = await cache_client.get('/events', params={'page': 1})
+    second = await cache_client.get('/events', params={'page': 2})
+
+    assert first.json() != second.json()
+
+
+@pytest.mark.anyio
+async def test_invalidating_a_tag_drops_its_responses(cache_client, cache):
+    first = await cache_client.get('/events')
+    await cache.invalidate('events')
+    second = await cache_client.get('/events')
+
+    assert first.json() != second.json()
+
+
+@pytest.mark.anyio
+async def test_request_cache_control(cache_client):
+    cached = await cache_client.get('/events')
+    revalidated = await cache_client.get('/events', headers={'Cache-Control': 'no-cache'})
+    after_revalidation = await cache_client.get('/events')
+    not_stored = await cache_client.get('/events', headers={'Cache-Control': 'no-store'})
+
+    assert revalidated.json() != cached.json()
+    assert after_revalidation.json() == revalidated.json()
+    assert not_stored.json()['call'] not in {cached.json()['call'], revalidated.json()['call']}
+
+
+@pytest.mark.anyio
+async def test_clients_that_just_wrote_skip_the_cache(cache_client):
+    cached = await cache_client.get('/events')
+    cache_client.cookies.set(READ_PRIMARY_COOKIE, str(int(time.time()) + TTL))
+    after_write = await cache_client.get('/events')
+    again = await cache_client.get('/events')
+
+    assert after_write.json() != cached.json()
+    assert again.json()['call'] not in {cached.json()['call'], after_write.json()['call']}
+
+
+@pytest.mark.anyio
+async def test_responses_are_cached_per_vary_header(cache_client):
+    portuguese = await cache_client.get('/greeting', headers={'Accept-Language': 'pt'})
+    english = await cache_client.get('/greeting', headers={'Accept-Language': 'en'})
+    portuguese_again = await cache_client.get('/greeting', headers={'Accept-Language': 'pt'})
+
+    assert english.json()['language'] == 'en'
+    assert portuguese_again.json() == portuguese.json()
+
+
+@pytest.mark.anyio
+async def test_private_and_unmarked_responses_are_not_cached(cache_client):
+    for path in ('/private', '/uncached'):
+        first = await cache_client.get(path)
+        second = await cache_client.get(path)
+
+        assert first.json() != second.json()
+
+
+@pytest.mark.anyio
+async def test_repository_writes_invalidate_their_tags():
+    @invalidates_cache('talks')
+    class Repository:
+        async def create(self):
+            return 'created'
+
+    before = await response_cache.versions(('talks',))
+    assert await Repository().create() == 'created'
+
+    assert await response_cache.versions(('talks',)) != before
+
+
+@pytest.mark.anyio
+async def test_file_backend(tmp_path):
+    writer, reader = FileBackend(tmp_path), FileBackend(tmp_path)
+
+    await writer.set('fresh', b'value', ttl=TTL)
+    await writer.set('expired', b'value', ttl=-1)
+
+    assert await reader.get('fresh') == b'value'
+    assert await reader.get('expired') is None
+    assert await reader.get('missing') is None
+
+    reader.prune()
+    assert len(list(tmp_path.iterdir())) == 1
+
+
+@pytest.mark.anyio
+async def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryBackend(max_entries=2)
+    await backend.set('a', b'1')
+    await backend.set('b', b'2')
+    await backend.get('a')
+    await backend.set('c', b'3')
+
+    assert await backend.get('a') == b'1'
+    assert await backend.get('b') is None
+
+
+@pytest.mark.anyio
+async def test_several_workers_need_a_shared_cache():
+    settings = get_settings().model_copy(update={'WORKERS': 2, 'RESPONSE_CACHE': True, 'RESPONSE_CACHE_DIR': None})
+
+    with pytest.raises(RuntimeError, match='RESPONSE_CACHE_DIR'):
+        create_app(settings)
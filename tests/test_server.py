@@ -0,0 +1,53 @@
+import pytest
+
+from src import server
+from src.settings import get_settings
+
+CORES = 3
+# 1.5 cores of quota round up.
+QUOTA_CORES = 2
+MAX_REQUESTS = 500
+
+
+@pytest.mark.anyio
+async def test_workers_default_to_available_cores(monkeypatch):
+    monkeypatch.setattr(server, 'available_cores', lambda: CORES)
+
+    config = server.server_config(get_settings().model_copy(update={'WORKERS': None}))
+
+    assert config['workers'] == CORES
+    assert config['loop'] == 'uvloop'
+    assert config['http'] == 'httptools'
+
+
+@pytest.mark.anyio
+async def test_a_single_worker_is_never_recycled():
+    settings = get_settings().model_copy(update={'WORKERS': 1, 'SERVER_MAX_REQUESTS': MAX_REQUESTS})
+
+    assert server.server_config(settings)['limit_max_requests'] is None
+    assert server.server_config(settings.model_copy(update={'WORKERS': CORES}))['limit_max_requests'] == MAX_REQUESTS
+
+
+@pytest.mark.anyio
+async def test_container_cpu_quota_limits_the_cores(monkeypatch, tmp_path):
+    cpu_max = tmp_path / 'cpu.max'
+    cpu_max.write_text('150000 100000\n')
+    monkeypatch.setattr(server, 'CGROUP_CPU_MAX', cpu_max)
+    monkeypatch.setattr(server.os, 'sched_getaffinity', lambda pid: set(range(8)))
+
+    assert server.available_cores() == QUOTA_CORES
+
+
+@pytest.mark.anyio
+async def test_workers_share_a_response_cache_directory(monkeypatch, tmp_path):
+    settings = get_settings().model_copy(update={'WORKERS': CORES, 'RESPONSE_CACHE_DIR': None})
+    monkeypatch.setattr(server, 'get_settings', lambda: settings)
+    monkeypatch.setattr(server, 'SHARED_MEMORY', tmp_path)
+    monkeypatch.setattr(server.uvicorn, 'run', lambda app, **config: None)
+    for name in ('WORKERS', 'PROMETHEUS_MULTIPROC_DIR', 'RESPONSE_CACHE_DIR'):
+        # Restored afterwards, main() sets them.
+        monkeypatch.delenv(name, raising=False)
+
+    server.main()
+
+    assert server.os.environ['RESPONSE_CACHE_DIR'].startswith(str(tmp_path))
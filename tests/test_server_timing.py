@@ -0,0 +1,62 @@
+import asyncio
+from http import HTTPStatus
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from src.app import app
+from src.ext.metrics.server_timing import ServerTimingMiddleware, time_queries
+from src.ext.singleflight.middleware import SingleFlightMiddleware, single_flight
+
+COALESCED_REQUESTS = 3
+
+
+@pytest.fixture
+async def timed_client(client, session):
+    detach = time_queries(session.bind)
+    transport = ASGITransport(app=ServerTimingMiddleware(app, token='secret'))
+    async with AsyncClient(transport=transport, base_url='http://test') as async_client:
+        yield async_client
+    # The engine is shared by the whole module.
+    detach()
+
+
+@pytest.mark.anyio
+async def test_server_timing_breakdown(timed_client, create_event):
+    response = await timed_client.get(f'/events/{create_event.id}', headers={'X-Server-Timing': 'secret'})
+
+    assert response.status_code == HTTPStatus.OK
+    metrics = {metric.split(';')[0]: metric for metric in response.headers['server-timing'].split(', ')}
+    assert set(metrics) == {'pool', 'db', 'orm', 'validation', 'encoding', 'total'}
+    assert 'desc="SQL (2 queries)"' in metrics['db']
+
+
+@pytest.mark.anyio
+async def test_server_timing_requires_token(timed_client, create_event):
+    response = await timed_client.get(f'/events/{create_event.id}', headers={'X-Server-Timing': 'wrong'})
+
+    assert response.status_code == HTTPStatus.OK
+    assert 'server-timing' not in response.headers
+
+
+@pytest.mark.anyio
+async def test_coalesced_requests_get_one_server_timing_header_each():
+    single_flight_app = FastAPI()
+    release = asyncio.Event()
+
+    @single_flight_app.get('/slow')
+    @single_flight
+    async def slow():
+        await release.wait()
+        return {}
+
+    single_flight_app.add_middleware(SingleFlightMiddleware)
+    transport = ASGITransport(app=ServerTimingMiddleware(single_flight_app, enabled=True))
+    async with AsyncClient(transport=transport, base_url='http://test') as client:
+        requests = [asyncio.create_task(client.get('/slow')) for _ in range(COALESCED_REQUESTS)]
+        await asyncio.sleep(0.05)
+        release.set()
+        responses = await asyncio.gather(*requests)
+
+    assert all(len(response.headers.get_list('server-timing')) == 1 for response in responses)
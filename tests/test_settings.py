@@ -0,0 +1,32 @@
+import pytest
+
+from src.settings import get_settings
+
+
+@pytest.mark.anyio
+async def test_settings_are_read_once():
+    assert get_settings() is get_settings()
+
+
+@pytest.mark.anyio
+async def test_cache_clear_reads_the_environment_again(monkeypatch):
+    monkeypatch.setenv('LOG_LEVEL', 'DEBUG')
+    get_settings.cache_clear()
+    try:
+        assert get_settings().LOG_LEVEL == 'DEBUG'
+    finally:
+        get_settings.cache_clear()
+
+
+@pytest.mark.anyio
+async def test_pool_limits_split_the_connection_budget_between_workers():
+    settings = get_settings().model_copy(update={'DB_MAX_CONNECTIONS': 30, 'WORKERS': 4, 'DB_POOL_SIZE': 5})
+
+    assert settings.pool_limits() == (5, 2)
+
+
+@pytest.mark.anyio
+async def test_pool_limits_without_a_budget():
+    settings = get_settings().model_copy(update={'DB_MAX_CONNECTIONS': None, 'DB_POOL_SIZE': 3, 'DB_MAX_OVERFLOW': 7})
+
+    assert settings.pool_limits() == (3, 7)
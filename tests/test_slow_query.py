@@ -0,0 +1,50 @@
+import asyncio
+import logging
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from src.ext.database.query_log import log_queries
+from src.ext.database.slow_query import SlowQueryLog, redact
+
+
+@pytest.fixture
+def slow_query_log(session):
+    slow_query_log = SlowQueryLog(session.bind, threshold_ms=0, explain=True)
+    slow_query_log.attach()
+    yield slow_query_log
+    slow_query_log.detach()
+
+
+@pytest.mark.anyio
+async def test_redact_hides_values():
+    assert redact(('bento@test.com', 42, None, [b'ab'])) == ['<str:14>', '<int>', None, ['<bytes:2>']]
+
+
+@pytest.mark.anyio
+async def test_slow_query_is_logged_with_origin_and_plan(client, create_event, slow_query_log, caplog):
+    caplog.set_level(logging.WARNING, logger='src.slow_query')
+
+    await client.get(f'/events/{create_event.id}')
+    await asyncio.gather(*slow_query_log._tasks)
+
+    messages = [record.getMessage() for record in caplog.records]
+    slow = next(message for message in messages if message.startswith('Slow query'))
+    assert '/events/{event_id} [EventRepository.get_by_id]' in slow
+    assert create_event.id not in slow
+    assert any(message.startswith('Plan of slow query') and 'Buffers' in message for message in messages)
+
+
+@pytest.mark.anyio
+async def test_failed_statements_leave_no_start_time_behind(session, slow_query_log):
+    detach = log_queries(session.bind)
+    try:
+        async with session.bind.connect() as conn:
+            with pytest.raises(DBAPIError):
+                await conn.execute(text('SELECT 1 / 0'))
+
+            assert not conn.info.get('slow_query_start')
+            assert not conn.info.get('query_log_start')
+    finally:
+        detach()
@@ -0,0 +1,25 @@
+import pytest
+from starlette.datastructures import State
+
+from src.ext.database.warmup import warm_up, warm_up_until_ready
+
+WARM_CONNECTIONS = 3
+
+
+@pytest.mark.anyio
+async def test_warm_up_leaves_primed_connections_in_the_pool(engine):
+    await engine.dispose()
+
+    await warm_up(engine, connections=WARM_CONNECTIONS)
+
+    assert engine.pool.checkedin() == WARM_CONNECTIONS
+    assert engine.pool.checkedout() == 0
+
+
+@pytest.mark.anyio
+async def test_warm_up_until_ready_marks_the_state_ready(engine):
+    state = State()
+
+    await warm_up_until_ready(state, engine, connections=2)
+
+    assert state.ready